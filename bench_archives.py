@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import tempfile
+import shutil
+import random
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import zipfile
+import py7zr
+from script.components.archive_extractor import SevenZipExtractor
+from script.components.zip_writer import ParallelZipWriter
+from script.components.runtime_cache import RuntimeCache
+from script.components.compression_policy import CompressionPolicy, PRESETS
+
+def make_game_folder(root, size_mb=64, seed=1):
+    """Builds a fake DOS game: some compressible data files, some random (already compressed) assets."""
+    rnd = random.Random(seed)
+    os.makedirs(os.path.join(root, "DATA"), exist_ok=True)
+    os.makedirs(os.path.join(root, "SOUND"), exist_ok=True)
+    target = size_mb * 1024 * 1024; written = 0; i = 0
+    while written < target:
+        size = rnd.randint(64 * 1024, 4 * 1024 * 1024)
+        if i % 2:
+            data = rnd.randbytes(size)
+            path = os.path.join(root, "SOUND", f"TRACK{i:03d}.OGG")
+        else:
+            line = f"LEVEL {i} TILEMAP ".encode() + bytes(rnd.randrange(16) for _ in range(48)) + b"\r\n"
+            data = (line * (size // len(line) + 1))[:size]
+            path = os.path.join(root, "DATA", f"LEVEL{i:03d}.DAT")
+        with open(path, "wb") as f: f.write(data)
+        written += size; i += 1
+    return written
+
+def build_archives(src, work):
+    solid = os.path.join(work, "solid.7z")
+    with py7zr.SevenZipFile(solid, 'w') as z: z.writeall(src, "GAME")
+    # Appending one file per session gives one block per file, i.e. a non-solid archive
+    non_solid = os.path.join(work, "nonsolid.7z")
+    for n, (root, _, files) in enumerate(os.walk(src)):
+        for f in files:
+            full = os.path.join(root, f)
+            mode = 'a' if os.path.exists(non_solid) else 'w'
+            with py7zr.SevenZipFile(non_solid, mode) as z: z.write(full, os.path.join("GAME", os.path.relpath(full, src)))
+    return {"solid": solid, "non-solid": non_solid}
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter(); func(); elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_7z_extract(work, archives):
+    print("7z extraction (best of 3)")
+    for label, archive in archives.items():
+        out = os.path.join(work, "out")
+        def baseline():
+            shutil.rmtree(out, ignore_errors=True)
+            with py7zr.SevenZipFile(archive, mode='r') as z: z.extractall(path=out)
+        updates = []
+        def streaming():
+            shutil.rmtree(out, ignore_errors=True); updates.clear()
+            SevenZipExtractor(archive, progress_callback=lambda c, t: updates.append(c)).extract(out)
+        t_base = timed(baseline); t_stream = timed(streaming)
+        print(f"  {label:<10} extractall: {t_base:6.2f}s   SevenZipExtractor: {t_stream:6.2f}s   progress updates: {len(updates)}")
+
+def bench_export(work, src):
+    """Old export (copy to temp, walk twice, zip) vs. streaming from the game folder."""
+    print("ZIP export (best of 3)")
+    out = os.path.join(work, "export.zip")
+    def with_temp_copy():
+        with tempfile.TemporaryDirectory(dir=work) as tmp:
+            shutil.copytree(src, tmp, dirs_exist_ok=True)
+            sum(len(f) for _, _, f in os.walk(tmp))
+            with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for root, _, files in os.walk(tmp):
+                    for f in files: zipf.write(os.path.join(root, f), os.path.relpath(os.path.join(root, f), tmp))
+    def streamed():
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for root, _, files in os.walk(src):
+                for f in files: zipf.write(os.path.join(root, f), os.path.relpath(os.path.join(root, f), src))
+            zipf.writestr("dosbox.conf", "[autoexec]\n")
+    t_copy = timed(with_temp_copy); t_stream = timed(streamed)
+    print(f"  temp copy: {t_copy:6.2f}s   streamed: {t_stream:6.2f}s")
+
+def bench_zip_writer(work, src):
+    """zipfile on one core vs. ParallelZipWriter (1 worker and one per CPU)."""
+    print("ZIP deflate (best of 3)")
+    out = os.path.join(work, "deflate.zip")
+    paths = [(os.path.join(r, f), os.path.relpath(os.path.join(r, f), src)) for r, _, fs in os.walk(src) for f in fs]
+    def sequential():
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for full, arc in paths: zipf.write(full, arc)
+    def parallel(workers):
+        with ParallelZipWriter(out, workers=workers) as zipw:
+            for full, arc in paths: zipw.add_file(full, arc)
+    t_seq = timed(sequential); size_seq = os.path.getsize(out)
+    t_one = timed(lambda: parallel(1))
+    t_all = timed(lambda: parallel(None)); size_par = os.path.getsize(out)
+    print(f"  zipfile: {t_seq:6.2f}s ({size_seq / 1024 / 1024:.1f} MB)   parallel x1: {t_one:6.2f}s   "
+          f"parallel x{os.cpu_count()}: {t_all:6.2f}s ({size_par / 1024 / 1024:.1f} MB)")
+
+def bench_policy(work, src):
+    """Fixed deflate level 6 vs. every compression preset."""
+    print("Compression presets (best of 3)")
+    out = os.path.join(work, "policy.zip")
+    paths = [(os.path.join(r, f), os.path.relpath(os.path.join(r, f), src)) for r, _, fs in os.walk(src) for f in fs]
+    raw = sum(os.path.getsize(p) for p, _ in paths)
+    def fixed():
+        with ParallelZipWriter(out) as zipw:
+            for full, arc in paths: zipw.add_file(full, arc)
+    t = timed(fixed)
+    print(f"  {'fixed deflate-6':<18} {t:6.2f}s  {os.path.getsize(out) / 1024 / 1024:6.1f} MB")
+    for preset in PRESETS:
+        policy = None
+        def run():
+            nonlocal policy
+            policy = CompressionPolicy(preset)
+            with ParallelZipWriter(out) as zipw:
+                for full, arc in paths: zipw.add_file(full, arc, *policy.choose(full))
+        t = timed(run)
+        report = policy.make_report(raw, out, t)
+        print(f"  {PRESETS[preset]['label']:<18} {t:6.2f}s  {report['archive_bytes'] / 1024 / 1024:6.1f} MB  "
+              f"({report['compressed']} compressed, {report['stored']} stored)")
+
+def bench_runtime_splice(work):
+    """Standalone packages: recompressing the DOSBox tree every time vs. splicing it from RuntimeCache."""
+    print("DOSBox runtime per package (best of 3)")
+    runtime = os.path.join(work, "DOSBox")
+    make_game_folder(runtime, 16, seed=2)
+    out = os.path.join(work, "standalone.zip")
+    paths = [(os.path.join(r, f), os.path.relpath(os.path.join(r, f), runtime)) for r, _, fs in os.walk(runtime) for f in fs]
+    def recompress():
+        with ParallelZipWriter(out) as zipw:
+            for full, arc in paths: zipw.add_file(full, "GAME/DOSBox/" + arc)
+    cache = RuntimeCache(os.path.join(work, "cache"))
+    start = time.perf_counter(); cache.get(runtime); t_build = time.perf_counter() - start
+    def spliced():
+        cache_zip, members = cache.get(runtime)
+        with ParallelZipWriter(out) as zipw:
+            for zinfo, offset in members: zipw.add_raw(cache_zip, zinfo, offset, "GAME/DOSBox/" + zinfo.filename)
+    print(f"  recompress: {timed(recompress):6.2f}s   cached splice: {timed(spliced):6.2f}s   (one-time cache build: {t_build:.2f}s)")
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    work = tempfile.mkdtemp(prefix="dosbvault_bench_")
+    try:
+        src = os.path.join(work, "src")
+        total = make_game_folder(src, size_mb)
+        print(f"Game folder: {total / 1024 / 1024:.1f} MB, {os.cpu_count()} CPU(s)")
+        archives = build_archives(src, work)
+        bench_7z_extract(work, archives)
+        bench_export(work, src)
+        bench_zip_writer(work, src)
+        bench_policy(work, src)
+        bench_runtime_splice(work)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
@@ -80,6 +80,10 @@ def check_and_create_structure():
 
 
 if __name__ == "__main__":
+    # Bulk exports run on a process pool, needed when running as a frozen executable
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # check_and_create_structure() # Disabled to let Start Wizard handle it 
     
     # Splash Screen
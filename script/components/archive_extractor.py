@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+# py7zr >= 0.20 lets us hand it a WriterFactory so members are streamed to our own writers
+HAS_STREAMING_7ZIP = HAS_7ZIP and hasattr(py7zr, "WriterFactory") and hasattr(py7zr, "Py7zIO")
+
+# Upper bound for the memory the parallel block decoders may use together.
+# LZMA2 at -mx9 uses a 64 MB dictionary per block, so 256 MB allows ~4 decoders of the worst kind.
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+LZMA_MAX_DICTIONARY = 64 * 1024 * 1024
+
+
+class ExtractionCancelled(Exception):
+    """Raised from inside the extraction when the cancel event is set."""
+    pass
+
+
+class _ByteProgress:
+    """
+    Thread-safe byte counter shared by every member of one extraction.
+    py7zr decodes non-solid blocks on several threads, so all writers report here.
+    """
+    def __init__(self, total, callback=None, cancel_event=None, interval=0.1):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.cancel_event = cancel_event
+        self.interval = interval
+        self._last_report = 0
+        self._lock = threading.Lock()
+
+    def check_cancel(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ExtractionCancelled("Extraction cancelled.")
+
+    def add(self, count):
+        self.check_cancel()
+        report = None
+        with self._lock:
+            self.done += count
+            now = time.monotonic()
+            # Throttle: the callback usually ends up redrawing a Tk progress bar
+            if now - self._last_report >= self.interval or self.done >= self.total:
+                self._last_report = now
+                report = self.done
+        if report is not None and self.callback:
+            self.callback(min(report, self.total), self.total)
+
+    def finish(self):
+        if self.callback: self.callback(self.total, self.total)
+
+
+if HAS_STREAMING_7ZIP:
+    class _DiskWriter(py7zr.Py7zIO):
+        """Writes one archive member straight to disk, chunk by chunk, as py7zr decodes it."""
+        def __init__(self, path, progress):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.path = path
+            self.progress = progress
+            self._size = 0
+            self._fp = open(path, "wb")
+
+        def write(self, s):
+            self.progress.add(len(s))
+            written = self._fp.write(s)
+            self._size += written
+            return written
+
+        def read(self, size=None): return b""
+        def seek(self, offset, whence=0): return self._size
+        def seekable(self): return False # Tells py7zr not to rewind us on close
+        def flush(self): self._fp.flush()
+        def size(self): return self._size
+
+        def close(self):
+            if not self._fp.closed: self._fp.close()
+
+    class _DiskWriterFactory(py7zr.WriterFactory):
+        def __init__(self, progress):
+            self.progress = progress
+            self.writers = []
+            self._lock = threading.Lock()
+
+        def create(self, filename):
+            self.progress.check_cancel()
+            writer = _DiskWriter(filename, self.progress)
+            with self._lock: self.writers.append(writer)
+            return writer
+
+        def close_all(self):
+            # py7zr does not close the current member's writer when decoding fails or is cancelled
+            for writer in self.writers:
+                try: writer.close()
+                except Exception: pass
+
+
+class SevenZipExtractor:
+    """
+    Streaming .7z extraction with byte-level progress and cancellation.
+
+    Members are written to disk as they are decoded, so neither a member nor a
+    solid block is ever buffered in memory. Non-solid archives are decoded on
+    py7zr's worker threads (lzma releases the GIL) when the estimated decoder
+    memory fits into memory_budget, otherwise blocks are decoded one by one.
+    """
+    def __init__(self, archive_path, progress_callback=None, cancel_event=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        if not HAS_7ZIP: raise Exception("py7zr module not found.")
+        self.archive_path = archive_path
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.memory_budget = memory_budget
+
+    def _largest_block(self, z):
+        """Uncompressed size of the biggest block (7z 'folder'), None if the header can't tell."""
+        try:
+            folders = z.header.main_streams.unpackinfo.folders
+            return max(f.get_unpack_size() for f in folders) if folders else 0
+        except Exception:
+            return None
+
+    def use_parallel(self, z):
+        """Decides whether the blocks of an opened archive may be decoded concurrently."""
+        info = z.archiveinfo()
+        if info.solid or info.blocks < 2 or z.needs_password(): return False
+        largest = self._largest_block(z)
+        if largest is None: return False
+        workers = min(info.blocks, os.cpu_count() or 1)
+        # A decoder never needs a dictionary larger than the data it produces
+        per_worker = min(largest, LZMA_MAX_DICTIONARY)
+        return workers * per_worker <= self.memory_budget
+
+    def extract(self, dest_dir):
+        """Extracts the whole archive into dest_dir. Returns the number of bytes written."""
+        if not HAS_STREAMING_7ZIP:
+            # Old py7zr: no streaming hooks, fall back to a plain extractall
+            with py7zr.SevenZipFile(self.archive_path, mode='r') as z:
+                total = z.archiveinfo().uncompressed
+                z.extractall(path=dest_dir)
+            if self.progress_callback: self.progress_callback(total, total)
+            return total
+
+        os.makedirs(dest_dir, exist_ok=True)
+        with py7zr.SevenZipFile(self.archive_path, mode='r') as probe:
+            parallel = self.use_parallel(probe)
+
+        # py7zr only decodes blocks in parallel when it opened the file by name itself.
+        # Handing it an already opened file object forces the sequential, single-decoder path.
+        source = self.archive_path if parallel else open(self.archive_path, 'rb')
+        try:
+            with py7zr.SevenZipFile(source, mode='r') as z:
+                members = [f for f in z.files]
+                total = sum(f.uncompressed for f in members if not f.is_directory)
+                # Refuse to decode more than the header declares (decompression bombs)
+                z.max_extract_size = total
+
+                progress = _ByteProgress(total, self.progress_callback, self.cancel_event)
+                progress.check_cancel()
+                factory = _DiskWriterFactory(progress)
+                try:
+                    z.extractall(path=dest_dir, factory=factory)
+                finally:
+                    factory.close_all()
+        finally:
+            if not parallel: source.close()
+
+        self._restore_properties(members, dest_dir)
+        progress.finish()
+        return total
+
+    def _restore_properties(self, members, dest_dir):
+        """The factory path skips directory creation and timestamps, so apply them like extractall does."""
+        for f in members:
+            path = os.path.join(dest_dir, f.filename)
+            if f.is_directory:
+                os.makedirs(path, exist_ok=True)
+            if not os.path.exists(path): continue
+            try:
+                if (mtime := f.lastwritetime) is not None:
+                    ts = py7zr.py7zr.ArchiveTimestamp(mtime).totimestamp()
+                    os.utime(path, times=(ts, ts))
+            except Exception: pass
@@ -0,0 +1,174 @@
+import os
+import json
+import zipfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+from ..utils import lower_io_priority
+
+READ_CHUNK = 1024 * 1024
+ARCHIVE_EXTENSIONS = (".zip", ".7z")
+
+STATE_OK = "ok"
+STATE_CORRUPT = "corrupt"
+STATE_SKIPPED = "skipped" # e.g. encrypted, cannot be tested without the password
+
+
+class _VerifyStopped(Exception):
+    pass
+
+
+if HAS_7ZIP and hasattr(py7zr, "WriterFactory") and hasattr(py7zr, "Py7zIO"):
+    class _NullWriter(py7zr.Py7zIO):
+        """Discards a decoded member (py7zr checks its CRC) and stops the test when asked to."""
+        def __init__(self, stop_event):
+            self.stop_event = stop_event
+            self._size = 0
+
+        def write(self, s):
+            if self.stop_event is not None and self.stop_event.is_set(): raise _VerifyStopped()
+            self._size += len(s)
+            return len(s)
+
+        def read(self, size=None): return b""
+        def seek(self, offset, whence=0): return self._size
+        def seekable(self): return False
+        def flush(self): pass
+        def size(self): return self._size
+
+    class _NullWriterFactory(py7zr.WriterFactory):
+        def __init__(self, stop_event): self.stop_event = stop_event
+        def create(self, filename): return _NullWriter(self.stop_event)
+else:
+    _NullWriterFactory = None
+
+
+def verify_archive(path, stop_event=None):
+    """
+    CRC-checks every member of a ZIP or 7z archive without writing anything.
+    Returns (state, message), or None if stop_event was set before it finished.
+    """
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path, 'r') as zf:
+                for info in zf.infolist():
+                    if info.is_dir(): continue
+                    # ZipExtFile raises BadZipFile on a CRC mismatch when the member's end is reached
+                    with zf.open(info) as member:
+                        while member.read(READ_CHUNK):
+                            if stop_event is not None and stop_event.is_set(): return None
+            return STATE_OK, ""
+        if path.lower().endswith(".7z"):
+            if not HAS_7ZIP: return STATE_SKIPPED, "py7zr module not found."
+            if _NullWriterFactory is None:
+                # Old py7zr: no streaming hooks, the test cannot be stopped halfway
+                with py7zr.SevenZipFile(path, 'r') as z:
+                    if z.needs_password(): return STATE_SKIPPED, "Encrypted archive."
+                    bad = z.testzip()
+                return (STATE_CORRUPT, f"CRC error in {bad}") if bad else (STATE_OK, "")
+            # Decoded block by block into writers that check stop_event on every write
+            with open(path, 'rb') as f, py7zr.SevenZipFile(f, 'r') as z:
+                if z.needs_password(): return STATE_SKIPPED, "Encrypted archive."
+                try: z.extractall(factory=_NullWriterFactory(stop_event))
+                except _VerifyStopped: return None
+                except py7zr.exceptions.CrcError as e: return STATE_CORRUPT, f"CRC error in {e.args[2] if len(e.args) > 2 else 'a member'}"
+            return STATE_OK, ""
+        return STATE_CORRUPT, "Not a valid ZIP or 7z archive."
+    except RuntimeError as e:
+        if "encrypted" in str(e).lower() or "password" in str(e).lower(): return STATE_SKIPPED, "Encrypted archive."
+        return STATE_CORRUPT, str(e)
+    except Exception as e:
+        return STATE_CORRUPT, str(e) or e.__class__.__name__
+
+
+class ArchiveVerifier:
+    """
+    Verifies the archives of the library on background threads at idle I/O priority.
+    Results are cached in cache_path by archive path, size and mtime, so only new or
+    changed archives are tested again.
+    """
+    def __init__(self, cache_path, workers=2):
+        self.cache_path = cache_path
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self.running = False
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f: self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def _key(self, path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(self.cache, f, indent=1)
+        os.replace(tmp_path, self.cache_path)
+
+    def status(self, path):
+        """Cached result for the archive as it is on disk now, None if it was never checked or has changed since."""
+        entry = self.cache.get(self._key(path))
+        if not entry: return None
+        try: st = os.stat(path)
+        except OSError: return None
+        if entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns: return None
+        return entry
+
+    def is_corrupt(self, path):
+        entry = self.status(path)
+        return bool(entry) and entry["state"] == STATE_CORRUPT
+
+    def list_archives(self, folder):
+        if not os.path.isdir(folder): return []
+        return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(os.path.join(folder, f)))
+
+    def verify_folder(self, folder, callback=None, stop_event=None, force=False):
+        """
+        Tests every archive in folder that has no valid cached result (all of them with force=True).
+        callback(path, entry) is called from a worker thread after each archive.
+        """
+        archives = self.list_archives(folder)
+        with self._lock:
+            # Forget archives that are gone
+            keep = {self._key(p) for p in archives}
+            folder_key = self._key(folder)
+            for key in [k for k in self.cache if os.path.dirname(k) == folder_key and k not in keep]: del self.cache[key]
+        todo = [p for p in archives if force or self.status(p) is None]
+        if not todo: return
+
+        def check(path):
+            if stop_event is not None and stop_event.is_set(): return
+            try: st = os.stat(path)
+            except OSError: return
+            result = verify_archive(path, stop_event)
+            if result is None: return
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "state": result[0], "message": result[1],
+                     "checked": datetime.now().strftime("%Y-%m-%d %H:%M")}
+            with self._lock:
+                self.cache[self._key(path)] = entry
+                self._save()
+            if callback: callback(path, entry)
+
+        self.running = True
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, initializer=lower_io_priority) as pool:
+                list(pool.map(check, todo))
+        finally:
+            self.running = False
+
+    def report(self, folder):
+        """[(path, size, entry or None)] for every archive in folder, corrupt ones first."""
+        rows = []
+        for path in self.list_archives(folder):
+            rows.append((path, os.path.getsize(path), self.status(path)))
+        order = {STATE_CORRUPT: 0, None: 1, STATE_SKIPPED: 2, STATE_OK: 3}
+        rows.sort(key=lambda r: (order[r[2]["state"] if r[2] else None], os.path.basename(r[0]).lower()))
+        return rows
@@ -0,0 +1,203 @@
+import os
+import json
+import zipfile
+import tempfile
+from datetime import datetime
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+from ..utils import format_size
+from .install_manifest import file_crc32
+
+
+def safe_member_path(name):
+    """Archive member name as a "/" separated path inside the game folder, None if it is absolute or climbs out with ".."."""
+    rel = os.path.normpath(name.replace("\\", "/")).replace(os.sep, "/")
+    if os.path.isabs(rel) or os.path.splitdrive(rel)[0] or rel.startswith("/") or rel == ".." or rel.startswith("../"): return None
+    return rel
+
+
+class BackupChain:
+    """
+    Incremental save backups of one game.
+
+    <game>.chain.json in the backup folder lists the backup points, oldest first. Every point maps
+    each file backed up at that time to its chunks in the shared ChunkStore, so a point only adds
+    the chunks that changed and restoring any point writes every file exactly once.
+    """
+    def __init__(self, backup_dir, game_name, store):
+        self.backup_dir = backup_dir
+        self.game_name = game_name
+        self.store = store
+        self.index_path = os.path.join(backup_dir, f"{game_name}.chain.json")
+        self._load()
+
+    def _load(self):
+        """(Re)reads the index. Everything that changes the chain does so under the store's lock, starting from a fresh read."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f: self.points = json.load(f).get("points", [])
+        except (OSError, ValueError):
+            self.points = []
+
+    def _save(self):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({"game": self.game_name, "points": self.points}, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def latest(self):
+        return self.points[-1] if self.points else None
+
+    def get(self, point_id):
+        return next((p for p in self.points if p["id"] == point_id), None)
+
+    def _new_id(self, created):
+        base_id = point_id = created.strftime("%Y-%m-%d_%H%M%S")
+        suffix = 2
+        while self.get(point_id): point_id = f"{base_id}-{suffix}"; suffix += 1
+        return point_id
+
+    def _insert(self, point):
+        self.points.append(point)
+        self.points.sort(key=lambda p: p["created"])
+
+    def add(self, files, crc_cache, progress_callback=None):
+        """
+        files: [(path, rel_path)] that currently differ from the original install.
+        Chunks the ones that changed since the latest point. Returns the new point, None if nothing changed.
+        """
+        with self.store.lock:
+            self._load()
+            return self._add(files, crc_cache, progress_callback)
+
+    def _add(self, files, crc_cache, progress_callback):
+        prev = self.latest() or {"files": {}, "chunks": {}}
+        crcs = crc_cache.get_many([path for path, _ in files])
+        state, to_store = {}, []
+        for path, rel in files:
+            if path not in crcs: continue
+            rel = rel.replace(os.sep, "/")
+            st = os.stat(path)
+            state[rel] = [st.st_size, st.st_mtime_ns, crcs[path]]
+            old = prev["files"].get(rel)
+            if not (old and old[0] == st.st_size and old[2] == crcs[path]): to_store.append((path, rel))
+        if not to_store and set(state) == set(prev["files"]): return None
+
+        stored = {rel for _, rel in to_store}
+        chunks = {rel: prev["chunks"][rel] for rel in state if rel not in stored}
+        new_bytes = 0; total = sum(state[rel][0] for _, rel in to_store); done = 0
+        for path, rel in to_store:
+            chunks[rel], written = self.store.put_file(path)
+            new_bytes += written; done += state[rel][0]
+            if progress_callback: progress_callback(done, total)
+        created = datetime.now()
+        point = {"id": self._new_id(created), "created": created.strftime("%Y-%m-%d %H:%M:%S"), "files": state, "chunks": chunks, "new_bytes": new_bytes}
+        self._insert(point)
+        self._save()
+        return point
+
+    def restore(self, point_id, game_folder):
+        """Puts every file of the point back into game_folder. Returns the number of files written."""
+        with self.store.lock:
+            self._load()
+            return self._restore(point_id, game_folder)
+
+    def _restore(self, point_id, game_folder):
+        point = self.get(point_id)
+        if not point: raise Exception(f"Backup point {point_id} not found.")
+        for rel, chunk_ids in point["chunks"].items():
+            if safe_member_path(rel) is None: continue
+            dest = os.path.join(game_folder, *rel.split("/"))
+            self.store.write_file(chunk_ids, dest)
+            mtime_ns = point["files"][rel][1]
+            os.utime(dest, ns=(mtime_ns, mtime_ns))
+        return len(point["chunks"])
+
+    def import_archive(self, archive_path):
+        """Turns a single-archive backup (.save.7z / .save.zip) into a point of this chain. Returns the point."""
+        with self.store.lock:
+            self._load()
+            return self._import_archive(archive_path)
+
+    def _import_archive(self, archive_path):
+        point = {"id": None, "created": None, "files": {}, "chunks": {}, "new_bytes": 0}
+        def add_member(name, f, size, mtime_ns, crc):
+            rel = safe_member_path(name)
+            if rel is None:
+                print(f"Skipped {name} in {os.path.basename(archive_path)}: it points outside the game folder.")
+                return
+            point["files"][rel] = [size, mtime_ns, crc]
+            point["chunks"][rel], written = self.store.put_stream(f, size)
+            point["new_bytes"] += written
+
+        # Members are chunked as they are read, never held in memory whole
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path, 'r') as zf:
+                for info in zf.infolist():
+                    if info.is_dir(): continue
+                    with zf.open(info) as member: # Raises on a CRC mismatch at the member's end
+                        add_member(info.filename, member, info.file_size, int(datetime(*info.date_time).timestamp() * 10**9), info.CRC)
+        else:
+            if not HAS_7ZIP: raise Exception("py7zr module not found.")
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # py7zr refuses members that would extract outside tmp_dir
+                with py7zr.SevenZipFile(archive_path, 'r') as z: z.extractall(path=tmp_dir)
+                for root, _, names in os.walk(tmp_dir):
+                    for name in names:
+                        path = os.path.join(root, name)
+                        st = os.stat(path)
+                        with open(path, 'rb') as f: add_member(os.path.relpath(path, tmp_dir), f, st.st_size, st.st_mtime_ns, file_crc32(path, st.st_size))
+
+        # <game>_<date>.save.7z, the date part may carry a time since backup chains
+        stamp = os.path.basename(archive_path)[len(self.game_name) + 1:].split(".")[0]
+        created = None
+        for fmt in ("%Y-%m-%d_%H%M%S", "%Y-%m-%d"):
+            try: created = datetime.strptime(stamp, fmt); break
+            except ValueError: pass
+        created = created or datetime.fromtimestamp(os.path.getmtime(archive_path))
+
+        point["id"], point["created"] = self._new_id(created), created.strftime("%Y-%m-%d %H:%M:%S")
+        self._insert(point)
+        self._save()
+        return point
+
+    def prune(self, keep_last=10, keep_daily=7, keep_weekly=8):
+        """
+        Retention: keeps the newest keep_last points, plus the newest point of each of the last
+        keep_daily days and keep_weekly ISO weeks that have backups. Returns the number removed.
+        """
+        with self.store.lock:
+            self._load()
+            return self._prune(keep_last, keep_daily, keep_weekly)
+
+    def _prune(self, keep_last, keep_daily, keep_weekly):
+        newest_first = list(reversed(self.points))
+        keep = {p["id"] for p in newest_first[:keep_last]}
+        for limit, bucket in ((keep_daily, lambda d: d.date()), (keep_weekly, lambda d: d.isocalendar()[:2])):
+            seen = set()
+            for point in newest_first:
+                key = bucket(datetime.strptime(point["created"], "%Y-%m-%d %H:%M:%S"))
+                if key in seen: continue
+                if len(seen) >= limit: break
+                seen.add(key); keep.add(point["id"])
+        removed = len(self.points) - len(keep)
+        if removed:
+            self.points = [p for p in self.points if p["id"] in keep]
+            self._save()
+        return removed
+
+    def referenced_chunks(self):
+        return {chunk_id for p in self.points for ids in p["chunks"].values() for chunk_id in ids}
+
+    def describe(self):
+        """Rows for the restore dialog, newest first."""
+        rows = []; prev = None
+        for point in self.points:
+            stored = sum(1 for rel, ids in point["chunks"].items() if not prev or prev["chunks"].get(rel) != ids)
+            rows.append({"id": point["id"], "created": point["created"], "files": len(point["files"]), "stored": stored, "size": format_size(point.get("new_bytes", 0))})
+            prev = point
+        return rows[::-1]
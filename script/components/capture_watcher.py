@@ -0,0 +1,193 @@
+import os
+import re
+import shutil
+import struct
+import select
+import threading
+import ctypes
+import ctypes.util
+
+try:
+    from PIL import Image
+    HAS_PILLOW = True
+except ImportError:
+    HAS_PILLOW = False
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.inotify_init1; _libc.inotify_add_watch
+    HAS_INOTIFY = True
+except (OSError, AttributeError, TypeError):
+    HAS_INOTIFY = False
+
+CAPTURE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.avi', '.mp4', '.mkv', '.wav', '.mid', '.mp3'}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp'}
+THUMBS_DIR = ".thumbs"
+THUMB_SIZE = (250, 250) # Largest library grid size, smaller sizes scale down from it
+COUNTER_FILE = ".next_index"
+
+IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE, IN_ISDIR = 0x8, 0x80, 0x100, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def thumbnail_path(image_path):
+    """Where the library keeps the pre-scaled thumbnail of a screenshot."""
+    folder, name = os.path.split(image_path)
+    return os.path.join(folder, THUMBS_DIR, os.path.splitext(name)[0] + ".png")
+
+
+class CaptureIngestor:
+    """
+    Moves DOSBox captures into a game's screenshots folder as <game>_<NNN>.<ext>. The next index is
+    kept in a small counter file in that folder, so the folder is only scanned the first time.
+    """
+    def __init__(self, dest_dir, game_name):
+        self.dest_dir = dest_dir
+        self.game_name = game_name
+        self._lock = threading.Lock()
+        self._next = None
+
+    def _load_counter(self):
+        try:
+            with open(os.path.join(self.dest_dir, COUNTER_FILE), 'r') as f: return int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+        # No counter yet: continue after the highest index already in the folder
+        pattern = re.compile(rf"^{re.escape(self.game_name)}_(\d+)\.(?:png|jpg|jpeg|bmp|avi|mp4|mkv|wav|mid|mp3)$", re.IGNORECASE)
+        last_num = 0
+        for fname in os.listdir(self.dest_dir):
+            if match := pattern.match(fname): last_num = max(last_num, int(match.group(1)))
+        return last_num + 1
+
+    def ingest(self, src_path):
+        """Moves one finished capture in. Returns the new path, None if it was skipped or failed."""
+        ext = os.path.splitext(src_path)[1].lower()
+        if ext not in CAPTURE_EXTENSIONS or not os.path.isfile(src_path): return None
+        with self._lock:
+            os.makedirs(self.dest_dir, exist_ok=True)
+            if self._next is None: self._next = self._load_counter()
+            while True:
+                dest_path = os.path.join(self.dest_dir, f"{self.game_name}_{self._next:03d}{ext}")
+                if not os.path.exists(dest_path): break
+                self._next += 1
+            try:
+                shutil.move(src_path, dest_path)
+            except Exception as e:
+                print(f"Failed to move {src_path}: {e}")
+                return None
+            self._next += 1
+            try:
+                with open(os.path.join(self.dest_dir, COUNTER_FILE), 'w') as f: f.write(str(self._next))
+            except OSError as e: print(f"Could not save capture counter: {e}")
+        print(f"Moved capture: {src_path} -> {dest_path}")
+        if HAS_PILLOW and ext in IMAGE_EXTENSIONS: self._make_thumbnail(dest_path)
+        return dest_path
+
+    def _make_thumbnail(self, image_path):
+        thumb = thumbnail_path(image_path)
+        try:
+            os.makedirs(os.path.dirname(thumb), exist_ok=True)
+            with Image.open(image_path) as img:
+                img.thumbnail(THUMB_SIZE)
+                img.save(thumb)
+        except Exception as e:
+            print(f"Thumbnail failed for {image_path}: {e}")
+
+    def sweep(self, capture_dirs):
+        """Moves every capture left in the folders, oldest first. Returns the new paths."""
+        files = []
+        for cap_dir in capture_dirs:
+            if not os.path.isdir(cap_dir): continue
+            for name in os.listdir(cap_dir):
+                path = os.path.join(cap_dir, name)
+                if os.path.splitext(name)[1].lower() in CAPTURE_EXTENSIONS:
+                    try: files.append((os.path.getmtime(path), path))
+                    except OSError: pass
+        return [new for _, path in sorted(files) if (new := self.ingest(path))]
+
+
+class CaptureWatcher:
+    """
+    Watches the capture folders of a running session and hands each capture to on_file(path) once
+    DOSBox has finished writing it. Uses inotify (close-after-write) where available; otherwise
+    polls every interval seconds and treats a file as finished when its size and mtime stop changing.
+    Folders that do not exist yet are picked up when DOSBox creates them.
+    """
+    def __init__(self, capture_dirs, on_file, interval=1.0):
+        self.capture_dirs = [os.path.abspath(d) for d in capture_dirs]
+        self.on_file = on_file
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._wake_r = self._wake_w = None
+
+    def start(self):
+        if HAS_INOTIFY:
+            fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._wake_r, self._wake_w = os.pipe()
+                self._thread = threading.Thread(target=self._inotify_loop, args=(fd,), daemon=True, name="CaptureWatcher")
+                self._thread.start()
+                return self
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True, name="CaptureWatcher")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops watching and waits for the watcher thread. Captures still in the folders are left for a sweep."""
+        self._stop.set()
+        if self._wake_w is not None: os.write(self._wake_w, b"x")
+        if self._thread: self._thread.join(timeout=5)
+
+    def _emit(self, path):
+        try: self.on_file(path)
+        except Exception as e: print(f"Capture handling error: {e}")
+
+    def _inotify_loop(self, fd):
+        watches = {} # wd: folder
+        def add(path, mask):
+            wd = _libc.inotify_add_watch(fd, os.fsencode(path), mask)
+            if wd >= 0: watches[wd] = path
+        # Capture folders that exist are watched directly, missing ones through their parent
+        for cap_dir in self.capture_dirs:
+            if os.path.isdir(cap_dir): add(cap_dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+            elif os.path.isdir(os.path.dirname(cap_dir)): add(os.path.dirname(cap_dir), IN_CREATE | IN_MOVED_TO)
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd, self._wake_r], [], [])
+                if fd not in readable: continue
+                try: data = os.read(fd, 64 * 1024)
+                except BlockingIOError: continue
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                    name = data[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0").decode(errors="ignore")
+                    offset += _EVENT.size + length
+                    path = os.path.join(watches.get(wd, ""), name)
+                    if mask & IN_ISDIR:
+                        if path in self.capture_dirs:
+                            add(path, IN_CLOSE_WRITE | IN_MOVED_TO)
+                            for existing in os.listdir(path): self._emit(os.path.join(path, existing)) # Written before the watch was added
+                    elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and os.path.dirname(path) in self.capture_dirs:
+                        self._emit(path)
+        finally:
+            os.close(fd)
+            os.close(self._wake_r); os.close(self._wake_w)
+
+    def _poll_loop(self):
+        seen = {} # path: (size, mtime) at the previous poll
+        while not self._stop.wait(self.interval):
+            current = {}
+            for cap_dir in self.capture_dirs:
+                if not os.path.isdir(cap_dir): continue
+                for name in os.listdir(cap_dir):
+                    path = os.path.join(cap_dir, name)
+                    if os.path.splitext(name)[1].lower() not in CAPTURE_EXTENSIONS: continue
+                    try:
+                        st = os.stat(path)
+                        current[path] = (st.st_size, st.st_mtime)
+                    except OSError: pass
+            for path, stamp in current.items():
+                if seen.get(path) == stamp: self._emit(path) # Unchanged for a whole interval
+            seen = current
@@ -0,0 +1,163 @@
+import os
+import time
+import zlib
+import hashlib
+import threading
+
+MIN_CHUNK = 2 * 1024
+MAX_CHUNK = 64 * 1024
+# Top 13 bits of the gear hash all zero: a cut on average every 8 KB past MIN_CHUNK, decided by the last 64 bytes
+CUT_BELOW = 1 << 51
+MASK64 = 0xFFFFFFFFFFFFFFFF
+CDC_MIN_FILE = 256 * 1024 # Smaller files are cut into fixed MAX_CHUNK pieces, the gear scan costs more than it saves there
+READ_WINDOW = 4 * 1024 * 1024 # Large files are chunked while streaming through windows of this size
+GEAR = [int.from_bytes(hashlib.blake2b(bytes([i]), digest_size=8).digest(), 'little') for i in range(256)]
+
+_repo_locks = {}
+_repo_locks_guard = threading.Lock()
+
+
+def repo_lock(repo_dir):
+    """The one lock of a chunk repository. Backup points are added, pruned and garbage collected under it."""
+    key = os.path.normcase(os.path.abspath(repo_dir))
+    with _repo_locks_guard: return _repo_locks.setdefault(key, threading.RLock())
+
+
+def chunk_boundaries(data, final=True):
+    """
+    Content-defined (gear hash, FastCDC style) chunk ends for data. Inserting bytes into a file only
+    moves the chunks around the edit, the rest of the file still produces the same chunks.
+    final=False means more of the stream follows data: only cuts later bytes cannot move are returned.
+    """
+    n = len(data); ends = []; start = 0
+    gear = GEAR; mask = MASK64; cut_below = CUT_BELOW
+    limit = MIN_CHUNK if final else MAX_CHUNK - 1
+    while n - start > limit:
+        h = 0; lo = start + MIN_CHUNK; end = min(start + MAX_CHUNK, n); cut = end
+        for i, byte in enumerate(data[lo:end], lo):
+            h = ((h << 1) + gear[byte]) & mask
+            if h < cut_below:
+                cut = i + 1
+                break
+        ends.append(cut); start = cut
+    if final and start < n: ends.append(n)
+    return ends
+
+
+def fixed_boundaries(size):
+    """Chunk ends of a small file: MAX_CHUNK pieces, a file under MAX_CHUNK is a single chunk."""
+    return list(range(MAX_CHUNK, size, MAX_CHUNK)) + [size] if size else []
+
+
+class ChunkStore:
+    """
+    Stores every unique chunk of backed-up save data once, under chunks/<2 hex>/<blake2b id>.
+    Chunks are zlib-compressed unless that does not make them smaller (first byte says which).
+    """
+    def __init__(self, repo_dir, level=6):
+        self.repo_dir = repo_dir
+        self.chunks_dir = os.path.join(repo_dir, "chunks")
+        self.level = level
+        self.lock = repo_lock(repo_dir)
+
+    def _path(self, chunk_id):
+        return os.path.join(self.chunks_dir, chunk_id[:2], chunk_id)
+
+    def _store(self, piece):
+        """Writes one chunk unless the store has it. Returns (chunk id, bytes written to disk)."""
+        chunk_id = hashlib.blake2b(piece, digest_size=20).hexdigest()
+        path = self._path(chunk_id)
+        if os.path.exists(path):
+            try:
+                os.utime(path) # Marks the chunk as in use for a garbage collection already running
+                return chunk_id, 0
+            except OSError: pass
+        packed = zlib.compress(piece, self.level)
+        blob = b"Z" + packed if len(packed) < len(piece) else b"R" + bytes(piece)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f: f.write(blob)
+        os.replace(tmp_path, path)
+        return chunk_id, len(blob)
+
+    def put(self, data):
+        """Splits data into chunks, writes the new ones. Returns (chunk ids, bytes written to disk)."""
+        ids = []; written = 0; start = 0
+        ends = chunk_boundaries(data) if len(data) >= CDC_MIN_FILE else fixed_boundaries(len(data))
+        with self.lock, memoryview(data) as view:
+            for end in ends:
+                chunk_id, size = self._store(view[start:end]); start = end
+                ids.append(chunk_id); written += size
+        return ids, written
+
+    def put_file(self, path):
+        """put() for a file, streamed, see put_stream(). Returns (chunk ids, bytes written to disk)."""
+        with open(path, 'rb') as f: return self.put_stream(f, os.fstat(f.fileno()).st_size)
+
+    def put_stream(self, f, size):
+        """
+        Like put() for the size bytes readable from file object f, read in READ_WINDOW pieces so large
+        files never sit in memory whole. Produces the same chunks as put(data). Returns (chunk ids, bytes written to disk).
+        """
+        if size < CDC_MIN_FILE: return self.put(f.read())
+        ids = []; written = 0; buf = b""
+        with self.lock:
+            while True:
+                block = f.read(READ_WINDOW); final = not block
+                buf += block; start = 0
+                with memoryview(buf) as view:
+                    for end in chunk_boundaries(buf, final):
+                        chunk_id, stored = self._store(view[start:end]); start = end
+                        ids.append(chunk_id); written += stored
+                buf = buf[start:]
+                if final: return ids, written
+
+    def get(self, chunk_id):
+        try:
+            with open(self._path(chunk_id), 'rb') as f: blob = f.read()
+        except OSError:
+            raise Exception(f"Backup chunk {chunk_id} is missing.")
+        return zlib.decompress(blob[1:]) if blob[:1] == b"Z" else blob[1:]
+
+    def write_file(self, chunk_ids, dest):
+        """Reassembles a file from its chunks (written to a temporary name, then moved into place)."""
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp_path = dest + ".restore-tmp"
+        try:
+            with open(tmp_path, 'wb') as out:
+                for chunk_id in chunk_ids: out.write(self.get(chunk_id))
+            os.replace(tmp_path, dest)
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+
+    def collect_garbage(self, referenced):
+        """
+        Deletes chunks no backup point references. Returns (chunks removed, bytes freed).
+        Callers hold self.lock while collecting referenced. Temporary files and chunks written
+        or reused after the collection started are never deleted.
+        """
+        removed = freed = 0
+        started_ns = time.time_ns()
+        with self.lock:
+            if not os.path.isdir(self.chunks_dir): return removed, freed
+            for sub in os.listdir(self.chunks_dir):
+                sub_dir = os.path.join(self.chunks_dir, sub)
+                for name in os.listdir(sub_dir):
+                    if name in referenced or name.endswith(".tmp"): continue
+                    path = os.path.join(sub_dir, name)
+                    try:
+                        st = os.stat(path)
+                        if st.st_mtime_ns >= started_ns: continue
+                        os.remove(path)
+                    except OSError: continue
+                    freed += st.st_size; removed += 1
+                try: os.rmdir(sub_dir) # Only succeeds when empty
+                except OSError: pass
+        return removed, freed
+
+    def stats(self):
+        count = size = 0
+        if os.path.isdir(self.chunks_dir):
+            for root, _, files in os.walk(self.chunks_dir):
+                for name in files: count += 1; size += os.path.getsize(os.path.join(root, name))
+        return {"chunks": count, "bytes": size}
@@ -0,0 +1,115 @@
+import os
+import math
+import zipfile
+import collections
+from ..utils import format_size
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+# Payloads that are already compressed: deflating them again only burns CPU.
+# Disc images (.iso/.bin/.img) are deliberately not listed, DOS CDs are often half
+# empty or plain data, so the entropy sample decides for them.
+STORE_EXTENSIONS = {
+    ".zip", ".7z", ".rar", ".arj", ".lzh", ".lha", ".cab", ".gz", ".tgz", ".bz2", ".xz", ".zst",
+    ".mp3", ".ogg", ".oga", ".opus", ".flac", ".m4a", ".aac", ".wma",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp",
+    ".avi", ".mp4", ".mkv", ".webm", ".mov", ".wmv", ".smk", ".bik",
+    ".chd", ".pdf",
+}
+
+SAMPLE_SIZE = 64 * 1024
+MIN_SAMPLE_FILE = 4 * 1024 # Smaller files are just compressed, sampling costs more than it saves
+
+# level: deflate level for compressible members (the "max" band).
+# fast_entropy, fast_level: members whose sample is at/above fast_entropy bits/byte compress
+#                           poorly anyway and get the cheaper fast_level.
+# store_entropy: bits/byte of the sample at/above which a member is stored.
+# lzma_preset: whole-archive preset for .7z (py7zr applies one filter chain per archive),
+#              None keeps py7zr's default chain (BCJ + LZMA2).
+PRESETS = {
+    "fastest": {"label": "Fastest export", "level": 1, "fast_entropy": 6.0, "fast_level": 1, "store_entropy": 7.2, "lzma_preset": 1},
+    "balanced": {"label": "Balanced", "level": 6, "fast_entropy": 6.5, "fast_level": 1, "store_entropy": 7.6, "lzma_preset": None},
+    "smallest": {"label": "Smallest archive", "level": 9, "fast_entropy": 7.5, "fast_level": 6, "store_entropy": 7.95, "lzma_preset": 9},
+}
+DEFAULT_PRESET = "balanced"
+
+
+def sample_entropy(path, sample_size=SAMPLE_SIZE):
+    """Shannon entropy (bits per byte) of the first block of a file. 8.0 means random."""
+    try:
+        with open(path, 'rb') as f: data = f.read(sample_size)
+    except OSError:
+        return 0.0
+    if not data: return 0.0
+    n = len(data)
+    return -sum(c / n * math.log2(c / n) for c in collections.Counter(data).values())
+
+
+class CompressionPolicy:
+    """
+    Chooses store / fast / max compression per archive member.
+    Extension rules first, then the entropy sample of the first block falls into a band:
+    below fast_entropy the preset's level, up to store_entropy the fast level, above that stored.
+    """
+    def __init__(self, preset=DEFAULT_PRESET):
+        if preset not in PRESETS: preset = DEFAULT_PRESET
+        self.preset = preset
+        self.options = PRESETS[preset]
+        self.counts = collections.Counter()
+
+    def choose(self, path, size=None):
+        """Returns (compress_type, level) for a ZIP member. level is None for stored members."""
+        ext = os.path.splitext(path)[1].lower()
+        if size is None:
+            try: size = os.path.getsize(path)
+            except OSError: size = 0
+
+        entropy = sample_entropy(path) if size >= MIN_SAMPLE_FILE and ext not in STORE_EXTENSIONS else 0.0
+        if ext in STORE_EXTENSIONS or entropy >= self.options["store_entropy"]:
+            decision = "store"
+        elif entropy >= self.options["fast_entropy"]:
+            decision = "fast"
+        else:
+            decision = "max"
+
+        self.counts[decision] += 1
+        if decision == "store": return zipfile.ZIP_STORED, None
+        return zipfile.ZIP_DEFLATED, self.options["fast_level" if decision == "fast" else "level"]
+
+    def sevenzip_filters(self):
+        if not HAS_7ZIP or self.options["lzma_preset"] is None: return None
+        return [{"id": py7zr.FILTER_LZMA2, "preset": self.options["lzma_preset"]}]
+
+    def make_report(self, raw_bytes, archive_path, seconds):
+        """Summary shown after an export: what the compression bought and what it cost."""
+        try: archive_bytes = os.path.getsize(archive_path)
+        except OSError: archive_bytes = 0
+        return {
+            "preset": self.preset,
+            "raw_bytes": raw_bytes,
+            "archive_bytes": archive_bytes,
+            "saved_bytes": raw_bytes - archive_bytes,
+            "seconds": seconds,
+            "stored": self.counts["store"],
+            "compressed": self.counts["fast"] + self.counts["max"],
+            "fast": self.counts["fast"],
+        }
+
+
+def describe_report(report):
+    """One human readable block for message boxes."""
+    raw = report["raw_bytes"]; saved = report["saved_bytes"]
+    pct = (saved / raw * 100) if raw else 0
+    seconds = max(report["seconds"], 0.001)
+    lines = [
+        f"Preset: {PRESETS[report['preset']]['label']}",
+        f"Size: {format_size(raw)} -> {format_size(report['archive_bytes'])} (saved {format_size(max(saved, 0))}, {pct:.0f}%)",
+        f"Time: {report['seconds']:.1f} s ({format_size(max(saved, 0) / seconds)} saved per second)",
+    ]
+    if report["stored"] or report["compressed"]:
+        lines.append(f"Members: {report['compressed']} compressed ({report.get('fast', 0)} at the fast level), {report['stored']} stored as-is")
+    return "\n".join(lines)
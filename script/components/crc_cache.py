@@ -0,0 +1,82 @@
+import os
+import json
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+from .install_manifest import file_crc32
+
+
+def archive_member_crcs(path):
+    """{normalized member path: (size, crc32)} straight from the ZIP central directory or the 7z header."""
+    members = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path, 'r') as zf:
+            for info in zf.infolist():
+                if not info.is_dir(): members[os.path.normpath(info.filename)] = (info.file_size, info.CRC)
+    elif path.lower().endswith(".7z"):
+        if not HAS_7ZIP: raise Exception("py7zr module not found.")
+        with py7zr.SevenZipFile(path, 'r') as zf:
+            for info in zf.list():
+                # Members without a stored CRC (empty files) get None and are compared by size only
+                if not info.is_directory: members[os.path.normpath(info.filename)] = (info.uncompressed, info.crc32)
+    return members
+
+
+class CrcCache:
+    """
+    Persistent (path, size, mtime) -> CRC32 table, so repeated backups only hash files
+    that changed since the last run. Missing CRCs are computed on a thread pool.
+    """
+    def __init__(self, cache_path, workers=None):
+        self.cache_path = cache_path
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f: self.table = json.load(f)
+        except (OSError, ValueError):
+            self.table = {} # {abs path: [size, mtime_ns, crc]}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(self.table, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def get_many(self, paths, progress_callback=None):
+        """{path: crc32} for every readable path. progress_callback(done, total) counts hashed files only."""
+        result, to_hash = {}, []
+        for path in paths:
+            try: st = os.stat(path)
+            except OSError: continue
+            key = os.path.abspath(path)
+            entry = self.table.get(key)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns: result[path] = entry[2]
+            else: to_hash.append((path, key, st))
+        if not to_hash: return result
+
+        def hash_one(item):
+            path, key, st = item
+            try: return file_crc32(path, st.st_size)
+            except OSError: return None
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for i, ((path, key, st), crc) in enumerate(zip(to_hash, pool.map(hash_one, to_hash))):
+                if crc is None: continue
+                result[path] = crc
+                with self._lock: self.table[key] = [st.st_size, st.st_mtime_ns, crc]
+                if progress_callback: progress_callback(i + 1, len(to_hash))
+        with self._lock: self._save()
+        return result
+
+    def forget(self, folder):
+        """Drops the entries below folder, e.g. after the game was uninstalled."""
+        prefix = os.path.join(os.path.abspath(folder), "")
+        with self._lock:
+            self.table = {k: v for k, v in self.table.items() if not k.startswith(prefix)}
+            self._save()
@@ -0,0 +1,281 @@
+import os
+import json
+import stat
+import shutil
+import hashlib
+import threading
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+FICLONE = 0x40049409 # Linux ioctl, copy-on-write clone on btrfs/xfs/bcachefs
+HASH_CHUNK = 1024 * 1024
+PREHASH_SIZE = 64 * 1024
+MIN_FILE_SIZE = 4096 # Smaller files do not even fill a disk block
+
+# Files games rewrite in place (settings, saves, high scores) are never shared, whatever their content
+MUTABLE_EXTENSIONS = {".cfg", ".ini", ".sav", ".hi", ".hsc", ".scr", ".sco", ".log", ".tmp", ".bak", ".$$$", ".cnf", ".set", ".opt", ".swp"}
+
+def clone_file(src, dst):
+    """Copy-on-write clone of src to dst. Raises OSError where the filesystem (or OS) cannot do it."""
+    if not HAS_FCNTL: raise OSError("Reflinks are not supported on this system.")
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+def probe_reflink(directory):
+    """True if files in directory can be cloned copy-on-write."""
+    if not HAS_FCNTL: return False
+    os.makedirs(directory, exist_ok=True)
+    src, dst = os.path.join(directory, "probe.src"), os.path.join(directory, "probe.dst")
+    try:
+        with open(src, 'wb') as f: f.write(b"probe")
+        clone_file(src, dst)
+        return True
+    except OSError:
+        return False
+    finally:
+        for p in (src, dst):
+            if os.path.exists(p): os.remove(p)
+
+def is_mutable(name):
+    name = name.lower(); ext = os.path.splitext(name)[1]
+    return ext in MUTABLE_EXTENSIONS or ext[1:].isdigit() or "save" in name or "sav" in ext
+
+
+class DedupeStore:
+    """
+    Content store for byte-identical files across installed games.
+
+    Duplicates are replaced by reflinks (copy-on-write clones) where the filesystem supports
+    them, otherwise by hardlinks to a read-only object in the store. Hardlinked files share one
+    inode, so they are kept read-only, files games are known to rewrite are never linked, and the
+    app unshares a game before writing into it (launching it, restoring backups) or deleting it. Hardlinked
+    files are only grouped with files of the same mtime, because save tracking goes by mtime.
+
+    Everything is recorded in a manifest inside the store and can be undone with unshare().
+    """
+    STORE_NAME = ".dedupe_store"
+
+    def __init__(self, games_root):
+        self.games_root = games_root
+        self.store_dir = os.path.join(games_root, self.STORE_NAME)
+        self.objects_dir = os.path.join(self.store_dir, "objects")
+        self.manifest_path = os.path.join(self.store_dir, "manifest.json")
+        self._lock = threading.Lock()
+        self._reflink = None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f: self.links = json.load(f).get("links", {})
+        except (OSError, ValueError):
+            self.links = {} # {path relative to games_root: {"object", "size", "mode", "mtime_ns"}}
+
+    # --- Helpers ---
+
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.games_root)).replace(os.sep, "/")
+
+    def _abs(self, rel):
+        return os.path.join(self.games_root, *rel.split("/"))
+
+    def _object_path(self, key):
+        return os.path.join(self.objects_dir, key[:2], key)
+
+    def _under(self, rel, folder_rel):
+        return folder_rel is None or rel == folder_rel or rel.startswith(folder_rel + "/")
+
+    def _save(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({"links": self.links}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _hash(self, path, limit=None):
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            remaining = limit
+            while remaining is None or remaining > 0:
+                chunk = f.read(HASH_CHUNK if remaining is None else min(HASH_CHUNK, remaining))
+                if not chunk: break
+                h.update(chunk)
+                if remaining is not None: remaining -= len(chunk)
+        return h.hexdigest()
+
+    def reflink_supported(self):
+        if self._reflink is None: self._reflink = probe_reflink(self.store_dir)
+        return self._reflink
+
+    def _make_read_only(self, path):
+        os.chmod(path, stat.S_IMODE(os.stat(path).st_mode) & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+    def is_linked(self, rel, st=None):
+        """True if the file is still the one the manifest recorded (not replaced or rewritten since)."""
+        entry = self.links.get(rel)
+        if not entry: return False
+        try:
+            st = st or os.stat(self._abs(rel))
+            if entry["mode"] == "hardlink":
+                obj = os.stat(self._object_path(entry["object"]))
+                return (st.st_ino, st.st_dev) == (obj.st_ino, obj.st_dev)
+            return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+        except OSError:
+            return False
+
+    def _collect_garbage(self):
+        """Drops stale manifest entries and objects nothing links to anymore."""
+        self.links = {rel: e for rel, e in self.links.items() if self.is_linked(rel)}
+        used = {e["object"] for e in self.links.values()}
+        if os.path.isdir(self.objects_dir):
+            for root, _, files in os.walk(self.objects_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    # An object with other links left is still shared by files moved outside our bookkeeping,
+                    # keep it so the next pass adopts them again
+                    if name not in used and os.stat(path).st_nlink == 1: os.remove(path)
+                if root != self.objects_dir and not os.listdir(root): os.rmdir(root)
+        self._save()
+
+    # --- Public API ---
+
+    def dedupe(self, folders=None, stop_event=None):
+        """
+        Links identical files in the given game folders (all of games_root if None) to the store.
+        Only files whose size collides with another candidate or a stored object get hashed.
+        Returns {"mode", "files", "bytes", "scanned"} for this pass.
+        """
+        with self._lock:
+            self._collect_garbage()
+            mode = "reflink" if self.reflink_supported() else "hardlink"
+            roots = [os.path.abspath(f) for f in folders] if folders else [os.path.abspath(self.games_root)]
+
+            # 1. Stat everything, candidates are grouped by size
+            by_size = {}; scanned = 0
+            for top in roots:
+                for root, dirs, files in os.walk(top):
+                    # Dot folders in the games root are the app's own (this store, session snapshots)
+                    if os.path.abspath(root) == os.path.abspath(self.games_root): dirs[:] = [d for d in dirs if not d.startswith(".")]
+                    for name in files:
+                        path = os.path.join(root, name)
+                        try: st = os.lstat(path)
+                        except OSError: continue
+                        if not stat.S_ISREG(st.st_mode) or st.st_size < MIN_FILE_SIZE or is_mutable(name): continue
+                        scanned += 1
+                        rel = self._rel(path)
+                        if self.is_linked(rel, st): continue
+                        by_size.setdefault(st.st_size, []).append((rel, path, st))
+            stored = {}
+            for e in self.links.values(): stored.setdefault(e["size"], set()).add(e["object"])
+
+            report = {"mode": mode, "files": 0, "bytes": 0, "scanned": scanned}
+            for size, members in by_size.items():
+                if stop_event is not None and stop_event.is_set(): break
+                if len(members) < 2 and size not in stored: continue
+                # 2. Cheap pre-hash of the first 64 KB splits most large same-size files apart
+                groups = {}
+                for m in members:
+                    try: key = self._hash(m[1], PREHASH_SIZE) if size > PREHASH_SIZE else ""
+                    except OSError: continue
+                    groups.setdefault(key, []).append(m)
+                for pre_members in groups.values():
+                    if len(pre_members) < 2 and size not in stored: continue
+                    # 3. Full hash; hardlinks share one mtime, so they only group with equal (FAT precision) mtimes
+                    full = {}
+                    for rel, path, st in pre_members:
+                        try: digest = self._hash(path)
+                        except OSError: continue
+                        key = digest if mode == "reflink" else f"{digest}-{int(st.st_mtime) // 2}"
+                        full.setdefault(key, []).append((rel, path, st))
+                    for key, same in full.items():
+                        obj_path = self._object_path(key)
+                        if len(same) < 2 and not os.path.exists(obj_path): continue
+                        self._link_group(key, obj_path, same, mode, report)
+            self._save()
+            return report
+
+    def _link_group(self, key, obj_path, members, mode, report):
+        if not os.path.exists(obj_path):
+            # The first file becomes the stored object
+            rel, path, st = members[0]
+            os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+            try:
+                if mode == "reflink": clone_file(path, obj_path)
+                else: os.link(path, obj_path)
+                self._make_read_only(obj_path)
+            except OSError as e:
+                print(f"Dedupe: cannot store {rel}: {e}")
+                if os.path.exists(obj_path) and mode == "reflink": os.remove(obj_path)
+                return
+            st = os.stat(path)
+            self.links[rel] = {"object": key, "size": st.st_size, "mode": mode, "mtime_ns": st.st_mtime_ns}
+            members = members[1:]
+        for rel, path, st in members:
+            try:
+                now = os.stat(path)
+                if (now.st_size, now.st_mtime_ns) != (st.st_size, st.st_mtime_ns): continue # Changed since it was hashed
+                tmp_path = path + ".dedupe-tmp"
+                if mode == "reflink":
+                    clone_file(obj_path, tmp_path)
+                    shutil.copystat(path, tmp_path)
+                else:
+                    os.link(obj_path, tmp_path)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Dedupe: cannot link {rel}: {e}")
+                if os.path.exists(path + ".dedupe-tmp"): os.remove(path + ".dedupe-tmp")
+                continue
+            st = os.stat(path)
+            self.links[rel] = {"object": key, "size": st.st_size, "mode": mode, "mtime_ns": st.st_mtime_ns}
+            report["files"] += 1; report["bytes"] += st.st_size
+
+    def unshare(self, folder=None, hardlinks_only=False):
+        """
+        Gives every linked file under folder (everything if None) its own writable copy again. Returns the file count.
+        hardlinks_only keeps the copy-on-write clones, which are writable already.
+        """
+        with self._lock:
+            folder_rel = self._rel(folder) if folder else None
+            matched = [rel for rel, entry in self.links.items() if self._under(rel, folder_rel) and not (hardlinks_only and entry["mode"] != "hardlink")]
+            if not matched: return 0
+            count = 0
+            for rel in matched:
+                entry = self.links[rel]
+                path = self._abs(rel)
+                if entry["mode"] == "hardlink" and self.is_linked(rel):
+                    tmp_path = path + ".dedupe-tmp"
+                    shutil.copy2(self._object_path(entry["object"]), tmp_path)
+                    os.chmod(tmp_path, stat.S_IMODE(os.stat(tmp_path).st_mode) | stat.S_IWUSR)
+                    os.replace(tmp_path, path)
+                    count += 1
+                del self.links[rel]
+            self._collect_garbage()
+            return count
+
+    def release(self, folder):
+        """Removes the linked files of a game folder that is about to be deleted, without touching the shared inodes."""
+        with self._lock:
+            folder_rel = self._rel(folder)
+            for rel, entry in list(self.links.items()):
+                if not self._under(rel, folder_rel): continue
+                path = self._abs(rel)
+                if entry["mode"] == "hardlink" and self.is_linked(rel):
+                    try: os.remove(path)
+                    except PermissionError:
+                        # Windows refuses to delete read-only files, and the attribute belongs to the shared inode
+                        os.chmod(path, stat.S_IWRITE); os.remove(path)
+                        self._make_read_only(self._object_path(entry["object"]))
+                del self.links[rel]
+            self._collect_garbage()
+
+    def rename(self, old_folder, new_folder):
+        """Follows a renamed game folder."""
+        with self._lock:
+            old_rel, new_rel = self._rel(old_folder), self._rel(new_folder)
+            self.links = {(new_rel + rel[len(old_rel):] if self._under(rel, old_rel) else rel): e for rel, e in self.links.items()}
+            self._save()
+
+    def stats(self):
+        """{"files", "objects", "bytes"}: linked files, stored objects and the space they save."""
+        groups = {}
+        for entry in self.links.values(): groups.setdefault(entry["object"], []).append(entry["size"])
+        return {"files": len(self.links), "objects": len(groups), "bytes": sum(sizes[0] * (len(sizes) - 1) for sizes in groups.values())}
@@ -237,9 +237,7 @@ class DetailPanel(tb.Frame):
         
         # Determine if Staging
         is_staging = False
-        custom_path = details.get("custom_dosbox_path", "")
-        if "staging" in custom_path.lower(): is_staging = True
-        elif not custom_path and "staging" in self.app.logic.default_dosbox_exe.lower(): is_staging = True
+        if self.app.logic.engine_type_for(details.get("custom_dosbox_path")) == "dosbox-staging": is_staging = True
         
         cpu_settings = ds.get('cpu', {}); cpu_cycles = cpu_settings.get('cpu_cycles', 'auto')
         
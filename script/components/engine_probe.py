@@ -0,0 +1,125 @@
+import os
+import re
+import json
+import threading
+import subprocess
+
+# Config files shipped next to the executable, per variant, in order of preference
+CONF_CANDIDATES = {
+    "dosbox-staging": ["dosbox-staging.conf", "dosbox-staging.reference.conf", "dosbox.conf"],
+    "dosbox-x": ["dosbox-x.reference.full.conf", "dosbox-x.reference.conf", "dosbox-x.conf", "dosbox.conf"],
+    "dosbox": ["dosbox.conf", "dosbox-0.74.conf"],
+}
+PROBE_VERSION = 3 # Bump to re-probe every engine after changing what a probe records
+
+
+def guess_variant(text):
+    """Engine type from a path, file name or version banner. "dosbox" if nothing points elsewhere."""
+    text = text.lower()
+    if "staging" in text: return "dosbox-staging"
+    if "dosbox-x" in text or "dosbox_x" in text: return "dosbox-x"
+    return "dosbox"
+
+
+class EngineProbe:
+    """
+    What each installed DOSBox binary is: variant, version, its reference config and the config
+    sections/keys it supports with their defaults. A binary is probed once (version switch, then the
+    config next to it or -printconf) and the result is kept in a JSON cache keyed by path, size
+    and mtime, so replacing or updating the binary re-probes it.
+    Probing runs subprocesses: the UI thread only reads the cache, see cached().
+    """
+    def __init__(self, cache_path, parse_conf, detect_version):
+        self.cache_path = cache_path
+        self.parse_conf = parse_conf # text -> {section: {key: default}}, lowercase names
+        self.detect_version = detect_version # conf text -> (variant label, version)
+        self._lock = threading.Lock()
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f: self.engines = json.load(f).get("engines", {})
+        except (OSError, ValueError):
+            self.engines = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({"engines": self.engines}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _cached(self, exe_path):
+        """(absolute path, stat, cached info or None); the stat is None if the binary does not exist."""
+        path = os.path.abspath(exe_path)
+        try: st = os.stat(path)
+        except OSError: return path, None, None
+        with self._lock:
+            info = self.engines.get(path)
+            if info and (info["size"], info["mtime_ns"], info.get("probe")) == (st.st_size, st.st_mtime_ns, PROBE_VERSION): return path, st, info
+        return path, st, None
+
+    def cached(self, exe_path):
+        """Probe result of the binary if it is cached and current, otherwise None. Never probes."""
+        return self._cached(exe_path)[2] if exe_path else None
+
+    def get(self, exe_path):
+        """Probe result of the binary (probed now unless cached), None if it does not exist."""
+        if not exe_path: return None
+        path, st, info = self._cached(exe_path)
+        if st is None or info is not None: return info
+        info = self._probe(path)
+        info.update({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "probe": PROBE_VERSION})
+        with self._lock:
+            self.engines[path] = info
+            try: self._save()
+            except OSError as e: print(f"Could not save engine probe cache: {e}")
+        return info
+
+    def _run(self, exe_path, args):
+        try:
+            result = subprocess.run([exe_path] + args, capture_output=True, text=True, timeout=5, cwd=os.path.dirname(exe_path),
+                                    creationflags=0x08000000 if os.name == 'nt' else 0)
+            return (result.stdout or "") + (result.stderr or "")
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return ""
+
+    def _probe(self, exe_path):
+        variant = guess_variant(exe_path)
+        # Staging only knows --version; original DOSBox and DOSBox-X print it with -version
+        banner = self._run(exe_path, ["--version" if variant == "dosbox-staging" else "-version"])
+        if guess_variant(banner) != "dosbox": variant = guess_variant(banner)
+        match = re.search(r'(\d+\.\d+(?:\.\d+)*(?:[-.][\w.]+)?)', banner)
+        version = match.group(1) if match else None
+
+        exe_dir = os.path.dirname(exe_path)
+        conf_path = next((os.path.join(exe_dir, name) for name in CONF_CANDIDATES[variant] if os.path.isfile(os.path.join(exe_dir, name))), None)
+        if not conf_path:
+            # -printconf prints where the engine keeps its user config
+            printed = self._run(exe_path, ["-printconf"]).strip().splitlines()
+            if printed and os.path.isfile(printed[-1].strip()): conf_path = printed[-1].strip()
+
+        content = ""
+        if conf_path:
+            try:
+                with open(conf_path, 'r', encoding='utf-8', errors='ignore') as f: content = f.read()
+            except OSError:
+                conf_path = None
+        label, conf_version = self.detect_version(content)
+        if not version and conf_version != "Unknown": version = conf_version
+        if variant == "dosbox" and label in ("Staging", "X"): variant = "dosbox-staging" if label == "Staging" else "dosbox-x"
+        return {"variant": variant, "label": {"dosbox-staging": "Staging", "dosbox-x": "X"}.get(variant, "Original"), "version": version or "Unknown",
+                "conf_path": conf_path, "defaults": self.parse_conf(content) if content else {}}
+
+    def variant(self, exe_path, probe=True):
+        """Engine type of the binary, guessed from its path when it cannot be probed (or is not cached and probe is False)."""
+        info = self.get(exe_path) if probe else self.cached(exe_path)
+        return info["variant"] if info else guess_variant(exe_path or "")
+
+    def defaults(self, exe_path):
+        """{section: {key: default}} of the binary's reference config from the cache, None if it is not probed yet or has no config."""
+        info = self.cached(exe_path)
+        return info["defaults"] if info and info["defaults"] else None
+
+    def supports(self, exe_path, section, key=None):
+        """True if the engine's reference config has the section (and key). Engines without cached defaults support everything."""
+        defaults = self.defaults(exe_path)
+        if defaults is None: return True
+        keys = defaults.get(section.lower())
+        return keys is not None and (key is None or key.lower() in keys)
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import collections
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# --- Pool process side ---
+
+_worker_logic = None
+
+def _init_worker(base_dir, settings_path, zip_threads):
+    """Every pool process gets its own GameLogic, set up like the app's but without the library migration."""
+    global _worker_logic
+    os.chdir(base_dir)
+    from ..settings import SettingsManager
+    from ..logic import GameLogic
+    from . import zip_writer
+    # N processes x one deflate thread per CPU would oversubscribe the machine
+    zip_writer.DEFAULT_WORKERS = zip_threads
+    _worker_logic = GameLogic(SettingsManager(settings_path), migrate=False)
+
+def _run_export_job(game, fmt, output, last_fingerprint):
+    logic = _worker_logic
+    start = time.time()
+    fingerprint, game_bytes = logic.get_export_fingerprint(game, fmt)
+    result = {"pid": os.getpid(), "fingerprint": fingerprint, "bytes": game_bytes}
+    if fingerprint == last_fingerprint and os.path.exists(output):
+        result["status"] = "skipped"
+    else:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        # Export under a temporary name, a crash must never leave a half archive that looks finished
+        base, ext = os.path.splitext(output)
+        part_path = f"{base}.part{ext}"
+        try:
+            logic.export_game(game, fmt, part_path)
+            os.replace(part_path, output)
+        finally:
+            if os.path.exists(part_path): os.remove(part_path)
+        result["status"] = "done"
+    result["seconds"] = time.time() - start
+    return result
+
+
+# --- App side ---
+
+class ExportQueue:
+    """
+    Bulk export jobs (game, format, output) persisted to queue_path after every change,
+    so an interrupted run resumes with the jobs that did not finish. Jobs run on a process
+    pool (py7zr is GIL-bound). Outputs whose source fingerprint did not change since the
+    last successful export are skipped, fingerprints are kept in index_path.
+    """
+    FINISHED = ("done", "skipped")
+
+    def __init__(self, queue_path, index_path):
+        self.queue_path = queue_path
+        self.index_path = index_path
+        self.jobs = self._load(queue_path).get("jobs", [])
+        self.fingerprints = self._load(index_path)
+
+    def _load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def save(self):
+        self._write(self.queue_path, {"jobs": self.jobs})
+        self._write(self.index_path, self.fingerprints)
+
+    def add(self, game, fmt, output):
+        # Re-adding a job replaces the old entry for the same output
+        self.jobs = [j for j in self.jobs if j["output"] != output]
+        self.jobs.append({"game": game, "format": fmt, "output": output, "status": "pending"})
+
+    def pending(self):
+        return [j for j in self.jobs if j["status"] not in self.FINISHED]
+
+    def clear(self):
+        self.jobs = []
+        self.save()
+
+    def run(self, base_dir, settings_path, workers=None, event_callback=None, stop_event=None):
+        """
+        Runs every unfinished job. event_callback(job, finished, total) fires as each job ends.
+        Setting stop_event lets running jobs finish and leaves the rest pending for the next run.
+        Returns the per-worker summary (see summarize).
+        """
+        jobs = self.pending()
+        for job in jobs: job.pop("error", None)
+        self.save()
+        if not jobs: return {}
+
+        workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+        zip_threads = max(1, (os.cpu_count() or 1) // workers)
+        finished = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base_dir, settings_path, zip_threads)) as pool:
+            futures = {pool.submit(_run_export_job, j["game"], j["format"], j["output"], self.fingerprints.get(j["output"])): j for j in jobs}
+            try:
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                        self.fingerprints[job["output"]] = result.pop("fingerprint")
+                        job.update(result)
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        job.update(status="failed", error=str(e))
+                    finished += 1
+                    self.save()
+                    if event_callback: event_callback(job, finished, len(jobs))
+                    if stop_event is not None and stop_event.is_set(): break
+            except BrokenProcessPool as e:
+                print(f"Export pool crashed, unfinished jobs stay queued: {e}")
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+                self.save()
+        return self.summarize(jobs)
+
+    @staticmethod
+    def summarize(jobs):
+        """{pid: {"jobs", "skipped", "failed", "bytes", "seconds", "throughput"}} for the given jobs."""
+        summary = collections.defaultdict(lambda: {"jobs": 0, "skipped": 0, "failed": 0, "bytes": 0, "seconds": 0.0})
+        for job in jobs:
+            if "pid" not in job and job["status"] != "failed": continue
+            entry = summary[job.get("pid", 0)]
+            entry["jobs"] += 1
+            if job["status"] == "skipped": entry["skipped"] += 1
+            elif job["status"] == "failed": entry["failed"] += 1
+            else:
+                entry["bytes"] += job.get("bytes", 0)
+                entry["seconds"] += job.get("seconds", 0.0)
+        for entry in summary.values():
+            entry["throughput"] = entry["bytes"] / entry["seconds"] if entry["seconds"] else 0.0
+        return dict(summary)
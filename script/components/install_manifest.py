@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import array
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+MAGIC = b"DMF1"
+HASH_CHUNK = 1024 * 1024
+MMAP_THRESHOLD = 4 * 1024 * 1024 # Larger files are hashed from a memory map, no buffer copies
+MTIME_TOLERANCE_NS = 2 * 10**9 # FAT and ZIP timestamps have 2 second precision
+# On Windows st_ctime is the creation time, only POSIX ctime changes on every write and cannot be set back
+TRACK_CTIME = os.name != 'nt'
+
+
+def file_crc32(path, size=None):
+    """CRC32 of a file, the same value ZIP and 7z store per member. zlib releases the GIL while hashing."""
+    size = os.path.getsize(path) if size is None else size
+    with open(path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return zlib.crc32(m) & 0xFFFFFFFF
+        crc = 0
+        while chunk := f.read(HASH_CHUNK): crc = zlib.crc32(chunk, crc)
+        return crc & 0xFFFFFFFF
+
+
+class InstallManifest:
+    """
+    Snapshot of a game folder right after install: per file size, mtime, ctime and CRC32.
+
+    Stored columnar in a small binary file (header, one array per field, then the
+    NUL-separated paths) instead of a JSON dict. Old JSON manifests (size and mtime
+    only) are still read, they just have no hashes to confirm changes with.
+    """
+    def __init__(self, entries=None, has_hashes=True):
+        self.entries = entries or {} # {rel_path: (size, mtime_ns, ctime_ns, crc)}
+        self.has_hashes = has_hashes
+
+    @classmethod
+    def build(cls, folder, workers=None):
+        paths = []
+        for root, _, files in os.walk(folder):
+            for name in files: paths.append(os.path.join(root, name))
+
+        def scan(path):
+            try:
+                st = os.stat(path)
+                return os.path.relpath(path, folder), (st.st_size, st.st_mtime_ns, st.st_ctime_ns, file_crc32(path, st.st_size))
+            except OSError:
+                return None
+        with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+            return cls(dict(r for r in pool.map(scan, paths) if r))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f: data = f.read()
+        if not data.startswith(MAGIC):
+            # Legacy JSON manifest
+            legacy = json.loads(data.decode('utf-8'))
+            return cls({rel: (e["size"], int(e["mtime"] * 10**9), 0, None) for rel, e in legacy.items()}, has_hashes=False)
+        count, = struct.unpack_from("<I", data, len(MAGIC))
+        offset = len(MAGIC) + 4
+        columns = []
+        for typecode in ("Q", "q", "q", "I"):
+            column = array.array(typecode)
+            end = offset + count * column.itemsize
+            column.frombytes(data[offset:end])
+            if sys.byteorder != "little": column.byteswap()
+            columns.append(column); offset = end
+        names = data[offset:].decode('utf-8').split("\0") if count else []
+        return cls({name.replace("/", os.sep): tuple(col[i] for col in columns) for i, name in enumerate(names)})
+
+    def save(self, path):
+        names = list(self.entries)
+        columns = [array.array(tc, (self.entries[n][i] for n in names)) for i, tc in enumerate(("Q", "q", "q", "I"))]
+        if sys.byteorder != "little":
+            for column in columns: column.byteswap()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack("<I", len(names)))
+            for column in columns: f.write(column.tobytes())
+            f.write("\0".join(n.replace(os.sep, "/") for n in names).encode('utf-8'))
+        os.replace(tmp_path, path)
+
+    def _stat_check(self, rel_path, path):
+        """True/False when stat decides, None when only the CRC32 can tell."""
+        entry = self.entries.get(rel_path)
+        if entry is None: return True
+        size, mtime_ns, ctime_ns, crc = entry
+        try: st = os.stat(path)
+        except OSError: return False
+        if st.st_size != size: return True
+        stat_same = abs(st.st_mtime_ns - mtime_ns) <= MTIME_TOLERANCE_NS
+        if stat_same and self.has_hashes and TRACK_CTIME: stat_same = st.st_ctime_ns == ctime_ns
+        if stat_same: return False
+        return None if self.has_hashes else True
+
+    def _crc_changed(self, rel_path, path):
+        try: return file_crc32(path) != self.entries[rel_path][3]
+        except OSError: return True
+
+    def is_changed(self, rel_path, path):
+        """Stat first; a file whose size matches but whose timestamps moved is confirmed by its CRC32."""
+        result = self._stat_check(rel_path, path)
+        return self._crc_changed(rel_path, path) if result is None else result
+
+    def changed_files(self, folder, workers=None):
+        """Paths in folder that are new or whose content changed since the snapshot."""
+        changed, to_hash = [], []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name); rel_path = os.path.relpath(path, folder)
+                result = self._stat_check(rel_path, path)
+                if result is None: to_hash.append((rel_path, path))
+                elif result: changed.append(path)
+        if to_hash:
+            with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+                changed += [path for (rel_path, path), differs in zip(to_hash, pool.map(lambda item: self._crc_changed(*item), to_hash)) if differs]
+        return changed
@@ -0,0 +1,129 @@
+import os
+import shutil
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import py7zr
+    HAS_7ZIP = True
+except ImportError:
+    HAS_7ZIP = False
+
+from .archive_extractor import ExtractionCancelled
+from ..utils import format_size
+
+# Never fill the games volume completely, DOSBox and the games themselves write to it
+DEFAULT_RESERVE = 512 * 1024 * 1024
+
+
+def archive_uncompressed_size(path):
+    """Sum of member sizes from the archive's central directory / header. Nothing is decompressed."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path, 'r') as zf:
+            return sum(info.file_size for info in zf.infolist())
+    if not HAS_7ZIP: raise Exception("py7zr module not found.")
+    with py7zr.SevenZipFile(path, 'r') as z:
+        return sum(f.uncompressed for f in z.files if not f.is_directory)
+
+
+class InstallQueue:
+    """
+    Installs and uninstalls many games with bounded concurrency and no dialogs.
+
+    Uninstalls run first since they free space. An install is only admitted when its
+    uncompressed size, plus what running installs still have to write, plus a reserve,
+    fits into the free space of the games volume. Installs that could never fit fail
+    right away, the others wait for running jobs to finish.
+
+    Backup prompts are replaced by a fixed policy: keep_saves backs up changed files
+    before uninstalling, restore_backups restores the newest save backup after install.
+    """
+    def __init__(self, logic, workers=2, keep_saves=True, restore_backups=False, reserve_bytes=DEFAULT_RESERVE):
+        self.logic = logic
+        self.workers = max(1, workers)
+        self.keep_saves = keep_saves
+        self.restore_backups = restore_backups
+        self.reserve_bytes = reserve_bytes
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def add(self, action, zip_name):
+        game_name = os.path.splitext(zip_name)[0]
+        self.jobs.append({"action": action, "zip": zip_name, "game": game_name, "status": "pending", "done": 0, "total": 0, "message": ""})
+
+    def run(self, event_callback=None, cancel_event=None):
+        """
+        Runs all jobs. event_callback(job) fires on progress and when a job ends (from worker threads).
+        cancel_event stops new jobs and cancels running extractions.
+        """
+        cancel_event = cancel_event or threading.Event()
+        def notify(job):
+            if event_callback: event_callback(job)
+
+        for job in self.jobs:
+            if job["action"] != "install": continue
+            job["archive"] = self.logic.find_game_archive(job["game"])
+            if not job["archive"]:
+                job.update(status="failed", message="Archive file not found.")
+            elif os.path.isdir(self.logic.find_game_folder(job["game"])):
+                job.update(status="skipped", message="Already installed.")
+            else:
+                try: job["total"] = archive_uncompressed_size(job["archive"])
+                except Exception as e: job.update(status="failed", message=f"Cannot read archive: {e}")
+            if job["status"] != "pending": notify(job)
+
+        pending = [j for j in self.jobs if j["status"] == "pending" and j["action"] == "uninstall"]
+        pending += [j for j in self.jobs if j["status"] == "pending" and j["action"] == "install"]
+        games_root = self.logic.installed_dir
+        os.makedirs(games_root, exist_ok=True)
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while (pending and not cancel_event.is_set()) or running:
+                for job in list(pending):
+                    if len(running) >= self.workers or cancel_event.is_set(): break
+                    if job["action"] == "install":
+                        free = shutil.disk_usage(games_root).free
+                        with self._lock:
+                            still_to_write = sum(j["total"] - j["done"] for j in running.values() if j["action"] == "install")
+                        if job["total"] + self.reserve_bytes > free - still_to_write:
+                            if not running:
+                                # Nothing running will give the space back
+                                job.update(status="failed", message=f"Not enough free space: needs {format_size(job['total'])} plus {format_size(self.reserve_bytes)} reserve, {format_size(free)} free.")
+                                pending.remove(job); notify(job)
+                            continue
+                    pending.remove(job)
+                    job["status"] = "running"; notify(job)
+                    running[pool.submit(self._run_job, job, cancel_event, notify)] = job
+                if not running: continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    try:
+                        future.result()
+                        if job["status"] == "running": job["status"] = "done"
+                    except ExtractionCancelled:
+                        job.update(status="cancelled", message="Cancelled.")
+                    except Exception as e:
+                        job.update(status="failed", message=str(e))
+                    notify(job)
+        for job in pending:
+            job.update(status="cancelled", message="Not started."); notify(job)
+        return self.jobs
+
+    def _run_job(self, job, cancel_event, notify):
+        if job["action"] == "uninstall":
+            if not self.logic.find_game_archive(job["game"]):
+                # Without the archive an uninstall is a delete, that stays a manual decision
+                raise Exception("Archive file not found, uninstall it manually.")
+            self.logic.uninstall_game(job["zip"], keep_saves=self.keep_saves)
+            return
+
+        def on_progress(done, total):
+            with self._lock: job["done"] = done; job["total"] = total
+            notify(job)
+        self.logic.install_game(job["zip"], job["game"], source_path=job["archive"], progress_callback=on_progress, cancel_event=cancel_event, restore_backup=False)
+        if self.restore_backups:
+            try: self.logic.check_and_restore_backup(job["game"], restore=True)
+            except Exception as e: job["message"] = str(e)
@@ -0,0 +1,87 @@
+import os
+import hashlib
+import threading
+
+
+def write_if_changed(path, content):
+    """
+    Writes content to path (atomically, through a temporary file) unless the file already holds it.
+    Returns True if the file was written.
+    """
+    data = content.replace("\n", os.linesep).encode("utf-8") # Same bytes as a text-mode write
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if hashlib.blake2b(f.read(), digest_size=16).digest() == hashlib.blake2b(data, digest_size=16).digest(): return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f: f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ReferenceConfigCache:
+    """
+    In-memory cache of DOSBox reference configs, keyed by path and invalidated by (mtime, size).
+    Also remembers where the engine reference files live in the DOSBox folder, so the tree is
+    only walked again when the folder or one of its engine subfolders changes, not on every launch.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = {} # path: ((mtime_ns, size), text)
+        self._parsed = {} # (path, parse): ((mtime_ns, size), result)
+        self._index = {} # root: (folder mtimes, {file name: first path found})
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def read(self, path):
+        """Text of the file, "" if it cannot be read."""
+        stamp = self._stamp(path)
+        if stamp is None: return ""
+        with self._lock:
+            cached = self._texts.get(path)
+            if cached and cached[0] == stamp: return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f: text = f.read()
+        except OSError:
+            return ""
+        with self._lock: self._texts[path] = (stamp, text)
+        return text
+
+    def parsed(self, path, parse):
+        """parse(text) of the file, cached per parse function. The result is shared, callers must not modify it."""
+        stamp = self._stamp(path)
+        if stamp is None: return {}
+        with self._lock:
+            cached = self._parsed.get((path, parse))
+            if cached and cached[0] == stamp: return cached[1]
+        result = parse(self.read(path))
+        with self._lock: self._parsed[(path, parse)] = (stamp, result)
+        return result
+
+    def _tree_stamp(self, root):
+        try:
+            with os.scandir(root) as it:
+                return tuple(sorted((e.name, e.stat().st_mtime_ns) for e in it if e.is_dir())) + (os.stat(root).st_mtime_ns,)
+        except OSError:
+            return None
+
+    def find(self, root, candidates):
+        """Path of the first of the candidate file names found under root (in candidate order), None if there is none."""
+        stamp = self._tree_stamp(root)
+        if stamp is None: return None
+        with self._lock: cached = self._index.get(root)
+        if cached is None or cached[0] != stamp:
+            found = {}
+            for dirpath, _, files in os.walk(root):
+                for name in files: found.setdefault(name, os.path.join(dirpath, name))
+            cached = (stamp, found)
+            with self._lock: self._index[root] = cached
+        return next((cached[1][name] for name in candidates if name in cached[1]), None)
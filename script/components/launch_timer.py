@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import shutil
+import threading
+import subprocess
+from datetime import datetime
+
+# Order the stages are shown in; "window" is DOSBox start until its window is mapped
+STAGES = ["engine", "game_config", "prepare_configs", "autoexec", "snapshot", "spawn", "window"]
+HISTORY = 100 # Launches kept per game
+BUCKETS_MS = [100, 250, 500, 1000, 2000, 5000, 10000] # Upper bounds of the histogram buckets, the last one is open
+
+
+class LaunchTrace:
+    """Timing spans of one launch. Stages are measured back to back from a single clock."""
+    def __init__(self, game_name):
+        self.game_name = game_name
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages = {}
+        self.window_found = None
+        self.staged = False # Configs were prepared in advance by the speculative stage
+
+    def mark(self, stage):
+        """Ends stage at the current time; it started when the previous stage ended."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def total_ms(self):
+        return (self._last - self.started) * 1000
+
+    def to_dict(self):
+        return {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "stages": {k: round(v, 1) for k, v in self.stages.items()},
+                "total": round(self.total_ms(), 1), "window_found": self.window_found, "staged": self.staged}
+
+
+def _percentile(values, pct):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def wait_for_window(process, timeout=15.0, interval=0.05):
+    """
+    Polls until the process has a visible window (Linux/X11, through xdotool). Returns True when
+    found, False on timeout or exit, None if there is no way to tell on this system.
+    """
+    if os.name == 'nt' or not os.environ.get("DISPLAY") or not shutil.which("xdotool"): return None
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None: return False
+        try:
+            out = subprocess.run(["xdotool", "search", "--onlyvisible", "--pid", str(process.pid)], capture_output=True, text=True, timeout=2).stdout
+            if out.strip(): return True
+        except (OSError, subprocess.SubprocessError):
+            return None
+        time.sleep(interval)
+    return False
+
+
+class LaunchStats:
+    """Rolling per-game history of launch traces, persisted as JSON in the cache folder."""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f: self.games = json.load(f).get("games", {})
+        except (OSError, ValueError):
+            self.games = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({"games": self.games}, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, trace):
+        with self._lock:
+            history = self.games.setdefault(trace.game_name, [])
+            history.append(trace.to_dict())
+            del history[:-HISTORY]
+            try: self._save()
+            except OSError as e: print(f"Could not save launch timings: {e}")
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            if old_name in self.games:
+                self.games[new_name] = self.games.pop(old_name)
+                self._save()
+
+    def summary(self, game_name):
+        """{"launches", "stages": {stage: {"median", "p90", "max"}}, "total": {...}, "histogram": [(label, count)]} in ms."""
+        history = self.games.get(game_name, [])
+        def stats(values):
+            return {"median": _percentile(values, 50), "p90": _percentile(values, 90), "max": max(values) if values else None}
+        stages = {s: stats([h["stages"][s] for h in history if s in h["stages"]]) for s in STAGES}
+        totals = [h["total"] for h in history]
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for value in totals: counts[next((i for i, bound in enumerate(BUCKETS_MS) if value <= bound), len(BUCKETS_MS))] += 1
+        labels = [f"<= {b / 1000:g} s" for b in BUCKETS_MS] + [f"> {BUCKETS_MS[-1] / 1000:g} s"]
+        return {"launches": len(history), "stages": stages, "total": stats(totals), "histogram": list(zip(labels, counts))}
+
+    def export(self, path):
+        """Writes the raw history plus the per-game summary to path."""
+        with self._lock: games = {name: list(history) for name, history in self.games.items()}
+        data = {"exported": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "stages": STAGES,
+                "games": {name: {"summary": self.summary(name), "launches": history} for name, history in games.items()}}
+        with open(path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=2)
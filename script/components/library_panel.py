@@ -3,6 +3,7 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import os
 import random
+from .capture_watcher import thumbnail_path
 try:
     from PIL import Image, ImageTk
     HAS_PILLOW = True
@@ -290,7 +291,9 @@ class LibraryPanel(tb.Frame):
     def _get_cached_photo(self, path):
         if path in self.grid_images: return self.grid_images[path]
         try:
-            pil_img = Image.open(path)
+            # Captures come with a pre-scaled thumbnail, much cheaper to open than the full image
+            thumb = thumbnail_path(path)
+            pil_img = Image.open(thumb if os.path.exists(thumb) and os.path.getmtime(thumb) >= os.path.getmtime(path) else path)
             
             # Dynamic size
             size_str = self.app.settings.get("thumbnail_size", "Medium")
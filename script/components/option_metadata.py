@@ -0,0 +1,114 @@
+import os
+import re
+import json
+import threading
+from types import MappingProxyType
+
+COMPILED_VERSION = 1 # Bump to recompile every cached variant after changing the compiled layout
+
+
+def metadata_file_for(variant):
+    """Metadata JSON of a DOSBox variant name ("Staging", "dosbox-x", "X", "dosbox-standard", ...)."""
+    # Whole words only, "dosbox-standard" or "Linux" must not count as X
+    words = re.split(r"[^a-z0-9]+", variant.lower())
+    if "staging" in words: return "dosbox_staging.json"
+    if "x" in words: return "dosbox_x.json"
+    return "dosbox_standard.json"
+
+
+def _compile(raw_data):
+    """Raw metadata JSON (list of rows or nested dict) -> {section: {key: entry}} with plain JSON values."""
+    rows = []
+    if isinstance(raw_data, list):
+        # List of Objects (e.g. from CSV conversion): section, key, default, possible, info
+        for item in raw_data:
+            if item.get("key"): rows.append((item.get("section", "General"), item["key"], item.get("default", ""), item.get("possible", []), item.get("info", "")))
+    elif isinstance(raw_data, dict):
+        # Handles both "default" and "default_value" styles
+        for sec, keys in raw_data.items():
+            for k, v in keys.items():
+                rows.append((sec, k, v.get("default_value", v.get("default", "")), v.get("possible_values", v.get("possible", [])), v.get("info", "")))
+    compiled = {}
+    for sec, key, default, possible, info in rows:
+        if isinstance(possible, str): possible = [x.strip() for x in possible.split(',')] if possible else []
+        compiled.setdefault(sec.lower(), {})[key.lower()] = {"section": sec, "key": key, "default": default, "possible": [str(p) for p in possible],
+                                                              "info": info or "", "search": f"{sec} {key} {info or ''}".lower()}
+    return compiled
+
+
+def _freeze(compiled):
+    """Read-only view shared by every caller. "possible" becomes a tuple, "possible_set" its lowercase set."""
+    return MappingProxyType({sec: MappingProxyType({key: MappingProxyType(dict(entry, possible=tuple(entry["possible"]), possible_set=frozenset(p.lower() for p in entry["possible"])))
+                                                    for key, entry in keys.items()}) for sec, keys in compiled.items()})
+
+
+class OptionMetadataStore:
+    """
+    DOSBox option metadata (default, possible values, description) compiled once per variant.
+    The compiled form is kept in memory as a read-only mapping and on disk in the cache folder,
+    keyed by the source JSON's mtime and size, so neither the Edit window nor validation re-reads
+    or rebuilds it while the JSON is unchanged.
+    """
+    def __init__(self, database_dir, cache_path):
+        self.database_dir = database_dir
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._loaded = {} # json name: (stamp, frozen metadata)
+        self._disk = None # Compiled cache file contents, read on first use
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size, COMPILED_VERSION]
+        except OSError:
+            return None
+
+    def get(self, variant):
+        """(metadata, json name) of the variant; metadata is {} and the name "n/a" if its JSON is missing."""
+        json_name = metadata_file_for(variant)
+        json_path = os.path.join(self.database_dir, json_name)
+        stamp = self._stamp(json_path)
+        if stamp is None: return MappingProxyType({}), "n/a"
+        with self._lock:
+            loaded = self._loaded.get(json_name)
+            if loaded and loaded[0] == stamp: return loaded[1], json_name
+            if self._disk is None:
+                try:
+                    with open(self.cache_path, 'r', encoding='utf-8') as f: self._disk = json.load(f)
+                except (OSError, ValueError):
+                    self._disk = {}
+            cached = self._disk.get(json_name)
+            if cached and cached.get("stamp") == stamp:
+                compiled = cached["options"]
+            else:
+                try:
+                    with open(json_path, 'r', encoding='utf-8') as f: compiled = _compile(json.load(f))
+                except Exception as e:
+                    print(f"Error loading JSON metadata: {e}")
+                    return MappingProxyType({}), json_name
+                self._disk[json_name] = {"stamp": stamp, "options": compiled}
+                try:
+                    os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                    tmp_path = self.cache_path + ".tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(self._disk, f)
+                    os.replace(tmp_path, self.cache_path)
+                except OSError as e: print(f"Could not save compiled option metadata: {e}")
+            frozen = _freeze(compiled)
+            self._loaded[json_name] = (stamp, frozen)
+            return frozen, json_name
+
+    def search(self, variant, query):
+        """(section, key) of every option whose section, key or description contains query."""
+        query = query.lower().strip()
+        metadata, _ = self.get(variant)
+        return [(sec, key) for sec, keys in metadata.items() for key, entry in keys.items() if query in entry["search"]]
+
+    def check_value(self, variant, section, key, value):
+        """None if value is acceptable for the option, otherwise a short reason. Options without a value list accept anything."""
+        metadata, _ = self.get(variant)
+        entry = metadata.get(section.lower(), {}).get(key.lower())
+        if entry is None or not entry["possible_set"]: return None
+        text = str(value).strip().lower()
+        # Compound values such as "fixed 3000" or "max 90%" are checked by their first word
+        if text in entry["possible_set"] or text.split(" ", 1)[0] in entry["possible_set"]: return None
+        return f"'{value}' is not one of: {', '.join(entry['possible'])}"
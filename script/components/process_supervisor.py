@@ -0,0 +1,150 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import selectors
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+HAS_PIDFD = hasattr(os, "pidfd_open")
+
+
+class Session:
+    """One supervised DOSBox process. state: "starting", "running", "exited"."""
+    def __init__(self, session_id, game_name, kind):
+        self.id = session_id
+        self.game_name = game_name
+        self.kind = kind # "game", "exe", "prompt", "test"
+        self.state = "starting"
+        self.process = None
+        self.started = None
+        self.ended = None
+        self.returncode = None
+        self.error = None
+        self.finished = threading.Event() # Set once the post-exit work is done
+
+    @property
+    def duration(self):
+        return (self.ended or time.time()) - self.started if self.started else 0
+
+
+class ProcessSupervisor:
+    """
+    Starts and watches every DOSBox child process. A single watcher thread blocks in a selector on
+    Linux pidfds and reaps a process as soon as it exits (where pidfds are missing, each process
+    gets a thread blocked in wait() instead). Work around a session runs on a small shared pool:
+    before_start (e.g. the session snapshot) and on_exit (play stats, screenshots, backups).
+    after_start (window focus, launch timing) may poll for the game window for seconds, so it gets
+    an executor of its own and never delays post-exit work. Events ("started"/"exited"/"finished", session) go
+    into one queue, session helpers add their own through post() (e.g. "capture"); notify() is
+    called after each put so the GUI can drain it right away.
+    """
+    def __init__(self, workers=4):
+        self.events = queue.Queue()
+        self.notify = None
+        self._ids = itertools.count(1)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._after_start_pool = ThreadPoolExecutor(max_workers=workers)
+        self._selector = None
+        self._pending = []
+        self._wake_r = self._wake_w = None
+
+    # --- Public API ---
+
+    def spawn(self, cmd, cwd, game_name, kind="game", before_start=None, after_start=None, on_exit=None):
+        """Starts cmd on the pool (after before_start). Returns the Session right away."""
+        session = Session(next(self._ids), game_name, kind)
+        with self._lock: self._sessions[session.id] = session
+        self._pool.submit(self._start, session, cmd, cwd, before_start, after_start, on_exit)
+        return session
+
+    def running(self):
+        """Sessions that have not exited yet, oldest first."""
+        with self._lock: return [s for s in self._sessions.values() if s.state != "exited"]
+
+    def is_running(self, game_name):
+        return any(s.game_name == game_name for s in self.running())
+
+    def terminate(self, session_id):
+        with self._lock: session = self._sessions.get(session_id)
+        if session and session.process and session.state == "running":
+            try: session.process.terminate()
+            except OSError: pass
+
+    # --- Internals ---
+
+    def post(self, kind, session):
+        self.events.put((kind, session))
+        if self.notify:
+            try: self.notify()
+            except Exception: pass # GUI is shutting down
+
+    def _start(self, session, cmd, cwd, before_start, after_start, on_exit):
+        try:
+            if before_start: before_start(session)
+            session.process = subprocess.Popen(cmd, creationflags=0x08000000 if os.name == 'nt' else 0, cwd=cwd)
+            session.started = time.time()
+            session.state = "running"
+        except Exception as e:
+            session.error = str(e); session.state = "exited"; session.ended = time.time()
+            print(f"Error running game: {e}")
+            self.post("exited", session)
+            self._finish(session, on_exit) # Lets the launch stop what before_start set up
+            return
+        self.post("started", session)
+        self._watch(session, on_exit)
+        if after_start: self._after_start_pool.submit(self._after_start, session, after_start)
+
+    def _after_start(self, session, after_start):
+        try: after_start(session)
+        except Exception as e: print(f"Post-start error: {e}")
+
+    def _watch(self, session, on_exit):
+        if HAS_PIDFD:
+            try:
+                fd = os.pidfd_open(session.process.pid)
+            except OSError:
+                fd = None
+            if fd is not None:
+                with self._lock:
+                    if self._selector is None:
+                        self._selector = selectors.DefaultSelector()
+                        self._wake_r, self._wake_w = os.pipe()
+                        self._selector.register(self._wake_r, selectors.EVENT_READ)
+                        threading.Thread(target=self._watch_loop, daemon=True, name="ProcessSupervisor").start()
+                    self._pending.append((fd, (session, on_exit)))
+                os.write(self._wake_w, b"x")
+                return
+        threading.Thread(target=lambda: (session.process.wait(), self._reap(session, on_exit)), daemon=True).start()
+
+    def _watch_loop(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj == self._wake_r:
+                    os.read(self._wake_r, 512)
+                    with self._lock: pending, self._pending = self._pending, []
+                    for fd, data in pending: self._selector.register(fd, selectors.EVENT_READ, data)
+                    continue
+                self._selector.unregister(key.fileobj)
+                os.close(key.fileobj)
+                self._reap(*key.data)
+
+    def _reap(self, session, on_exit):
+        session.returncode = session.process.wait()
+        session.ended = time.time()
+        session.state = "exited"
+        self.post("exited", session)
+        self._pool.submit(self._finish, session, on_exit)
+
+    def _finish(self, session, on_exit):
+        try:
+            if on_exit: on_exit(session)
+        except Exception as e:
+            print(f"Post-exit error: {e}")
+        finally:
+            session.finished.set()
+            with self._lock: self._sessions.pop(session.id, None)
+            self.post("finished", session)
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+
+from .. import constants
+
+HAS_PROCFS = os.path.isdir("/proc/self/task")
+HISTORY = 20 # Sessions kept per game
+MIN_SAMPLES = 5 # Sessions with fewer samples are too short to judge
+PINNED_PCT = 90 # Busiest thread at or above this share of a host core counts as pinned
+IDLE_PCT = 35 # ... at or below this while running fixed cycles counts as idling
+
+
+def _percentile(values, pct):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def cycles_mode(value):
+    """("max" | "auto" | "fixed", cycle count or None) of a DOSBox cycles value such as "max", "auto 3000 limit 50000" or "fixed 20000"."""
+    text = str(value or "auto").strip().lower()
+    number = re.search(r'\d+', text)
+    if text.startswith("max"): return "max", None
+    if text.startswith("auto"): return "auto", None
+    return ("fixed", int(number.group())) if number else ("auto", None)
+
+
+def cpu_class(cycles):
+    """Name of the fastest CPU in constants.CPU_CYCLES_MAP that the cycle count reaches."""
+    return next((name for value, name in sorted(constants.CPU_CYCLES_MAP.items(), reverse=True) if cycles >= value), "8086")
+
+
+class ResourceMonitor:
+    """
+    Samples running DOSBox processes from /proc at a low rate: CPU time of the whole process and of
+    its busiest thread (the emulation thread), resident memory and context switches. One thread
+    serves every watched process and only runs while there is something to watch.
+    """
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._watched = {} # pid: {"last": (time, process ticks, {tid: ticks}, vol, invol) | None, "samples": [...]}
+        self._thread = None
+        self._tick = os.sysconf("SC_CLK_TCK") if HAS_PROCFS else 100
+
+    def watch(self, pid):
+        if not HAS_PROCFS: return
+        with self._lock:
+            self._watched[pid] = {"last": self._read(pid), "samples": [], "started": time.time()}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="ResourceMonitor")
+                self._thread.start()
+
+    def stop(self, pid):
+        """Stops watching pid and returns its session summary, None if nothing was sampled."""
+        with self._lock: entry = self._watched.pop(pid, None)
+        if not entry or not entry["samples"]: return None
+        samples = entry["samples"]
+        cpu = [s["cpu"] for s in samples]; thread = [s["thread"] for s in samples]; rss = [s["rss"] for s in samples]
+        duration = samples[-1]["t"] - entry["started"]
+        vol = sum(s["vol"] for s in samples); invol = sum(s["invol"] for s in samples); span = sum(s["dt"] for s in samples) or 1
+        return {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "duration": round(duration), "samples": len(samples),
+                "cpu_avg": round(sum(cpu) / len(cpu), 1), "cpu_p90": round(_percentile(cpu, 90), 1),
+                "thread_avg": round(sum(thread) / len(thread), 1), "thread_p90": round(_percentile(thread, 90), 1),
+                "rss_avg_mb": round(sum(rss) / len(rss) / 1024, 1), "rss_peak_mb": round(max(rss) / 1024, 1),
+                "ctx_voluntary": round(vol / span, 1), "ctx_involuntary": round(invol / span, 1)}
+
+    def _read(self, pid):
+        """(time, process ticks, {tid: ticks}, rss kB, voluntary, involuntary switches), None once the process is gone."""
+        def ticks(stat_path):
+            with open(stat_path, 'r') as f: fields = f.read().rsplit(")", 1)[1].split()
+            return int(fields[11]) + int(fields[12]) # utime + stime
+        try:
+            now = time.monotonic()
+            total = ticks(f"/proc/{pid}/stat")
+            threads = {}
+            for tid in os.listdir(f"/proc/{pid}/task"):
+                try: threads[tid] = ticks(f"/proc/{pid}/task/{tid}/stat")
+                except OSError: pass
+            status = {}
+            with open(f"/proc/{pid}/status", 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    status[key] = value.split()[0] if value.split() else "0"
+            return now, total, threads, int(status.get("VmRSS", 0)), int(status.get("voluntary_ctxt_switches", 0)), int(status.get("nonvoluntary_ctxt_switches", 0))
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._watched:
+                    self._thread = None
+                    return
+                pids = list(self._watched)
+            for pid in pids:
+                current = self._read(pid)
+                with self._lock:
+                    entry = self._watched.get(pid)
+                    if entry is None or current is None: continue
+                    last, entry["last"] = entry["last"], current
+                if last is None: continue
+                dt = current[0] - last[0]
+                if dt <= 0: continue
+                scale = 100 / (self._tick * dt) # ticks -> percent of one host core
+                busiest = max((ticks - last[2].get(tid, 0) for tid, ticks in current[2].items()), default=0)
+                entry["samples"].append({"t": time.time(), "dt": dt, "cpu": (current[1] - last[1]) * scale, "thread": busiest * scale,
+                                         "rss": current[3], "vol": current[4] - last[4], "invol": current[5] - last[5]})
+
+
+class ResourceHistory:
+    """Per-game history of session resource summaries (JSON in the cache folder) and the cycles/core advice drawn from it."""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f: self.games = json.load(f).get("games", {})
+        except (OSError, ValueError):
+            self.games = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump({"games": self.games}, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, game_name, summary):
+        with self._lock:
+            history = self.games.setdefault(game_name, [])
+            history.append(summary)
+            del history[:-HISTORY]
+            try: self._save()
+            except OSError as e: print(f"Could not save resource history: {e}")
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            if old_name in self.games:
+                self.games[new_name] = self.games.pop(old_name)
+                self._save()
+
+    def latest(self, game_name):
+        history = self.games.get(game_name, [])
+        return history[-1] if history else None
+
+    def recommend(self, game_name):
+        """
+        List of {"section", "key", "value", "text"} drawn from the recent sessions that ran with the
+        same cycles/core as the last one. "value" is None for advice without a concrete setting.
+        """
+        history = [s for s in self.games.get(game_name, []) if s.get("samples", 0) >= MIN_SAMPLES]
+        if not history: return []
+        cycles, core = history[-1].get("cycles", "auto"), str(history[-1].get("core", "auto")).lower()
+        sessions = [s for s in history if (s.get("cycles", "auto"), str(s.get("core", "auto")).lower()) == (cycles, core)][-5:]
+        thread = _percentile([s["thread_p90"] for s in sessions], 50)
+        involuntary = _percentile([s["ctx_involuntary"] for s in sessions], 50)
+        mode, count = cycles_mode(cycles)
+        based_on = f"over {len(sessions)} session(s)"
+        recs = []
+
+        if thread >= PINNED_PCT:
+            if mode == "max":
+                recs.append({"section": "cpu", "key": "cycles", "value": "auto",
+                             "text": f"cycles=max kept a host core at {thread:.0f}% {based_on}. 'auto' only runs flat out in protected mode, or set a fixed speed."})
+            elif mode == "fixed":
+                lower = [int(o) for o in constants.CYCLES_OPTIONS if o.isdigit() and int(o) < count]
+                text = f"The host could not keep up with {count} cycles ({thread:.0f}% of a core {based_on}"
+                text += f", {involuntary:.0f} preemptions/s)." if involuntary else ")."
+                recs.append({"section": "cpu", "key": "cycles", "value": str(lower[-1]) if lower else None,
+                             "text": text + (f" Try {lower[-1]} ({cpu_class(lower[-1])})." if lower else "")})
+            if core in ("normal", "simple"):
+                recs.append({"section": "cpu", "key": "core", "value": "dynamic",
+                             "text": f"The {core} core is interpreted; the dynamic core needs far less host CPU for the same speed."})
+        elif mode == "fixed" and thread <= IDLE_PCT and count >= 10000:
+            # Emulation time scales with the cycle count; aim for about twice the measured need
+            target = count * max(thread, 1) / 50
+            options = [int(o) for o in constants.CYCLES_OPTIONS if o.isdigit() and target <= int(o) < count]
+            if options:
+                recs.append({"section": "cpu", "key": "cycles", "value": str(options[0]),
+                             "text": f"Only {thread:.0f}% of a core was used at {count} cycles ({cpu_class(count)}) {based_on}. "
+                                     f"{options[0]} ({cpu_class(options[0])}) is probably enough."})
+        return recs
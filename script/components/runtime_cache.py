@@ -0,0 +1,77 @@
+import os
+import hashlib
+import fnmatch
+
+from .zip_writer import ParallelZipWriter, raw_members
+from .compression_policy import CompressionPolicy
+
+# Same filter the standalone builder always used when copying DOSBox (shutil.ignore_patterns('*.zip'))
+RUNTIME_IGNORE = ("*.zip",)
+
+
+class RuntimeCache:
+    """
+    Pre-compressed copies of DOSBox installations for standalone packages.
+
+    Each install is compressed once (at the "smallest" preset, the cost is shared by every
+    package built from it) into a ZIP under cache_dir. The entry is keyed by the install
+    path plus name, size and mtime of every file, so updating DOSBox just creates a new
+    entry and the stale one is removed. Packages splice the members in as raw deflate data.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._members = {} # cache zip path -> raw_members()
+
+    def _scan(self, dosbox_root):
+        files = []
+        for root, dirs, names in os.walk(dosbox_root):
+            dirs[:] = [d for d in dirs if not any(fnmatch.fnmatch(d, p) for p in RUNTIME_IGNORE)]
+            for name in names:
+                if any(fnmatch.fnmatch(name, p) for p in RUNTIME_IGNORE): continue
+                full_path = os.path.join(root, name)
+                try: st = os.stat(full_path)
+                except OSError: continue
+                files.append((full_path, os.path.relpath(full_path, dosbox_root), st.st_size, st.st_mtime_ns))
+        files.sort(key=lambda f: f[1])
+        return files
+
+    def _keys(self, dosbox_root, files):
+        root_key = hashlib.sha1(os.path.normcase(os.path.abspath(dosbox_root)).encode('utf-8')).hexdigest()[:12]
+        content = hashlib.sha1()
+        for _, rel, size, mtime in files: content.update(f"{rel}\0{size}\0{mtime}\n".encode('utf-8'))
+        return root_key, content.hexdigest()[:16]
+
+    def fingerprint(self, dosbox_root):
+        """Changes whenever the cached copy of this install would be rebuilt."""
+        return "_".join(self._keys(dosbox_root, self._scan(dosbox_root)))
+
+    def get(self, dosbox_root):
+        """Returns (cache_zip_path, [(zinfo, data_offset), ...]) for the install, building it if needed."""
+        files = self._scan(dosbox_root)
+        root_key, content_key = self._keys(dosbox_root, files)
+        cache_path = os.path.join(self.cache_dir, f"{root_key}_{content_key}.zip")
+
+        if not os.path.exists(cache_path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            try:
+                policy = CompressionPolicy("smallest")
+                with ParallelZipWriter(tmp_path, level=policy.options["level"]) as zipw:
+                    for full_path, rel, size, _ in files:
+                        zipw.add_file(full_path, rel, *policy.choose(full_path, size))
+                os.replace(tmp_path, cache_path) # Atomic, concurrent builders just race to the same content
+            finally:
+                if os.path.exists(tmp_path): os.remove(tmp_path)
+            self._remove_stale(root_key, cache_path)
+
+        if cache_path not in self._members:
+            self._members[cache_path] = raw_members(cache_path)
+        return cache_path, self._members[cache_path]
+
+    def _remove_stale(self, root_key, keep_path):
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(root_key + "_") and name.endswith(".zip") and path != keep_path:
+                try: os.remove(path)
+                except OSError: pass
+                self._members.pop(path, None)
@@ -0,0 +1,153 @@
+import os
+import json
+import shutil
+from datetime import datetime
+
+from .dedupe_store import clone_file, probe_reflink, is_mutable
+
+
+class SessionSnapshots:
+    """
+    Snapshots of a game folder taken right before DOSBox starts, for one-click rollback of a session.
+
+    take() builds a copy-on-write farm of the folder: reflinks where the filesystem supports them,
+    otherwise hardlinks, with real copies of the known-mutable files (saves, configs) since DOSBox
+    writes in place and a hardlink would follow the write. finish() runs when DOSBox exits and keeps only what
+    the session changed: the old versions of modified or deleted files, plus the list of files it
+    created. Modified files that were only hardlinked lost their old content and are reported.
+    """
+    STORE_NAME = ".snapshots"
+
+    def __init__(self, games_root):
+        self.games_root = games_root
+        self.root = os.path.join(games_root, self.STORE_NAME)
+        self._reflink = None
+
+    def _game_dir(self, game_name):
+        return os.path.join(self.root, game_name)
+
+    def _load(self, snap_dir):
+        with open(os.path.join(snap_dir, "snapshot.json"), 'r', encoding='utf-8') as f: return json.load(f)
+
+    def _save(self, snap_dir, info):
+        tmp_path = os.path.join(snap_dir, "snapshot.json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(info, f)
+        os.replace(tmp_path, os.path.join(snap_dir, "snapshot.json"))
+
+    def _walk(self, folder):
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, folder).replace(os.sep, "/"), path
+
+    def take(self, game_name, game_folder):
+        """Snapshots game_folder. Returns the snapshot id."""
+        if self._reflink is None: self._reflink = probe_reflink(self.root)
+        self._remove_unfinished(game_name) # Left over by a crash during an earlier session
+        snap_id = datetime.now().strftime("%Y-%m-%d_%H%M%S_%f")
+        snap_dir = os.path.join(self._game_dir(game_name), snap_id)
+        files_dir = os.path.join(snap_dir, "files")
+        os.makedirs(files_dir)
+        entries = {}
+        for rel, path in self._walk(game_folder):
+            st = os.stat(path)
+            dest = os.path.join(files_dir, *rel.split("/"))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            try:
+                if self._reflink: clone_file(path, dest); how = "clone"
+                elif is_mutable(os.path.basename(rel)): shutil.copyfile(path, dest); how = "copy"
+                else: os.link(path, dest); how = "link"
+            except OSError:
+                shutil.copyfile(path, dest); how = "copy"
+            entries[rel] = [st.st_size, st.st_mtime_ns, st.st_ino, how]
+        self._save(snap_dir, {"created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "open": True, "files": entries})
+        return snap_id
+
+    def finish(self, game_name, snap_id, game_folder, keep=5):
+        """Reduces the snapshot to what the session changed, drops it if nothing did, caps the game's snapshots."""
+        snap_dir = os.path.join(self._game_dir(game_name), snap_id)
+        info = self._load(snap_dir)
+        files_dir = os.path.join(snap_dir, "files")
+        before = info["files"]
+        changed, lost, created = [], [], []
+        for rel, path in self._walk(game_folder):
+            old = before.get(rel)
+            if old is None: created.append(rel); continue
+            st = os.stat(path)
+            if (st.st_size, st.st_mtime_ns) != (old[0], old[1]):
+                changed.append(rel)
+                # Written in place through a shared inode: the snapshot saw the write too
+                if old[3] == "link" and st.st_ino == old[2]: lost.append(rel)
+        current = {rel for rel, _ in self._walk(game_folder)}
+        changed += [rel for rel in before if rel not in current] # Deleted during the session
+        keep_rels = set(changed) - set(lost)
+        for rel in before:
+            if rel not in keep_rels:
+                path = os.path.join(files_dir, *rel.split("/"))
+                if os.path.exists(path): os.remove(path)
+        if not changed and not created:
+            shutil.rmtree(snap_dir, ignore_errors=True)
+        else:
+            for root, dirs, _ in os.walk(files_dir, topdown=False):
+                for d in dirs:
+                    try: os.rmdir(os.path.join(root, d))
+                    except OSError: pass
+            self._save(snap_dir, {"created": info["created"], "open": False, "files": {rel: before[rel][:2] for rel in keep_rels}, "created_files": created, "lost": lost})
+        self.prune(game_name, keep)
+
+    def list(self, game_name):
+        """Finished snapshots of the game, newest first: [{"id", "created", "changed", "created_files", "lost"}]."""
+        game_dir = self._game_dir(game_name)
+        if not os.path.isdir(game_dir): return []
+        rows = []
+        for snap_id in sorted(os.listdir(game_dir), reverse=True):
+            try: info = self._load(os.path.join(game_dir, snap_id))
+            except (OSError, ValueError): continue
+            if info.get("open"): continue
+            rows.append({"id": snap_id, "created": info["created"], "changed": len(info["files"]) + len(info["lost"]), "created_files": len(info["created_files"]), "lost": info["lost"]})
+        return rows
+
+    def rollback(self, game_name, snap_id, game_folder):
+        """
+        Undoes every session from the newest back to and including snap_id, newest first.
+        Returns the list of files whose pre-session content could not be restored.
+        """
+        game_dir = self._game_dir(game_name)
+        snapshots = [row["id"] for row in self.list(game_name)]
+        if snap_id not in snapshots: raise Exception("Snapshot not found.")
+        lost = []
+        for current in snapshots[:snapshots.index(snap_id) + 1]:
+            snap_dir = os.path.join(game_dir, current)
+            info = self._load(snap_dir)
+            for rel in info["created_files"]:
+                path = os.path.join(game_folder, *rel.split("/"))
+                if os.path.exists(path): os.remove(path)
+            for rel, (size, mtime_ns) in info["files"].items():
+                dest = os.path.join(game_folder, *rel.split("/"))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                tmp_path = dest + ".rollback-tmp"
+                shutil.copyfile(os.path.join(snap_dir, "files", *rel.split("/")), tmp_path)
+                os.replace(tmp_path, dest)
+                os.utime(dest, ns=(mtime_ns, mtime_ns))
+            lost += info["lost"]
+            shutil.rmtree(snap_dir, ignore_errors=True)
+        return lost
+
+    def prune(self, game_name, keep):
+        """Keeps the newest keep finished snapshots of the game."""
+        for row in self.list(game_name)[keep:]:
+            shutil.rmtree(os.path.join(self._game_dir(game_name), row["id"]), ignore_errors=True)
+
+    def _remove_unfinished(self, game_name):
+        game_dir = self._game_dir(game_name)
+        if not os.path.isdir(game_dir): return
+        finished = {row["id"] for row in self.list(game_name)}
+        for snap_id in os.listdir(game_dir):
+            if snap_id not in finished: shutil.rmtree(os.path.join(game_dir, snap_id), ignore_errors=True)
+
+    def rename_game(self, old_name, new_name):
+        old_dir, new_dir = self._game_dir(old_name), self._game_dir(new_name)
+        if os.path.isdir(old_dir) and not os.path.exists(new_dir): os.rename(old_dir, new_dir)
+
+    def remove_game(self, game_name):
+        shutil.rmtree(self._game_dir(game_name), ignore_errors=True)
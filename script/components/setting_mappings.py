@@ -0,0 +1,62 @@
+import os
+import json
+import threading
+
+
+class SettingMappings:
+    """
+    mapping_functions.json compiled into lookup tables, reloaded when the file changes.
+    The file maps canonical keys to their name in each variant:
+    {section: {canonical key: {variant: {"section": ..., "key": ...}}}}
+    Besides the forward table (canonical -> variant) a reverse table finds the entry of any
+    variant's key name, so translating a setting is a dict lookup either way.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = False # Never loaded
+        self._raw = {}
+        self._forward = {} # (section, canonical key): {variant: target}
+        self._reverse = {} # (section, any variant's key): {variant: target}
+
+    def _current(self):
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        with self._lock:
+            if stamp == self._stamp: return
+            raw = {}
+            if stamp:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f: raw = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Could not load setting mappings: {e}")
+            forward, reverse = {}, {}
+            for section, entries in raw.items():
+                for canonical, variants in entries.items():
+                    forward[(section.lower(), canonical.lower())] = variants
+                    for target in variants.values():
+                        if target and target.get("key"):
+                            # First entry naming the key wins, as the old linear search did
+                            reverse.setdefault((section.lower(), target["key"].lower()), variants)
+            self._raw, self._forward, self._reverse, self._stamp = raw, forward, reverse, stamp
+
+    def raw(self):
+        """The mapping file as loaded. Shared, callers must not modify it."""
+        self._current()
+        return self._raw
+
+    def target(self, section, key, variant):
+        """Where the canonical key lives in variant: {"section", "key"} (None values mean "dropped"), or None if unmapped."""
+        self._current()
+        variants = self._forward.get((section.lower(), key.lower()))
+        return variants.get(variant) if variants else None
+
+    def resolve(self, section, key, variant):
+        """Like target(), but key may also be any variant's name of the setting."""
+        self._current()
+        variants = self._forward.get((section.lower(), key.lower()))
+        if variants is None: variants = self._reverse.get((section.lower(), key.lower()))
+        return variants.get(variant) if variants else None
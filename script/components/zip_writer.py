@@ -0,0 +1,239 @@
+import os
+import zlib
+import struct
+import time
+import zipfile
+import functools
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+# Members are compressed in slices of this size. Bigger files are split pigz-style,
+# every slice primed with the 32 KB before it, so even one huge .iso keeps every core busy.
+CHUNK_SIZE = 1024 * 1024
+DEFLATE_WINDOW = 32 * 1024
+DEFAULT_LEVEL = 6
+# Thread count when the caller does not pass one (None = one per CPU). Export pool processes lower it.
+DEFAULT_WORKERS = None
+
+
+# --- CRC32 combination (zlib's crc32_combine, which Python does not expose) ---
+
+def _gf2_times(mat, vec):
+    result = 0; i = 0
+    while vec:
+        if vec & 1: result ^= mat[i]
+        vec >>= 1; i += 1
+    return result
+
+def _gf2_compose(a, b):
+    return [_gf2_times(a, col) for col in b]
+
+@functools.lru_cache(maxsize=32)
+def _crc32_shift_operator(length):
+    """GF(2) matrix that advances a CRC32 over `length` zero bytes."""
+    op = [0xEDB88320] + [1 << n for n in range(31)] # one zero bit
+    for _ in range(3): op = _gf2_compose(op, op) # one zero byte
+    result = [1 << n for n in range(32)] # identity
+    while length:
+        if length & 1: result = _gf2_compose(op, result)
+        length >>= 1
+        if length: op = _gf2_compose(op, op)
+    return tuple(result)
+
+def crc32_combine(crc1, crc2, len2):
+    """CRC32 of A+B from crc32(A), crc32(B) and len(B)."""
+    if len2 <= 0: return crc1
+    if crc1 == 0: return crc2 # the operator is linear, nothing to shift
+    return _gf2_times(_crc32_shift_operator(len2), crc1) ^ crc2
+
+
+# --- Workers ---
+
+def _compress_slice(source, offset, length, level, last):
+    """
+    Runs on a pool thread (zlib and file reads release the GIL).
+    Returns (compressed_bytes, crc32, raw_length) for one slice of a member.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source[offset:offset + length])
+        zdict = bytes(source[max(0, offset - DEFLATE_WINDOW):offset])
+    else:
+        with open(source, 'rb') as f:
+            start = max(0, offset - DEFLATE_WINDOW)
+            f.seek(start)
+            buf = f.read(offset - start + length)
+        zdict, data = buf[:offset - start], buf[offset - start:]
+
+    crc = zlib.crc32(data)
+    if level is None: # ZIP_STORED
+        return data, crc, len(data)
+    if zdict:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+    else:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # A sync flush ends the slice on a byte boundary without the final-block bit,
+    # so the raw deflate streams of consecutive slices simply concatenate
+    out = comp.compress(data) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return out, crc, len(data)
+
+
+def _read_raw_slice(path, offset, length, crc, file_size, last):
+    """Copies already compressed member data out of another ZIP. CRC and size only count on the last slice."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    if len(data) != length: raise Exception(f"Truncated member data in {path}")
+    return (data, crc, file_size) if last else (data, 0, 0)
+
+
+def raw_members(zip_path):
+    """
+    Lists the members of an existing ZIP with the offset of their compressed data,
+    for splicing them into a new archive without recompressing: [(zinfo, data_offset), ...].
+    """
+    result = []
+    with zipfile.ZipFile(zip_path, 'r') as zf, open(zip_path, 'rb') as f:
+        for zinfo in zf.infolist():
+            if zinfo.is_dir(): continue
+            f.seek(zinfo.header_offset)
+            header = f.read(zipfile.sizeFileHeader)
+            if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+                raise Exception(f"Bad local header for {zinfo.filename} in {zip_path}")
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            result.append((zinfo, zinfo.header_offset + zipfile.sizeFileHeader + name_len + extra_len))
+    return result
+
+
+class ParallelZipWriter:
+    """
+    Writes a standard ZIP (deflate or stored members) while compressing on a thread pool.
+
+    Members are queued with add_file / add_bytes / add_raw and written on close(). Slices are
+    compressed concurrently into memory, but appended to the archive strictly in order,
+    with at most `workers * 4` slices in flight, so memory stays bounded.
+    The headers, ZIP64 handling and central directory are zipfile's own.
+
+    progress_callback(done_bytes, total_bytes) is called from the thread running close().
+    """
+    def __init__(self, output_path, level=DEFAULT_LEVEL, workers=None, chunk_size=CHUNK_SIZE, progress_callback=None):
+        self.output_path = output_path
+        self.level = level
+        self.workers = max(1, workers or DEFAULT_WORKERS or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.members = [] # (zinfo, source, size, level, raw) - raw is (data_offset, crc) for spliced members
+        self.total_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None: self.close()
+
+    def add_file(self, full_path, arcname, compress_type=zipfile.ZIP_DEFLATED, level=None):
+        zinfo = zipfile.ZipInfo.from_file(full_path, arcname)
+        if zinfo.is_dir(): return
+        self._add(zinfo, full_path, zinfo.file_size, compress_type, level)
+
+    def add_bytes(self, data, arcname, compress_type=zipfile.ZIP_DEFLATED, level=None):
+        if isinstance(data, str): data = data.encode('utf-8')
+        zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        zinfo.external_attr = 0o600 << 16
+        self._add(zinfo, data, len(data), compress_type, level)
+
+    def add_raw(self, source_zip, src_info, data_offset, arcname):
+        """Splices a member of another ZIP (see raw_members) in as-is, no recompression."""
+        if src_info.compress_type not in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            raise Exception(f"Unsupported compression method: {src_info.compress_type}")
+        zinfo = zipfile.ZipInfo(arcname, date_time=src_info.date_time)
+        zinfo.external_attr = src_info.external_attr
+        zinfo.compress_type = src_info.compress_type
+        zinfo.compress_size = src_info.compress_size
+        self.members.append((zinfo, source_zip, src_info.file_size, None, (data_offset, src_info.CRC)))
+        self.total_bytes += src_info.file_size
+
+    def _add(self, zinfo, source, size, compress_type, level):
+        if compress_type not in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+            raise Exception(f"Unsupported compression method: {compress_type}")
+        zinfo.compress_type = compress_type
+        if compress_type == zipfile.ZIP_STORED: level = None
+        elif level is None: level = self.level
+        self.members.append((zinfo, source, size, level, None))
+        self.total_bytes += size
+
+    def _slices(self, index):
+        """Yields (function, args, last) jobs for one member."""
+        zinfo, source, size, level, raw = self.members[index]
+        if raw:
+            data_offset, crc = raw; comp_size = zinfo.compress_size; offset = 0
+            while True:
+                length = min(self.chunk_size, comp_size - offset)
+                last = offset + length >= comp_size
+                yield _read_raw_slice, (source, data_offset + offset, length, crc, size, last), last
+                if last: break
+                offset += length
+            return
+        offset = 0
+        while True:
+            length = min(self.chunk_size, size - offset)
+            last = offset + length >= size
+            yield _compress_slice, (source, offset, length, level, last), last
+            if last: break
+            offset += length
+
+    def close(self):
+        with zipfile.ZipFile(self.output_path, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+             ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = collections.deque()
+            state = {"current": None, "done": 0}
+            max_pending = self.workers * 4
+            try:
+                for index in range(len(self.members)):
+                    for func, args, last in self._slices(index):
+                        while len(pending) >= max_pending:
+                            self._append(zipf, state, *pending.popleft())
+                        pending.append((index, last, pool.submit(func, *args)))
+                while pending:
+                    self._append(zipf, state, *pending.popleft())
+            finally:
+                for _, _, future in pending: future.cancel()
+                zipf._writing = False
+        if self.progress_callback: self.progress_callback(self.total_bytes, self.total_bytes)
+
+    def _append(self, zipf, state, index, last, future):
+        """Writes one finished slice. Mirrors ZipFile._open_to_write / _ZipWriteFile.close."""
+        data, crc, raw_len = future.result()
+        zinfo = self.members[index][0]
+
+        if state["current"] != index:
+            state["current"] = index
+            zinfo.flag_bits = 0x00
+            zinfo.CRC = 0; zinfo.compress_size = 0; zinfo.file_size = self.members[index][2]
+            # Compressed size can be larger than uncompressed size
+            state["zip64"] = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+            zipf.fp.seek(zipf.start_dir)
+            zinfo.header_offset = zipf.fp.tell()
+            zipf._writecheck(zinfo)
+            zipf._didModify = True
+            zipf._writing = True
+            zipf.fp.write(zinfo.FileHeader(state["zip64"]))
+            state["crc"] = 0; state["raw"] = 0; state["comp"] = 0
+
+        zipf.fp.write(data)
+        state["crc"] = crc32_combine(state["crc"], crc, raw_len)
+        state["raw"] += raw_len; state["comp"] += len(data)
+        state["done"] += raw_len
+        if self.progress_callback: self.progress_callback(state["done"], self.total_bytes)
+
+        if last:
+            zinfo.CRC = state["crc"]; zinfo.file_size = state["raw"]; zinfo.compress_size = state["comp"]
+            if not state["zip64"] and max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT:
+                raise Exception(f"{zinfo.filename} grew past 4 GB while it was being archived.")
+            # Seek back and rewrite the local header with the real CRC and sizes
+            zipf.start_dir = zipf.fp.tell()
+            zipf.fp.seek(zinfo.header_offset)
+            zipf.fp.write(zinfo.FileHeader(state["zip64"]))
+            zipf.fp.seek(zipf.start_dir)
+            zipf.filelist.append(zinfo)
+            zipf.NameToInfo[zinfo.filename] = zinfo
+            zipf._writing = False
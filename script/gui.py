@@ -35,9 +35,14 @@ from .windows.standardize_window import StandardizeWindow
 from .windows.config_wizard import ConfigWizard
 from .windows.start_wizard import StartWizard
 from .windows.batch_wizard import BatchUtilsWizard
+from .windows.export_queue_window import ExportQueueWindow
+from .windows.backup_restore_window import BackupRestoreWindow
 from .components.detail_panel import DetailPanel
 from .components.library_panel import LibraryPanel
 from .components.gamepad_handler import GamepadHandler
+from .components.archive_extractor import ExtractionCancelled
+from .components.compression_policy import describe_report
+from .components.capture_watcher import thumbnail_path
 from .utils import format_size, truncate_text, get_folder_size, get_file_size, restart_program
 from . import constants
 from .logger import Logger
@@ -113,6 +118,11 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         self.vlc_path = self.logic.find_vlc()
         self.first_load_complete = False 
         self.newly_imported = set()
+        self.verify_stop = threading.Event(); self.verify_events = queue.Queue()
+        # DOSBox sessions: the supervisor wakes the Tk loop through a virtual event, one queue carries all exits
+        self._session_watchers = {}
+        self.bind("<<SessionEvent>>", self._drain_session_events)
+        self.logic.supervisor.notify = lambda: self.event_generate("<<SessionEvent>>", when="tail")
 
         # --- Gamepad Support ---
         self.gamepad_handler = GamepadHandler(self)
@@ -144,6 +154,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         self.attributes('-topmost', False)
 
     def _on_close(self):
+        self.verify_stop.set()
         if hasattr(self, 'gamepad_handler'):
             self.gamepad_handler.stop()
         if self.playlist_visible and hasattr(self, 'library_panel') and self.library_panel.winfo_exists():
@@ -176,6 +187,13 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         if files:
             self.process_dropped_files(files)
 
+    def rollback_session(self, game_name, snap):
+        if not messagebox.askyesno("Roll Back Session", f"Put {game_name} back to how it was before the session of {snap['created']}?\nLater sessions are rolled back too.", parent=self): return
+        try: lost = self.logic.rollback_session(game_name, snap["id"])
+        except Exception as e: messagebox.showerror("Roll Back Error", f"Failed to roll back: {e}", parent=self); return
+        if lost: messagebox.showwarning("Roll Back Session", "Rolled back, but these files were changed in place and could not be restored:\n" + "\n".join(lost[:20]), parent=self)
+        else: messagebox.showinfo("Roll Back Session", "Game folder rolled back.", parent=self)
+
     def backup_save_data(self):
         selected = self.tree.selection()
         if not selected: return
@@ -201,6 +219,43 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             else:
                 messagebox.showerror("Error", msg, parent=self)
 
+    def _check_export_queue(self):
+        """Offers to resume a bulk export that was interrupted by a crash or restart."""
+        export_queue = self.logic.get_export_queue()
+        if not (pending := export_queue.pending()): return
+        if messagebox.askyesno("Resume Bulk Export", f"{len(pending)} queued exports did not finish last time.\n\nResume them now?", parent=self):
+            ExportQueueWindow(self, self.logic, export_queue)
+        else:
+            export_queue.clear()
+
+    def start_archive_verification(self, force=False):
+        """CRC-checks new or changed archives on a background pool, corrupt ones get a badge in the library."""
+        if self.logic.archive_verifier.running: return
+        self.verify_stop.clear()
+        def run_op():
+            try: self.logic.verify_archives(callback=lambda path, entry: self.verify_events.put(("result", (path, entry))), stop_event=self.verify_stop, force=force)
+            except Exception as e: print(f"Archive verification failed: {e}")
+            self.verify_events.put(("finished", None))
+        threading.Thread(target=run_op, daemon=True).start()
+        self.after(1000, self._poll_archive_verification)
+
+    def _poll_archive_verification(self):
+        try:
+            if not self.winfo_exists(): return
+        except Exception: return
+        corrupt_found = finished = False
+        try:
+            while True:
+                kind, data = self.verify_events.get_nowait()
+                if kind == "result" and data[1]["state"] == "corrupt":
+                    corrupt_found = True
+                    print(f"Archive failed verification: {data[0]} ({data[1]['message']})")
+                elif kind == "finished": finished = True
+        except queue.Empty:
+            pass
+        if corrupt_found: self.refresh_library()
+        if not finished: self.after(1000, self._poll_archive_verification)
+
     def open_batch_wizard(self):
         BatchUtilsWizard(self, self.logic)
 
@@ -580,6 +635,11 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             self.refresh_library()
             return
 
+        self.after(500, self._check_export_queue)
+        if self.settings.get("verify_archives", True): self.after(3000, self.start_archive_verification)
+        # Probe new or updated DOSBox binaries once, before anything asks what engine they are
+        threading.Thread(target=self.logic.probe_engines, daemon=True).start()
+
         if os.path.exists(self.logic.zipped_dir) or os.path.exists(self.logic.installed_dir): 
             self.refresh_library()
             # Select first game if none selected
@@ -648,6 +708,16 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         threading.Thread(target=calc_size, daemon=True).start()
 
         self.current_images = self.logic.get_game_images(name); self.current_img_index = 0; self.after(100, self.load_and_display_image)
+        if is_installed and self.settings.get("speculative_launch", False): self._schedule_launch_staging(zip_name)
+
+    def _schedule_launch_staging(self, zip_name):
+        """Prepares the launch of the selected game in the background once the selection has settled."""
+        if getattr(self, "_staging_after_id", None): self.after_cancel(self._staging_after_id)
+        def stage():
+            self._staging_after_id = None
+            if self.tree.exists(zip_name) and self.tree.selection() and self.tree.selection()[0] == zip_name:
+                self.logic.stage_launch_async(zip_name, self.force_fullscreen_var.get(), self.auto_exit_var.get())
+        self._staging_after_id = self.after(300, stage)
 
     def clear_preview(self): self.detail_panel.clear_details(); self.current_images = []
 
@@ -723,8 +793,8 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         try:
             # We need to pass this to logic.launch_game.
             # I will update logic.launch_game to accept dosbox_path_override
-            thread = self.logic.launch_game(zip_name, dosbox_path_override=dosbox_path, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get() if hasattr(self, 'parent_app') else self.auto_exit_var.get())
-            self._monitor_game_thread(thread, zip_name)
+            session = self.logic.launch_game(zip_name, dosbox_path_override=dosbox_path, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get() if hasattr(self, 'parent_app') else self.auto_exit_var.get())
+            self._monitor_game_session(session, zip_name)
         except Exception as e:
             messagebox.showerror("Error", str(e), parent=self)
 
@@ -741,34 +811,66 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             try: 
                 if self.settings.get("minimize_on_launch", False):
                     self.iconify()
-                thread = self.logic.launch_game(zip_name, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.auto_exit_var.get())
-                self._monitor_game_thread(thread, zip_name)
+                session = self.logic.launch_game(zip_name, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.auto_exit_var.get())
+                self._monitor_game_session(session, zip_name)
             except Exception as e: 
                 self.deiconify()
                 messagebox.showerror("Error", str(e), parent=self) if "Main executable not set" not in str(e) else (messagebox.showinfo("Setup Required", "Main executable not set. Opening configuration window.", parent=self), self.open_edit_window(switch_to_executables=True))
 
-    def _monitor_game_thread(self, thread, zip_name):
-        def check_thread():
-            if thread.is_alive():
-                self.after(1000, check_thread)
-            else:
-                print(f"DEBUG: Game thread finished for {zip_name}. Restoring window.")
-                self.deiconify()
-                if os.name == 'nt':
-                    try: self.state('normal') # Restore to normal state (not maximized/zoomed)
-                    except: pass
-                self.lift() # Ensure it comes to front
-                game_name = os.path.splitext(zip_name)[0]
-                # Refresh images (screenshots)
-                self.current_images = self.logic.get_game_images(game_name)
-                self.current_img_index = min(self.current_img_index, len(self.current_images) - 1) if self.current_images else 0
-                self.load_and_display_image()
-                
-                # Refresh library to show updated stats (Play Time, Last Played)
-                # We pass save_id to keep selection on the current game
-                self.refresh_library(renamed_zip=zip_name)
-                
-        self.after(1000, check_thread)
+    def watch_session(self, session, on_exit=None, on_finished=None):
+        """
+        Calls on_exit() in the Tk loop as soon as the session's DOSBox process exits, on_finished()
+        once its post-exit work (play stats, screenshots, snapshot) is done.
+        """
+        if session.finished.is_set():
+            if on_exit: self.after_idle(on_exit)
+            if on_finished: self.after_idle(on_finished)
+            return
+        if session.state == "exited" and on_exit: self.after_idle(on_exit); on_exit = None
+        self._session_watchers.setdefault(session.id, []).append([on_exit, on_finished])
+
+    def _drain_session_events(self, event=None):
+        while True:
+            try: kind, session = self.logic.supervisor.events.get_nowait()
+            except queue.Empty: break
+            # A callback may touch a window that was closed while the game ran, that must not stop the drain
+            if kind == "exited":
+                for watcher in self._session_watchers.get(session.id, []):
+                    on_exit, watcher[0] = watcher[0], None
+                    if on_exit: self._run_session_callback(on_exit)
+            elif kind == "finished":
+                for _, on_finished in self._session_watchers.pop(session.id, []):
+                    if on_finished: self._run_session_callback(on_finished)
+            elif kind == "capture":
+                # A screenshot/recording of the running session was just moved in
+                zip_name = self._get_selected_zip()
+                if zip_name and os.path.splitext(zip_name)[0] == session.game_name: self._run_session_callback(self._refresh_images_after_session, zip_name)
+
+    def _run_session_callback(self, callback, *args):
+        try: callback(*args)
+        except tk.TclError as e: print(f"Session callback skipped: {e}")
+
+    def _refresh_images_after_session(self, zip_name):
+        game_name = os.path.splitext(zip_name)[0]
+        # Refresh images (screenshots)
+        self.current_images = self.logic.get_game_images(game_name)
+        self.current_img_index = min(self.current_img_index, len(self.current_images) - 1) if self.current_images else 0
+        self.load_and_display_image()
+
+    def _monitor_game_session(self, session, zip_name):
+        def on_exit():
+            print(f"DEBUG: Game session finished for {zip_name}. Restoring window.")
+            self.deiconify()
+            if os.name == 'nt':
+                try: self.state('normal') # Restore to normal state (not maximized/zoomed)
+                except: pass
+            self.lift() # Ensure it comes to front
+        def on_finished():
+            self._refresh_images_after_session(zip_name)
+            # Refresh library to show updated stats (Play Time, Last Played)
+            # We pass save_id to keep selection on the current game
+            self.refresh_library(renamed_zip=zip_name)
+        self.watch_session(session, on_exit, on_finished)
 
     def launch_game(self, item_id):
         # Helper for gamepad or other direct calls
@@ -823,6 +925,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             # Size calc for sorting
             z_sz = 0
             archive_type = ""
+            archive_corrupt = False
             if self.logic.zipped_dir:
                 zp = os.path.join(self.logic.zipped_dir, f"{name_no_zip}.zip")
                 sp = os.path.join(self.logic.zipped_dir, f"{name_no_zip}.7z")
@@ -832,6 +935,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
                 elif os.path.exists(sp): 
                     z_sz = get_file_size(sp)
                     archive_type = "7z"
+                archive_corrupt = bool(archive_type) and self.logic.archive_verifier.is_corrupt(zp if archive_type == "ZIP" else sp)
             
             h_sz = get_folder_size(os.path.join(self.logic.installed_dir, name_no_zip)) if is_inst and self.logic.installed_dir else 0
             
@@ -850,6 +954,8 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             disp_name = f"{details.get('title', name_no_zip)}"
             if name_no_zip in self.newly_imported:
                 disp_name += " [NEW]"
+            if archive_corrupt:
+                disp_name += " [CORRUPT]"
             disp_name += " ★" if details.get("favorite", False) else ""
             
             cs_text = f"{details['critics_score']}%" if details.get('critics_score', 0) > 0 else ""; play_count = details.get("play_count", 0)
@@ -959,8 +1065,15 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         menu.add_command(label="Config Wizard...", command=self.open_config_wizard)
         menu.add_command(label="Rename Game...", command=self.on_rename_game)
         menu.add_command(label="Backup Save Data", command=self.backup_save_data)
-        menu.add_separator()
         details = self.logic.get_game_details(name); is_inst = 'installed' in self.tree.item(item_id, 'tags'); zip_exists = os.path.exists(os.path.join(self.logic.zipped_dir, item_id))
+        menu.add_command(label="Restore Save Backup...", command=lambda: BackupRestoreWindow(self, self.logic, name), state="normal" if is_inst else "disabled")
+        snapshots = self.logic.list_session_snapshots(name) if is_inst else []
+        if snapshots:
+            rollback_menu = tb.Menu(menu, tearoff=0)
+            for snap in snapshots: rollback_menu.add_command(label=f"Before {snap['created']} ({snap['changed'] + snap['created_files']} files changed)", command=lambda s=snap: self.rollback_session(name, s))
+            menu.add_cascade(label="Roll Back Session", menu=rollback_menu)
+        else: menu.add_command(label="Roll Back Session", state="disabled")
+        menu.add_separator()
         if is_inst:
             menu.add_command(label="▶ Play Game", command=self.on_play, font='-weight bold')
             
@@ -1098,6 +1211,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             if total > 0:
                 pct = (current / total) * 100
                 progress_bar['value'] = pct
+                if not message: message = f"Archived {format_size(current)} of {format_size(total)} ({int(pct)}%)"
             if message:
                 lbl_status.config(text=message)
             progress_win.update()
@@ -1106,12 +1220,12 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             try:
                 # Use make_7z_archive or make_zip_archive
                 if ext == ".7z":
-                    self.logic.make_7z_archive(game_name, archive_path, progress_callback=update_progress)
+                    report = self.logic.make_7z_archive(game_name, archive_path, progress_callback=update_progress)
                 else:
-                    self.logic.make_zip_archive(game_name, archive_path, progress_callback=update_progress)
+                    report = self.logic.make_zip_archive(game_name, archive_path, progress_callback=update_progress)
                     
                 progress_win.destroy()
-                messagebox.showinfo("Archive Complete", f"Game archived to:\n{archive_path}", parent=self)
+                messagebox.showinfo("Archive Complete", f"Game archived to:\n{archive_path}\n\n{describe_report(report)}", parent=self)
                 self.refresh_library(renamed_zip=f"{game_name}.zip")
             except Exception as e:
                 progress_win.destroy()
@@ -1174,7 +1288,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
             if total > 0:
                 pct = (current / total) * 100
                 progress_bar['value'] = pct
-                lbl_status.config(text=f"Processed {current}/{total} files ({int(pct)}%)")
+                lbl_status.config(text=f"Processed {format_size(current)} of {format_size(total)} ({int(pct)}%)")
             progress_win.update()
 
         # Run in thread
@@ -1184,12 +1298,14 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
                 import inspect
                 sig = inspect.signature(method)
                 if 'progress_callback' in sig.parameters:
-                    method(game_name, target_path, progress_callback=update_progress)
+                    report = method(game_name, target_path, progress_callback=update_progress)
                 else:
-                    method(game_name, target_path)
+                    report = method(game_name, target_path)
                 
                 progress_win.destroy()
-                messagebox.showinfo("Success", f"Game '{game_name}' has been processed into:\n{os.path.basename(target_path)}", parent=self)
+                msg = f"Game '{game_name}' has been processed into:\n{os.path.basename(target_path)}"
+                if isinstance(report, dict): msg += f"\n\n{describe_report(report)}"
+                messagebox.showinfo("Success", msg, parent=self)
                 self.refresh_library(renamed_zip=f"{game_name}.zip") # Refresh to show new archive size if applicable
             except Exception as e:
                 progress_win.destroy()
@@ -1199,10 +1315,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
 
     def on_make_standalone(self, flat):
         if not (zip_name := self._get_selected_zip()): return
-        game_name = os.path.splitext(zip_name)[0]; details = self.logic.get_game_details(game_name); msdos_name = "GAME"
-        if (exe_paths := details.get("executables")) and (first_exe_path := next(iter(exe_paths), None)):
-            path_parts = first_exe_path.replace("\\", "/").split('/')
-            if len(path_parts) > 2 and path_parts[0] == 'drives' and path_parts[1] == 'c': msdos_name = path_parts[2]
+        game_name = os.path.splitext(zip_name)[0]; msdos_name = self.logic.get_standalone_msdos_name(game_name)
         if not (output_path := self._handle_overwrite(os.path.join(self.logic.export_dir, f"{game_name}_standalone.zip"))): return
         self._run_long_operation(self.logic.make_standalone_archive, game_name, msdos_name, output_path, flat_structure=flat, success_message="Standalone game created successfully.")
         
@@ -1212,6 +1325,11 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         if not (self.win_standardize and self.win_standardize.winfo_exists()): self.win_standardize = StandardizeWindow(self, self.logic, game_name)
         self.win_standardize.lift()
 
+    def _restore_after_session(self):
+        if self.settings.get("minimize_on_launch", False):
+            self.deiconify()
+        self.lift() # Bring back to front
+
     def run_specific_exe(self, exe_file):
         if zip_name := self._get_selected_zip():
             self.logger.log(f"Launching specific exe: {exe_file} for {zip_name}", category="launch")
@@ -1223,21 +1341,8 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
                 
                 # Ensure app is not topmost
                 self.attributes("-topmost", False)
-                thread = self.logic.launch_game(zip_name, specific_exe=exe_file, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.auto_exit_var.get())
-                
-                def check_thread():
-                    if thread.is_alive():
-                        self.after(1000, check_thread)
-                    else:
-                        if self.settings.get("minimize_on_launch", False):
-                            self.deiconify()
-                        self.lift() # Bring back to front
-                        game_name = os.path.splitext(zip_name)[0]
-                        self.current_images = self.logic.get_game_images(game_name)
-                        self.current_img_index = min(self.current_img_index, len(self.current_images) - 1) if self.current_images else 0
-                        self.load_and_display_image()
-                
-                self.after(1000, check_thread)
+                session = self.logic.launch_game(zip_name, specific_exe=exe_file, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=self.auto_exit_var.get())
+                self.watch_session(session, self._restore_after_session, lambda: self._refresh_images_after_session(zip_name))
                 
             except Exception as e: 
                 # self.deiconify()
@@ -1255,21 +1360,8 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
                     except: pass
                     
                 self.attributes("-topmost", False)
-                thread = self.logic.launch_game(zip_name, dos_prompt_only=True, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=False)
-                
-                def check_thread():
-                    if thread.is_alive():
-                        self.after(1000, check_thread)
-                    else:
-                        if self.settings.get("minimize_on_launch", False):
-                            self.deiconify()
-                        self.lift()
-                        game_name = os.path.splitext(zip_name)[0]
-                        self.current_images = self.logic.get_game_images(game_name)
-                        self.current_img_index = min(self.current_img_index, len(self.current_images) - 1) if self.current_images else 0
-                        self.load_and_display_image()
-                
-                self.after(1000, check_thread)
+                session = self.logic.launch_game(zip_name, dos_prompt_only=True, force_fullscreen=self.force_fullscreen_var.get(), auto_exit=False)
+                self.watch_session(session, self._restore_after_session, lambda: self._refresh_images_after_session(zip_name))
                 
             except Exception as e: 
                 # self.deiconify()
@@ -1378,32 +1470,31 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         progress_bar.pack(fill=X, padx=20, pady=10)
         lbl_status = tb.Label(progress_win, text="Starting...")
         lbl_status.pack(pady=5)
+        cancel_event = threading.Event()
+        btn_cancel = tb.Button(progress_win, text="Cancel", command=cancel_event.set, bootstyle="secondary")
+        btn_cancel.pack(pady=5)
         
         def update_progress(current, total):
             if total > 0:
                 pct = (current / total) * 100
                 progress_bar['value'] = pct
-                lbl_status.config(text=f"Extracted {current}/{total} files ({int(pct)}%)")
+                lbl_status.config(text=f"Extracted {format_size(current)} of {format_size(total)} ({int(pct)}%)")
             progress_win.update()
 
         def run_op():
             try:
-                # We need to modify logic.install_game to accept progress_callback
-                # Or we can wrap it if logic supports it.
-                # I will update logic.install_game to support it.
-                self.logic.install_game(zip_name, new_folder_name, source_path=source_path, progress_callback=update_progress)
+                self.logic.install_game(zip_name, new_folder_name, source_path=source_path, progress_callback=update_progress, cancel_event=cancel_event)
                 
                 progress_win.destroy()
                 messagebox.showinfo("Success", f"Game '{old_name}' installed successfully.", parent=self)
                 self.refresh_library(renamed_zip=zip_name)
+            except ExtractionCancelled:
+                progress_win.destroy()
             except Exception as e:
                 progress_win.destroy()
                 messagebox.showerror("Error", str(e), parent=self)
 
-        # Check if archive exists
-        archive_exists = False
-        if os.path.exists(os.path.join(self.logic.zipped_dir, f"{game_name}.zip")): archive_exists = True
-        elif os.path.exists(os.path.join(self.logic.zipped_dir, f"{game_name}.7z")): archive_exists = True
+        threading.Thread(target=run_op, daemon=True).start()
         
     def on_uninstall(self):
         if not (zip_name := self._get_selected_zip()): return
@@ -1513,6 +1604,7 @@ class DOSManagerApp(TkinterDnD.Tk if HAS_DND else tb.Window):
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to permanently delete this image?\n\n{os.path.basename(img_path)}", parent=self):
             try:
                 os.remove(img_path); game_name = os.path.splitext(self._get_selected_zip())[0]; self.current_images = self.logic.get_game_images(game_name)
+                if os.path.exists(thumb := thumbnail_path(img_path)): os.remove(thumb)
                 self.current_img_index = min(self.current_img_index, len(self.current_images) - 1) if self.current_images else 0
                 self.load_and_display_image()
             except Exception as e: messagebox.showerror("Error", f"Could not delete image: {e}", parent=self)
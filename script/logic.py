@@ -1,6 +1,5 @@
 import os
 import shutil
-import subprocess
 import zipfile
 import json
 import threading
@@ -11,7 +10,9 @@ import time
 import tempfile
 from datetime import datetime
 import copy
+import hashlib
 from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
 try:
     import py7zr
     HAS_7ZIP = True
@@ -25,51 +26,96 @@ except ImportError:
     HAS_PILLOW = False
 
 from . import constants
-from .utils import remove_readonly
+from .utils import remove_readonly, format_size, lower_io_priority
 from .components.offline_db import OfflineDatabase
+from .components.archive_extractor import SevenZipExtractor, ExtractionCancelled
+from .components.zip_writer import ParallelZipWriter
+from .components.compression_policy import CompressionPolicy, DEFAULT_PRESET
+from .components.runtime_cache import RuntimeCache
+from .components.export_queue import ExportQueue
+from .components.archive_verifier import ArchiveVerifier
+from .components.dedupe_store import DedupeStore
+from .components.install_manifest import InstallManifest
+from .components.crc_cache import CrcCache, archive_member_crcs
+from .components.backup_chain import BackupChain
+from .components.chunk_store import ChunkStore
+from .components.session_snapshots import SessionSnapshots
+from .components.launch_config import ReferenceConfigCache, write_if_changed
+from .components.launch_timer import LaunchTrace, LaunchStats, wait_for_window
+from .components.engine_probe import EngineProbe, guess_variant
+from .components.process_supervisor import ProcessSupervisor
+from .components.resource_monitor import ResourceMonitor, ResourceHistory
+from .components.capture_watcher import CaptureIngestor, CaptureWatcher
+from .components.setting_mappings import SettingMappings
+from .components.option_metadata import OptionMetadataStore
+
+class _ConfLine:
+    """One line of a config document, line ending included."""
+    __slots__ = ("text", "kind", "section", "key", "value", "prev", "next")
+
+    def __init__(self, text, kind, section=None, key=None, value=None):
+        self.text, self.kind, self.section, self.key, self.value = text, kind, section, key, value
+        self.prev = self.next = None
 
 class DOSBoxConfigParser:
     """
-    Parses DOSBox configuration files, preserving structure and comments.
+    Parses DOSBox configuration files into an editable document that writes back byte for byte.
+    Lines are kept in a linked list with a section -> key -> line index, so get/set/insert are O(1).
     Supports cascading configurations.
     """
     def __init__(self):
         self.sections = {} # section -> { key: value }
-        self.raw_lines = [] # List of dicts: {type, val, section, key, original_key}
+        self.newline = "\n" # Used for inserted lines, taken from the parsed content
+        self._head = self._last = _ConfLine("", "head") # Sentinel, never written
+        self._keys = {} # section -> { key: line }
+        self._tails = {} # section -> header or last key line, new keys of the section go after it
+
+    @classmethod
+    def from_string(cls, content):
+        parser = cls()
+        parser.parse(content)
+        return parser
 
     def parse(self, content):
-        self.sections = {}
-        self.raw_lines = []
+        self.__init__()
         current_section = None
-        
-        for line in content.splitlines():
-            s = line.strip()
-            line_obj = {'val': line}
-            
+        for text in content.splitlines(keepends=True):
+            s = text.strip()
             if not s:
-                line_obj['type'] = 'empty'
+                line = _ConfLine(text, 'empty')
             elif s.startswith(('#', '%', ';')):
-                line_obj['type'] = 'comment'
+                line = _ConfLine(text, 'comment')
             elif s.startswith('[') and s.endswith(']'):
                 current_section = s[1:-1].lower()
-                line_obj['type'] = 'section'
-                line_obj['name'] = current_section
-                if current_section not in self.sections:
-                    self.sections[current_section] = {}
-            elif '=' in s and current_section:
+                line = _ConfLine(text, 'section', current_section)
+                self.sections.setdefault(current_section, {}); self._keys.setdefault(current_section, {})
+            elif '=' in s and current_section and current_section != 'autoexec':
                 key, val = s.split('=', 1)
-                key = key.strip().lower()
-                val = val.strip()
-                line_obj['type'] = 'key'
-                line_obj['section'] = current_section
-                line_obj['key'] = key
-                line_obj['value'] = val
-                line_obj['original_key'] = s.split('=')[0].strip()
-                self.sections[current_section][key] = val
+                line = _ConfLine(text, 'key', current_section, key.strip().lower(), val.strip())
+                self.sections[current_section][line.key] = line.value
+                self._keys[current_section][line.key] = line # Last one wins, as in DOSBox
             else:
-                line_obj['type'] = 'unknown'
-                
-            self.raw_lines.append(line_obj)
+                line = _ConfLine(text, 'unknown', current_section)
+            self._link(self._last, line)
+            if line.kind in ('section', 'key'): self._tails[line.section] = line
+        ending = next((t[len(t.rstrip("\r\n")):] for t in content.splitlines(keepends=True) if t.endswith(("\n", "\r"))), None)
+        if ending: self.newline = ending
+
+    def _link(self, after, line):
+        line.prev, line.next = after, after.next
+        if after.next: after.next.prev = line
+        else: self._last = line
+        after.next = line
+        return line
+
+    def _insert_after(self, after, body, kind, section=None, key=None, value=None):
+        if after is self._last and after is not self._head and not after.text.endswith(("\n", "\r")):
+            # Inserting after the unterminated last line: it gets the line break instead
+            after.text += self.newline
+            text = body
+        else:
+            text = body + self.newline
+        return self._link(after, _ConfLine(text, kind, section, key, value))
 
     def get(self, section, key, default=None):
         return self.sections.get(section.lower(), {}).get(key.lower(), default)
@@ -80,56 +126,81 @@ class DOSBoxConfigParser:
     def set(self, section, key, value):
         section = section.lower()
         key = key.lower()
-        if section not in self.sections:
-            self.sections[section] = {}
-            # Add section to raw lines
-            self.raw_lines.append({'type': 'empty', 'val': ''})
-            self.raw_lines.append({'type': 'section', 'name': section, 'val': f"[{section}]"})
-            
+        if section not in self._tails:
+            if self._last is not self._head: self._insert_after(self._last, "", 'empty')
+            self._tails[section] = self._insert_after(self._last, f"[{section}]", 'section', section)
+            self.sections.setdefault(section, {}); self._keys.setdefault(section, {})
+
         self.sections[section][key] = value
-        
-        # Update raw lines
-        found = False
-        for item in self.raw_lines:
-            if item.get('type') == 'key' and item.get('section') == section and item.get('key') == key:
-                item['value'] = value
-                item['val'] = f"{item['original_key']} = {value}"
-                found = True
-                break
-        
-        if not found:
-            # Append to section
-            # Find last line of section
-            last_idx = -1
-            for i, item in enumerate(self.raw_lines):
-                if item.get('type') == 'section' and item.get('name') == section:
-                    last_idx = i
-                elif item.get('section') == section:
-                    last_idx = i
-            
-            if last_idx != -1:
-                self.raw_lines.insert(last_idx + 1, {'type': 'key', 'section': section, 'key': key, 'value': value, 'original_key': key, 'val': f"{key} = {value}"})
-            else:
-                # Should not happen if we added section above
-                pass
+        line = self._keys[section].get(key)
+        if line:
+            if line.value == str(value): return # Unchanged, keep the line as written
+            body = line.text.rstrip("\r\n")
+            indent = body[:len(body) - len(body.lstrip())]
+            original_key = body.split('=', 1)[0].strip()
+            line.text = f"{indent}{original_key} = {value}" + line.text[len(body):]
+            line.value = str(value)
+        else:
+            tail = self._tails[section]
+            line = self._insert_after(tail, f"{key} = {value}", 'key', section, key, str(value))
+            self._keys[section][key] = line
+            self._tails[section] = line
+
+    def update(self, settings):
+        """Applies {section: {key: value}}. [autoexec] holds commands, not settings, and is left alone."""
+        for section, keys in settings.items():
+            if section.lower() == 'autoexec': continue
+            for key, value in keys.items(): self.set(section, key, value)
+
+    def _lines(self):
+        line = self._head.next
+        while line:
+            yield line
+            line = line.next
+
+    def lines(self):
+        """The document as a list of lines without line endings."""
+        return [line.text.rstrip("\r\n") for line in self._lines()]
 
     def to_string(self):
-        return "\n".join(item['val'] for item in self.raw_lines)
+        return "".join(line.text for line in self._lines())
 
 class GameLogic:
-    def __init__(self, settings):
+    def __init__(self, settings, migrate=True):
         self.settings = settings
         self.base_dir = os.getcwd()
         self.info_dir = os.path.join(self.base_dir, "info")
         self.screens_dir = os.path.join(self.base_dir, "screens") # Kept for backward compatibility but logic uses database path
         self.export_dir = os.path.join(self.base_dir, "export")
         self.import_dir = os.path.join(self.base_dir, "import")
+        self.cache_dir = os.path.join(self.base_dir, "database", "cache")
         # os.makedirs(self.info_dir, exist_ok=True) # Handled by Start Wizard
         # os.makedirs(self.screens_dir, exist_ok=True)
         # os.makedirs(self.export_dir, exist_ok=True)
         # os.makedirs(self.import_dir, exist_ok=True)
         self.db = OfflineDatabase(os.path.join(self.base_dir, "database", "DOSmetainfo.csv"))
-        self._run_migration()
+        self.runtime_cache = RuntimeCache(os.path.join(self.cache_dir, "runtime"))
+        self.archive_verifier = ArchiveVerifier(os.path.join(self.cache_dir, "archive_health.json"))
+        self.crc_cache = CrcCache(os.path.join(self.cache_dir, "file_crcs.json"))
+        self.reference_configs = ReferenceConfigCache()
+        self.option_metadata = OptionMetadataStore(os.path.join(self.base_dir, "database"), os.path.join(self.cache_dir, "option_metadata.json"))
+        self.setting_mappings = SettingMappings(os.path.join(self.base_dir, "database", "mapping_functions.json"))
+        self.launch_stats = LaunchStats(os.path.join(self.cache_dir, "launch_times.json"))
+        self.resource_monitor = ResourceMonitor()
+        self.resource_history = ResourceHistory(os.path.join(self.cache_dir, "resource_history.json"))
+        self.engine_probe = EngineProbe(os.path.join(self.cache_dir, "engines.json"), self.parse_engine_defaults, self.detect_dosbox_version)
+        self._auto_backup_pool = None
+        self._last_auto_backup = {}
+        self._trailing_auto_backup = {} # game: Timer of the run deferred to the end of its interval
+        self._launch_build_lock = threading.Lock()
+        self._staged_launch = None
+        self._staging_pool = None
+        self._staging_request = None
+        self.supervisor = ProcessSupervisor()
+        self._capture_ingestors = {}
+        self._capture_lock = threading.Lock()
+        # Export pool processes skip it, the app already migrated the library before starting them
+        if migrate: self._run_migration()
         self.HAS_7ZIP = HAS_7ZIP
 
     @property
@@ -144,6 +215,24 @@ class GameLogic:
             if item.get("default"): return item.get("path", "")
         return ""
 
+    def probe_engines(self):
+        """Probes every configured DOSBox binary that is not cached yet (run in the background at startup)."""
+        for inst in self.settings.get("dosbox_installations", []):
+            try: self.engine_probe.get(inst.get("path"))
+            except Exception as e: print(f"Engine probe failed for {inst.get('path')}: {e}")
+
+    def engine_type_for(self, dosbox_path=None):
+        """
+        Engine type ("dosbox", "dosbox-staging", "dosbox-x") of the given or default DOSBox binary.
+        Safe on the UI thread: reads the probe cache only, guesses from the path on a miss and probes in the background.
+        """
+        dosbox_path = dosbox_path or self.default_dosbox_exe
+        if dosbox_path and self.engine_probe.cached(dosbox_path) is None: self._probe_in_background(dosbox_path)
+        return self.engine_probe.variant(dosbox_path, probe=False)
+
+    def _probe_in_background(self, dosbox_path):
+        threading.Thread(target=self.engine_probe.get, args=(dosbox_path,), daemon=True, name="EngineProbe").start()
+
     def check_dosbox_exists(self):
         """Checks if a valid DOSBox executable exists in the DOSBox folder."""
         dosbox_root = os.path.join(self.base_dir, "DOSBox")
@@ -152,6 +241,8 @@ class GameLogic:
                 os.makedirs(dosbox_root)
             except: pass
             return False
+        # Configured installations that are still there answer it without walking the folder (or probing, this runs on the UI thread)
+        if any(os.path.isfile(inst.get("path") or "") for inst in self.settings.get("dosbox_installations", [])): return True
             
         for root, dirs, files in os.walk(dosbox_root):
             for file in files:
@@ -203,8 +294,7 @@ class GameLogic:
                 if source_path.lower().endswith('.7z'):
                     if not HAS_7ZIP:
                         raise Exception("py7zr module not found. Please install it to support 7z files (pip install py7zr).")
-                    with py7zr.SevenZipFile(source_path, mode='r') as z:
-                        z.extractall(path=temp_path)
+                    SevenZipExtractor(source_path).extract(temp_path)
                 else:
                     with zipfile.ZipFile(source_path, 'r') as zip_ref:
                         zip_ref.extractall(temp_path)
@@ -284,15 +374,9 @@ class GameLogic:
         if not dosbox_path: dosbox_path = self.default_dosbox_exe
         if not dosbox_path: return ""
         
-        base_dir = os.path.dirname(dosbox_path)
-        # Try to find a .conf file
-        conf_files = [f for f in os.listdir(base_dir) if f.endswith('.conf')]
-        # Prefer dosbox.conf, then dosbox-staging.conf, then dosbox-x.conf
-        for name in ['dosbox.conf', 'dosbox-staging.conf', 'dosbox-x.conf']:
-             if name in conf_files:
-                 try:
-                     with open(os.path.join(base_dir, name), 'r') as f: return f.read()
-                 except: pass
+        # The engine's own config, found once by the engine probe
+        info = self.engine_probe.get(dosbox_path)
+        if info and info["conf_path"]: return self.reference_configs.read(info["conf_path"])
         
         # If not found, return empty or generic
         return ""
@@ -302,22 +386,12 @@ class GameLogic:
         if not dosbox_path: dosbox_path = self.default_dosbox_exe
         if not dosbox_path: return None
         
-        base_dir = os.path.dirname(dosbox_path)
-        exe_name = os.path.basename(dosbox_path).lower()
-        conf_files = [f for f in os.listdir(base_dir) if f.endswith('.conf')]
-        
-        # Determine priority based on exe name
-        priority = ['dosbox.conf'] # Default priority
-        if 'staging' in exe_name:
-            priority = ['dosbox-staging.conf', 'dosbox.conf']
-        elif 'dosbox-x' in exe_name:
-            priority = ['dosbox-x.conf', 'dosbox.conf']
-            
-        for name in priority:
-             if name in conf_files:
-                 return os.path.join(base_dir, name)
+        info = self.engine_probe.get(dosbox_path)
+        if info and info["conf_path"]: return info["conf_path"]
         
         # Fallback to any .conf
+        base_dir = os.path.dirname(dosbox_path)
+        conf_files = [f for f in os.listdir(base_dir) if f.endswith('.conf')] if os.path.isdir(base_dir) else []
         if conf_files:
             return os.path.join(base_dir, conf_files[0])
             
@@ -374,6 +448,11 @@ class GameLogic:
         if os.path.exists(old_game_dir): 
             try:
                 os.rename(old_game_dir, new_game_dir)
+                self.dedupe_store.rename(old_game_dir, new_game_dir)
+                self.session_snapshots.rename_game(old_name, new_name)
+                self._capture_ingestors.pop(old_name, None)
+                self.launch_stats.rename(old_name, new_name)
+                self.resource_history.rename(old_name, new_name)
             except OSError:
                 # If rename fails (e.g. same name different case on some filesystems), we might need temp rename
                 # But usually os.rename handles case change on Windows fine if it's the same inode
@@ -415,21 +494,94 @@ class GameLogic:
                 
         return new_name, None
 
-    def uninstall_game(self, zip_name):
+    @property
+    def dedupe_store(self):
+        # The games folder can be changed in the settings, the store lives inside it
+        if getattr(self, "_dedupe_store", None) is None or self._dedupe_store.games_root != self.installed_dir:
+            self._dedupe_store = DedupeStore(self.installed_dir)
+        return self._dedupe_store
+
+    @property
+    def session_snapshots(self):
+        if getattr(self, "_session_snapshots", None) is None or self._session_snapshots.games_root != self.installed_dir:
+            self._session_snapshots = SessionSnapshots(self.installed_dir)
+        return self._session_snapshots
+
+    def list_session_snapshots(self, game_name):
+        return self.session_snapshots.list(game_name)
+
+    def rollback_session(self, game_name, snap_id):
+        """Puts the game folder back to how it was before the chosen session. Returns files that could not be restored."""
+        game_folder = self.find_game_folder(game_name)
+        if not os.path.isdir(game_folder): raise Exception("Game is not installed.")
+        self.dedupe_store.unshare(game_folder)
+        return self.session_snapshots.rollback(game_name, snap_id, game_folder)
+
+    def dedupe_games(self, game_names=None):
+        """Links identical files of the given installed games (all if None) into the content store. Returns a summary."""
+        folders = [f for f in (self.find_game_folder(g) for g in game_names) if os.path.isdir(f)] if game_names else None
+        if game_names and not folders: return "None of the selected games is installed."
+        report = self.dedupe_store.dedupe(folders)
+        total = self.dedupe_store.stats()
+        how = "copy-on-write clones" if report["mode"] == "reflink" else "read-only hardlinks"
+        summary = (f"Scanned {report['scanned']} files, replaced {report['files']} duplicates with {how}, reclaiming {format_size(report['bytes'])}.\n"
+                   f"In total {total['files']} files share {total['objects']} stored copies, saving {format_size(total['bytes'])}.")
+        if report["mode"] == "hardlink": summary += "\nA game gets writable copies of its hardlinked files back when it is launched."
+        return summary
+
+    def undo_dedupe(self, game_names=None):
+        """Gives the files of the given games (all if None) their own copies again. Returns a summary."""
+        folders = [self.find_game_folder(g) for g in game_names] if game_names else [None]
+        count = sum(self.dedupe_store.unshare(folder) for folder in folders)
+        return f"Restored {count} files to independent copies."
+
+    def find_game_archive(self, game_name):
+        """Path of the game's .zip or .7z in the archive folder, None if there is none."""
+        for ext in (".zip", ".7z"):
+            path = os.path.join(self.zipped_dir, f"{game_name}{ext}")
+            if os.path.exists(path): return path
+        return None
+
+    def verify_archives(self, callback=None, stop_event=None, force=False):
+        """Background CRC check of the archive folder, see ArchiveVerifier.verify_folder."""
+        self.archive_verifier.verify_folder(self.zipped_dir, callback=callback, stop_event=stop_event, force=force)
+
+    def is_archive_corrupt(self, game_name):
+        path = self.find_game_archive(game_name)
+        return bool(path) and self.archive_verifier.is_corrupt(path)
+
+    def uninstall_game(self, zip_name, keep_saves=None):
+        """
+        Deletes the installed game folder. keep_saves=None asks whether to back up changed files first,
+        True/False decides without asking (bulk queue). In that mode a failed backup aborts the uninstall.
+        """
         game_name = os.path.splitext(zip_name)[0]
         
         # Offer backup
-        if messagebox.askyesno("Uninstall", "Do you want to keep save data (backup changes)?"):
-            self.backup_save_data(game_name)
+        if keep_saves is None:
+            if messagebox.askyesno("Uninstall", "Do you want to keep save data (backup changes)?"):
+                self.backup_save_data(game_name)
+        elif keep_saves:
+            self.backup_save_data(game_name, quiet=True)
             
         install_path = self.find_game_folder(game_name)
-        if os.path.isdir(install_path): shutil.rmtree(install_path, onerror=remove_readonly)
+        if os.path.isdir(install_path):
+            self.dedupe_store.release(install_path)
+            shutil.rmtree(install_path, onerror=remove_readonly)
+            self.crc_cache.forget(install_path)
+        self.session_snapshots.remove_game(game_name)
         
         # Remove manifest
         manifest_path = os.path.join(self.base_dir, "info", f"{game_name}.manifest")
         if os.path.exists(manifest_path): os.remove(manifest_path)
 
-    def install_game(self, zip_name, new_folder_name, source_path=None, progress_callback=None):
+    def install_game(self, zip_name, new_folder_name, source_path=None, progress_callback=None, cancel_event=None, restore_backup=None):
+        """
+        Extracts an archive into games/<new_folder_name>.
+        progress_callback(done_bytes, total_bytes) is throttled; cancel_event (threading.Event) aborts
+        the extraction and removes the partially installed folder (ExtractionCancelled is raised).
+        restore_backup: None asks about an existing save backup, True/False decides without asking.
+        """
         if source_path:
             zip_path = source_path
         else:
@@ -447,31 +599,30 @@ class GameLogic:
         if os.path.exists(install_folder): raise Exception(f"A folder named '{new_folder_name}' already exists.")
         os.makedirs(install_folder, exist_ok=True)
         
-        if zip_path.lower().endswith('.7z'):
-            if not HAS_7ZIP: raise Exception("py7zr module not found.")
-            with py7zr.SevenZipFile(zip_path, mode='r') as z:
-                if progress_callback:
-                    # py7zr doesn't support progress callback easily for extractall
-                    # We can iterate and extract
-                    all_files = z.getnames()
-                    total = len(all_files)
-                    z.extractall(path=install_folder)
-                    # Just update to 100% as we can't track per file easily without manual extraction loop which is slower
-                    progress_callback(total, total)
-                else:
-                    z.extractall(path=install_folder)
-        else:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                if progress_callback:
-                    file_list = zip_ref.namelist()
-                    total = len(file_list)
-                    for i, file in enumerate(file_list):
-                        zip_ref.extract(file, install_folder)
-                        if i % 10 == 0: # Update every 10 files to avoid UI lag
-                            progress_callback(i + 1, total)
-                    progress_callback(total, total)
-                else:
-                    zip_ref.extractall(install_folder)
+        try:
+            if zip_path.lower().endswith('.7z'):
+                if not HAS_7ZIP: raise Exception("py7zr module not found.")
+                # Streams members to disk with byte progress; decodes non-solid blocks in parallel
+                SevenZipExtractor(zip_path, progress_callback=progress_callback, cancel_event=cancel_event).extract(install_folder)
+            else:
+                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                    if progress_callback or cancel_event:
+                        infos = zip_ref.infolist()
+                        total = sum(info.file_size for info in infos)
+                        done = 0
+                        for i, info in enumerate(infos):
+                            if cancel_event and cancel_event.is_set(): raise ExtractionCancelled("Extraction cancelled.")
+                            zip_ref.extract(info, install_folder)
+                            done += info.file_size
+                            if progress_callback and i % 10 == 0: # Update every 10 files to avoid UI lag
+                                progress_callback(done, total)
+                        if progress_callback: progress_callback(total, total)
+                    else:
+                        zip_ref.extractall(install_folder)
+        except BaseException:
+            # Don't leave a half-extracted game behind
+            shutil.rmtree(install_folder, onerror=remove_readonly)
+            raise
             
         new_game_name = os.path.basename(install_folder)
         
@@ -516,7 +667,7 @@ class GameLogic:
         self.create_install_manifest(new_game_name)
         
         # Check for backups
-        self.check_and_restore_backup(new_game_name)
+        self.check_and_restore_backup(new_game_name, restore=restore_backup)
 
         return new_game_name
 
@@ -524,110 +675,243 @@ class GameLogic:
         game_folder = self.find_game_folder(game_name)
         if not os.path.exists(game_folder): return
         
-        manifest = {}
-        for root, dirs, files in os.walk(game_folder):
-            for file in files:
-                path = os.path.join(root, file)
-                rel_path = os.path.relpath(path, game_folder)
-                try:
-                    stat = os.stat(path)
-                    manifest[rel_path] = {
-                        "size": stat.st_size,
-                        "mtime": stat.st_mtime
-                    }
-                except: pass
-        
         manifest_path = os.path.join(self.base_dir, "database", "games_datainfo", game_name, f"{game_name}.manifest")
         try:
-            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
-            with open(manifest_path, 'w') as f:
-                json.dump(manifest, f)
+            InstallManifest.build(game_folder).save(manifest_path)
         except Exception as e:
             print(f"Failed to create manifest: {e}")
 
-    def backup_save_data(self, game_name):
+    def backup_save_data(self, game_name, quiet=False):
+        """
+        Backs up files changed since install (manifest based) as a new chain point.
+        Returns the path of the game's chain index, or None if nothing changed.
+        quiet=True shows no dialogs and raises on failure instead.
+        """
         manifest_path = os.path.join(self.base_dir, "database", "games_datainfo", game_name, f"{game_name}.manifest")
         if not os.path.exists(manifest_path): return
         
         try:
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-        except:
+            manifest = InstallManifest.load(manifest_path)
+        except Exception:
             return
 
         game_folder = self.find_game_folder(game_name)
-        changed_files = []
-        
-        for root, dirs, files in os.walk(game_folder):
-            for file in files:
-                path = os.path.join(root, file)
-                rel_path = os.path.relpath(path, game_folder)
-                
-                # Check if new or changed
-                if rel_path not in manifest:
-                    changed_files.append(path)
-                else:
-                    try:
-                        stat = os.stat(path)
-                        # Check size or mtime (allow 2 second tolerance for FAT/zip timestamps)
-                        if stat.st_size != manifest[rel_path]["size"] or abs(stat.st_mtime - manifest[rel_path]["mtime"]) > 2:
-                            changed_files.append(path)
-                    except: pass
+        # Stat first, files whose timestamps moved at the same size are confirmed by CRC32
+        changed_files = manifest.changed_files(game_folder)
                         
         if not changed_files: 
-            messagebox.showinfo("Backup", "No changes detected.")
-            return
-        
-        # Create archive
-        backup_dir = os.path.join(self.base_dir, "archive", "backups")
-        os.makedirs(backup_dir, exist_ok=True)
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        archive_name = f"{game_name}_{date_str}.save.7z"
-        archive_path = os.path.join(backup_dir, archive_name)
+            if not quiet: messagebox.showinfo("Backup", "No changes detected.")
+            return None
         
         try:
-            if HAS_7ZIP:
-                with py7zr.SevenZipFile(archive_path, 'w') as z:
-                    for file in changed_files:
-                        rel = os.path.relpath(file, game_folder)
-                        z.write(file, rel)
-            else:
-                # Fallback to zip
-                archive_path = archive_path.replace(".7z", ".zip")
-                with zipfile.ZipFile(archive_path, 'w') as z:
-                    for file in changed_files:
-                        rel = os.path.relpath(file, game_folder)
-                        z.write(file, rel)
-                        
-            messagebox.showinfo("Backup Created", f"Save data backed up to:\n{archive_name}")
+            point = self.add_backup_point(game_name, [(f, os.path.relpath(f, game_folder)) for f in changed_files])
+            if point is None:
+                if not quiet: messagebox.showinfo("Backup", "No changes since the last backup.")
+                return None
+            if not quiet: messagebox.showinfo("Backup Created", f"Save data backed up ({self._describe_point(point)}).")
+            return self.get_backup_chain(game_name).index_path
         except Exception as e:
+            if quiet: raise Exception(f"Failed to create backup: {e}")
             messagebox.showerror("Backup Error", f"Failed to create backup: {e}")
 
-    def check_and_restore_backup(self, game_name):
+    def schedule_auto_backup(self, game_name):
+        """
+        Queues a silent save backup after a main-game session (opt-in via auto_backup_saves).
+        Debounced per game by auto_backup_interval minutes: a session inside the interval gets one trailing
+        run at its end, so its saves are still backed up. Runs on one low-priority worker thread.
+        """
+        if not self.settings.get("auto_backup_saves", False): return
+        interval = self.settings.get("auto_backup_interval", 15) * 60
+        last = self._last_auto_backup.get(game_name)
+        if last is None and (point := self.get_backup_chain(game_name).latest()):
+            # The chain remembers the last backup across restarts
+            try: last = datetime.strptime(point["created"], "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError: pass
+        if last is not None and (wait := last + interval - time.time()) > 0:
+            if game_name not in self._trailing_auto_backup:
+                timer = threading.Timer(wait, self._submit_auto_backup, args=(game_name,))
+                timer.daemon = True
+                self._trailing_auto_backup[game_name] = timer
+                timer.start()
+            return
+        self._submit_auto_backup(game_name)
+
+    def _submit_auto_backup(self, game_name):
+        self._trailing_auto_backup.pop(game_name, None)
+        self._last_auto_backup[game_name] = time.time()
+        if self._auto_backup_pool is None:
+            self._auto_backup_pool = ThreadPoolExecutor(max_workers=1, initializer=lower_io_priority)
+        self._auto_backup_pool.submit(self._run_auto_backup, game_name)
+
+    def _run_auto_backup(self, game_name):
+        try:
+            if self.backup_save_data(game_name, quiet=True): print(f"Automatic backup of {game_name} created.")
+        except Exception as e:
+            print(f"Automatic backup of {game_name} failed: {e}")
+
+    @property
+    def backup_dir(self): return os.path.join(self.base_dir, "archive", "backups")
+
+    def get_chunk_store(self):
+        policy = CompressionPolicy(self.settings.get("compression_preset", DEFAULT_PRESET))
+        return ChunkStore(os.path.join(self.backup_dir, "repo"), level=policy.options["level"])
+
+    def get_backup_chain(self, game_name):
+        return BackupChain(self.backup_dir, game_name, self.get_chunk_store())
+
+    def add_backup_point(self, game_name, files, progress_callback=None):
+        """Adds an incremental backup point for files [(path, rel_path)] and applies the retention policy."""
+        chain = self.get_backup_chain(game_name)
+        with chain.store.lock:
+            point = chain.add(files, self.crc_cache, progress_callback=progress_callback)
+            if point is not None and chain.prune(**self._backup_retention()): self.collect_backup_garbage()
+        return point
+
+    def _backup_retention(self):
+        return {"keep_last": self.settings.get("backup_keep_last", 10), "keep_daily": self.settings.get("backup_keep_daily", 7), "keep_weekly": self.settings.get("backup_keep_weekly", 8)}
+
+    def _all_backup_chains(self):
+        if not os.path.isdir(self.backup_dir): return []
+        return [self.get_backup_chain(f[:-len(".chain.json")]) for f in os.listdir(self.backup_dir) if f.endswith(".chain.json")]
+
+    def collect_backup_garbage(self):
+        """Deletes chunks no backup point of any game references. Returns (chunks removed, bytes freed)."""
+        store = self.get_chunk_store()
+        with store.lock: # No point may be added between reading the chains and deleting chunks
+            referenced = set()
+            for chain in self._all_backup_chains(): referenced |= chain.referenced_chunks()
+            return store.collect_garbage(referenced)
+
+    def apply_backup_retention(self):
+        """Prunes every game's chain with the retention settings, then collects garbage. Returns a summary."""
+        with self.get_chunk_store().lock:
+            removed = sum(chain.prune(**self._backup_retention()) for chain in self._all_backup_chains())
+            chunks, freed = self.collect_backup_garbage()
+        return f"Removed {removed} backup points and {chunks} unused chunks, freeing {format_size(freed)}."
+
+    def import_legacy_backups(self):
+        """Moves all single-archive backups (.save.7z / .save.zip) into the chunk store and deletes them. Returns a summary."""
+        if not os.path.isdir(self.backup_dir): return "No backups found."
+        game_names = {os.path.splitext(z)[0] for z in self.get_game_list()[0]}
+        imported, failed = 0, []
+        for game_name in sorted(game_names, key=len, reverse=True): # Longest first, "Doom_2_..." is not a backup of "Doom"
+            chain = self.get_backup_chain(game_name)
+            for f in sorted(self._legacy_backups(game_name)):
+                path = os.path.join(self.backup_dir, f)
+                if not os.path.exists(path): continue
+                try:
+                    chain.import_archive(path)
+                    os.remove(path); imported += 1
+                except Exception as e:
+                    failed.append(f"{f}: {e}")
+        stats = self.get_chunk_store().stats()
+        msg = f"Imported {imported} backups. The backup store now holds {stats['chunks']} chunks ({format_size(stats['bytes'])})."
+        if failed: msg += "\n\nFailed:\n" + "\n".join(failed)
+        return msg
+
+    def _describe_point(self, point):
+        return f"{point['created']}: {len(point['files'])} saved files, {format_size(point.get('new_bytes', 0))} of new data"
+
+    def _legacy_backups(self, game_name):
+        """Single-archive backups from before backup chains, newest first."""
+        backup_dir = self.backup_dir
+        if not os.path.exists(backup_dir): return []
+        backups = [f for f in os.listdir(backup_dir) if f.startswith(game_name + "_") and f.endswith((".7z", ".zip"))]
+        return sorted(backups, reverse=True)
+
+    def list_backup_points(self, game_name):
+        """Everything restorable for the game, newest first: [{"kind", "id", "created", "files", "stored", "size"}]."""
+        rows = [dict(row, kind="chain") for row in self.get_backup_chain(game_name).describe()]
         backup_dir = os.path.join(self.base_dir, "archive", "backups")
-        if not os.path.exists(backup_dir): return
-        
-        # Find backups for this game
-        backups = [f for f in os.listdir(backup_dir) if f.startswith(game_name + "_") and (f.endswith(".7z") or f.endswith(".zip"))]
-        if not backups: return
-        
-        # Sort by date (descending)
-        backups.sort(reverse=True)
-        latest_backup = backups[0]
+        for f in self._legacy_backups(game_name):
+            rows.append({"kind": "legacy", "id": f, "created": f[len(game_name) + 1:].split(".")[0], "files": "", "stored": "", "size": format_size(os.path.getsize(os.path.join(backup_dir, f)))})
+        return rows
+
+    def restore_backup_point(self, game_name, kind, point_id):
+        """Restores a chain point (composed in one pass) or a legacy backup archive into the installed game."""
+        game_folder = self.find_game_folder(game_name)
+        if not os.path.isdir(game_folder): raise Exception("Game is not installed.")
+        # Restored files overwrite in place, shared (hardlinked) files must get their own copy first
+        self.dedupe_store.unshare(game_folder)
+        if kind == "chain":
+            chain = self.get_backup_chain(game_name)
+            written = chain.restore(point_id, game_folder)
+            return written + self._revert_to_install(game_name, game_folder, set(chain.get(point_id)["files"]))
+        archive_path = os.path.join(self.base_dir, "archive", "backups", point_id)
+        # Differential backups are ZIPs even when named .save.7z, so go by content
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path, 'r') as z:
+                z.extractall(game_folder)
+                return len(z.namelist())
+        if not HAS_7ZIP: raise Exception("py7zr module not found.")
+        with py7zr.SevenZipFile(archive_path, 'r') as z:
+            count = len(z.getnames())
+            z.extractall(path=game_folder)
+            return count
+
+    def _revert_to_install(self, game_name, game_folder, keep):
+        """
+        Makes a restore point-in-time: files changed since install that the point does not have (keep: its
+        "/" separated paths) are put back to their install state from the game's archive, files the install
+        did not have are removed. The app's own dosbox.conf/custom.conf and captures are left alone.
+        Returns the number of files reverted or removed.
+        """
+        manifest_path = os.path.join(self.base_dir, "database", "games_datainfo", game_name, f"{game_name}.manifest")
+        if not os.path.exists(manifest_path): return 0
+        manifest = InstallManifest.load(manifest_path)
+        changed = [os.path.relpath(path, game_folder) for path in manifest.changed_files(game_folder)]
+        changed += [rel for rel in manifest.entries if not os.path.exists(os.path.join(game_folder, rel))]
+        app_files = {"dosbox.conf", "custom.conf"}
+        stale = [rel for rel in changed if rel.replace(os.sep, "/") not in keep and rel not in app_files and rel.split(os.sep)[0] != "capture"]
+
+        count = 0
+        for rel in stale:
+            if rel in manifest.entries: continue
+            try: os.remove(os.path.join(game_folder, rel)); count += 1
+            except OSError as e: print(f"Could not remove {rel}: {e}")
+        revert = [rel for rel in stale if rel in manifest.entries]
+        if not revert: return count
+        archive_path = self.find_game_archive(game_name)
+        if not archive_path: raise Exception(f"{len(revert)} files changed after this backup, but the game archive to revert them from is missing.")
+        members = {rel.replace(os.sep, "/"): rel for rel in revert}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if zipfile.is_zipfile(archive_path):
+                with zipfile.ZipFile(archive_path, 'r') as z: z.extractall(tmp_dir, [n for n in z.namelist() if n in members])
+            else:
+                if not HAS_7ZIP: raise Exception("py7zr module not found.")
+                with py7zr.SevenZipFile(archive_path, 'r') as z: z.extract(path=tmp_dir, targets=[n for n in z.getnames() if n in members])
+            for member, rel in members.items():
+                src, dest = os.path.join(tmp_dir, rel), os.path.join(game_folder, rel)
+                if not os.path.isfile(src):
+                    print(f"{member} is not in the game archive, left as is.")
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.move(src, dest)
+                mtime_ns = manifest.entries[rel][1]
+                os.utime(dest, ns=(mtime_ns, mtime_ns))
+                count += 1
+        return count
+
+    def check_and_restore_backup(self, game_name, restore=None):
+        """Offers the newest save backup after install. restore=True/False skips the question and all dialogs."""
+        if (point := self.get_backup_chain(game_name).latest()):
+            kind, point_id, label = "chain", point["id"], f"Backup of {point['created']} ({len(point['files'])} files)"
+        elif (legacy := self._legacy_backups(game_name)):
+            kind, point_id, label = "legacy", legacy[0], legacy[0]
+        else:
+            return
         
-        if messagebox.askyesno("Restore Backup", f"Found a backup for {game_name}:\n{latest_backup}\n\nDo you want to restore it?"):
-            archive_path = os.path.join(backup_dir, latest_backup)
-            game_folder = self.find_game_folder(game_name)
-            
+        if restore is None:
+            restore = messagebox.askyesno("Restore Backup", f"Found a backup for {game_name}:\n{label}\n\nDo you want to restore it?")
+            interactive = True
+        else:
+            interactive = False
+        if restore:
             try:
-                if archive_path.endswith(".7z") and HAS_7ZIP:
-                    with py7zr.SevenZipFile(archive_path, 'r') as z:
-                        z.extractall(path=game_folder)
-                else:
-                    with zipfile.ZipFile(archive_path, 'r') as z:
-                        z.extractall(game_folder)
-                messagebox.showinfo("Restore Complete", "Save data restored.")
+                self.restore_backup_point(game_name, kind, point_id)
+                if interactive: messagebox.showinfo("Restore Complete", "Save data restored.")
             except Exception as e:
+                if not interactive: raise Exception(f"Failed to restore backup: {e}")
                 messagebox.showerror("Restore Error", f"Failed to restore backup: {e}")
 
     def _run_migration(self):
@@ -673,6 +957,7 @@ class GameLogic:
         installed_games_basenames = set()
         if self.installed_dir and os.path.exists(self.installed_dir):
             for d in os.listdir(self.installed_dir):
+                if d in (DedupeStore.STORE_NAME, SessionSnapshots.STORE_NAME): continue
                 if os.path.isdir(os.path.join(self.installed_dir, d)): installed_games_basenames.add(d)
         all_game_basenames.update(installed_games_basenames)
         
@@ -745,16 +1030,14 @@ class GameLogic:
         for inst in installations:
             name = inst.get("name", "Unknown")
             path = inst.get("path", "")
-            engine_type = "dosbox" # Default
-            if "staging" in name.lower() or "staging" in path.lower():
-                engine_type = "dosbox-staging"
-            elif "dosbox-x" in name.lower() or "dosbox-x" in path.lower():
-                engine_type = "dosbox-x"
+            info = self.engine_probe.get(path)
+            engine_type = info["variant"] if info else guess_variant(f"{name} {path}")
             
             engines.append({
                 "name": name,
                 "path": path,
-                "type": engine_type
+                "type": engine_type,
+                "version": info["version"] if info else "Unknown"
             })
         return engines
 
@@ -773,21 +1056,15 @@ class GameLogic:
         else:
             candidates = ["dosbox.conf"]
             
-        for root, dirs, files in os.walk(dosbox_root):
-            for f in files:
-                if f in candidates:
-                    try:
-                        with open(os.path.join(root, f), "r", encoding="utf-8") as file:
-                            return file.read()
-                    except: pass
-                    
+        path = self.reference_configs.find(dosbox_root, candidates)
         # Fallback: Return empty or minimal config
-        return ""
+        return self.reference_configs.read(path) if path else ""
 
     def prepare_launch_configs(self, game_name, engine_type, user_overrides):
         """
         Generates the 3-layer configuration for launching.
         Returns (base_conf_path, game_conf_path, override_conf_path)
+        Files are only rewritten when their content changes.
         """
         temp_dir = os.path.join(self.base_dir, "database", "games_datainfo", game_name, "confs")
         os.makedirs(temp_dir, exist_ok=True)
@@ -795,8 +1072,7 @@ class GameLogic:
         # Layer 1: Base Config
         base_content = self.get_base_config(engine_type)
         base_conf_path = os.path.join(temp_dir, "base_engine.conf")
-        with open(base_conf_path, "w", encoding="utf-8") as f:
-            f.write(base_content)
+        write_if_changed(base_conf_path, base_content)
             
         # Layer 2: Game Static Config
         game_folder = self.find_game_folder(game_name)
@@ -816,8 +1092,7 @@ class GameLogic:
                 for key, value in keys.items():
                     parser.set(section, key, value)
                 
-        with open(override_conf_path, "w", encoding="utf-8") as f:
-            f.write(parser.to_string())
+        write_if_changed(override_conf_path, parser.to_string())
             
         return base_conf_path, game_conf_path, override_conf_path
 
@@ -876,6 +1151,68 @@ class GameLogic:
         return mount_c_path
 
     def launch_game(self, zip_name, specific_exe=None, force_fullscreen=False, auto_exit=False, dos_prompt_only=False, dosbox_path_override=None, config_override_path=None, details_override=None):
+        trace = LaunchTrace(os.path.splitext(zip_name)[0])
+        plan = None
+        if not (specific_exe or dos_prompt_only or dosbox_path_override or config_override_path or details_override):
+            # Plain Play: use what the speculative stage prepared while the game was selected, if still valid
+            plan = self.take_staged_launch(zip_name, force_fullscreen, auto_exit)
+            if plan: trace.staged = True
+        if not plan:
+            with self._launch_build_lock:
+                plan = self._build_launch(zip_name, trace, specific_exe, force_fullscreen, auto_exit, dos_prompt_only, dosbox_path_override, config_override_path, details_override)
+        return self._start_launch(plan, trace)
+
+    def stage_launch(self, zip_name, force_fullscreen=False, auto_exit=False):
+        """
+        Speculative stage: builds the configs and command line of a plain Play launch in advance,
+        so pressing Play only has to start DOSBox. Returns True if a launch plan was staged.
+        """
+        key = (zip_name, force_fullscreen, auto_exit)
+        with self._launch_build_lock:
+            staged = self._staged_launch
+            if staged and staged["key"] == key and staged["fingerprint"] == self._launch_fingerprint(staged["plan"]): return True
+            try:
+                plan = self._build_launch(zip_name, LaunchTrace(os.path.splitext(zip_name)[0]), force_fullscreen=force_fullscreen, auto_exit=auto_exit)
+            except Exception as e:
+                self._staged_launch = None
+                print(f"Speculative launch preparation skipped: {e}")
+                return False
+            # Validate: everything the command line points at must exist
+            conf_paths = [plan["cmd"][i + 1] for i, arg in enumerate(plan["cmd"]) if arg == "-conf"]
+            if not all(os.path.exists(p) for p in conf_paths) or not os.path.isfile(plan["main_exe_path"] or ""):
+                self._staged_launch = None
+                return False
+            self._staged_launch = {"key": key, "plan": plan, "fingerprint": self._launch_fingerprint(plan)}
+            return True
+
+    def stage_launch_async(self, zip_name, force_fullscreen=False, auto_exit=False):
+        """Runs stage_launch in the background worker. Only the newest request is built, older queued ones are dropped."""
+        key = (zip_name, force_fullscreen, auto_exit)
+        self._staging_request = key
+        if self._staging_pool is None: self._staging_pool = ThreadPoolExecutor(max_workers=1)
+        self._staging_pool.submit(lambda: self._staging_request == key and self.stage_launch(*key))
+
+    def take_staged_launch(self, zip_name, force_fullscreen=False, auto_exit=False):
+        """The staged plan for this launch if nothing it was built from changed since, else None."""
+        with self._launch_build_lock:
+            staged, self._staged_launch = self._staged_launch, None
+            if not staged or staged["key"] != (zip_name, force_fullscreen, auto_exit): return None
+            if staged["fingerprint"] != self._launch_fingerprint(staged["plan"]): return None
+            return staged["plan"]
+
+    def _launch_fingerprint(self, plan):
+        """Stats of every input and output of a launch plan: game details, reference config, engine, generated configs."""
+        def stamp(path):
+            try:
+                st = os.stat(path)
+                return st.st_mtime_ns, st.st_size
+            except OSError:
+                return None
+        paths = [self._get_game_json_path(plan["game_name"]), plan["reference_conf"], plan["cmd"][0], plan["main_exe_path"]]
+        paths += [plan["cmd"][i + 1] for i, arg in enumerate(plan["cmd"]) if arg == "-conf"]
+        return ([stamp(p) if p else None for p in paths], json.dumps(self.settings.get("dosbox_installations", []), sort_keys=True))
+
+    def _build_launch(self, zip_name, trace, specific_exe=None, force_fullscreen=False, auto_exit=False, dos_prompt_only=False, dosbox_path_override=None, config_override_path=None, details_override=None):
         game_name = os.path.splitext(zip_name)[0]
         details = details_override if details_override else self.get_game_details(game_name)
         
@@ -889,17 +1226,13 @@ class GameLogic:
         
         if dosbox_path_override:
             dosbox_executable = dosbox_path_override
-            # Try to guess engine type from path
-            if "staging" in dosbox_executable.lower(): engine_type = "dosbox-staging"
-            elif "dosbox-x" in dosbox_executable.lower(): engine_type = "dosbox-x"
+            engine_type = self.engine_probe.variant(dosbox_executable)
         else:
             # Check if game has specific custom path set (Priority 1)
             custom_path = details.get("custom_dosbox_path")
             if custom_path:
                 dosbox_executable = custom_path
-                # Guess type
-                if "staging" in dosbox_executable.lower(): engine_type = "dosbox-staging"
-                elif "dosbox-x" in dosbox_executable.lower(): engine_type = "dosbox-x"
+                engine_type = self.engine_probe.variant(dosbox_executable)
             else:
                 # Check if game has specific engine set (Priority 2)
                 preferred_engine = details.get("engine") # e.g. "dosbox-staging"
@@ -917,10 +1250,7 @@ class GameLogic:
             if not dosbox_executable:
                 # Fallback to default
                 dosbox_executable = self.default_dosbox_exe
-                # Guess type
-                if dosbox_executable:
-                    if "staging" in dosbox_executable.lower(): engine_type = "dosbox-staging"
-                    elif "dosbox-x" in dosbox_executable.lower(): engine_type = "dosbox-x"
+                if dosbox_executable: engine_type = self.engine_probe.variant(dosbox_executable)
 
         if not dosbox_executable: raise Exception("DOSBox executable not found. Please set a default in Settings.")
         dosbox_abs_path = os.path.abspath(dosbox_executable)
@@ -942,6 +1272,7 @@ class GameLogic:
             main_exe_rel_path = main_exe_role_path
             is_main_game_launch = True
         
+        trace.mark("engine")
         # Prepare Configs (Cascading)
         user_overrides = details.get("user_overrides", {})
         
@@ -963,15 +1294,16 @@ class GameLogic:
                  os.makedirs(temp_dir, exist_ok=True)
                  temp_conf_path = os.path.join(temp_dir, "temp_launch.conf")
                  
-                 with open(temp_conf_path, 'w', encoding='utf-8') as f:
-                     f.write("\n".join(content))
+                 write_if_changed(temp_conf_path, "\n".join(content))
                      
                  config_override_path = temp_conf_path
             else:
                 # Pass main_exe_rel_path as specific_exe_override to ensure it overrides custom_autoexec launch command
                 self.write_game_config(game_name, main_exe_rel_path, details, dos_prompt_only, dosbox_path_override=dosbox_executable, auto_exit=auto_exit, specific_exe_override=main_exe_rel_path)
         
+        trace.mark("game_config")
         base_conf, game_conf, override_conf = self.prepare_launch_configs(game_name, engine_type, user_overrides)
+        trace.mark("prepare_configs")
         
         # Simplified Launch Logic as requested:
         # 1. Do NOT pass base_conf (DOSBox finds it itself or we assume defaults)
@@ -1119,8 +1451,7 @@ class GameLogic:
         temp_autoexec_path = os.path.join(temp_dir, "autoexec.conf")
         
         try:
-            with open(temp_autoexec_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(autoexec_lines))
+            write_if_changed(temp_autoexec_path, "\n".join(autoexec_lines))
             cmd.extend(["-conf", temp_autoexec_path])
         except Exception as e:
             print(f"Error creating autoexec.conf: {e}")
@@ -1136,164 +1467,157 @@ class GameLogic:
              print("WARNING: Auto-Exit is True but 'exit' command missing from autoexec_lines!")
         print(f"DEBUG: Final Command: {cmd}")
 
-        dosbox_dir = os.path.dirname(dosbox_abs_path); capture_dir = os.path.join(dosbox_dir, "capture")
-        
-        # Run in a separate thread to avoid blocking the UI
-        def run_process():
-            try:
-                start_time = time.time()
-                process = subprocess.Popen(cmd, creationflags=0x08000000 if os.name == 'nt' else 0, cwd=game_folder)
-                
-                # Attempt to bring window to front (Windows only)
-                if os.name == 'nt':
-                    try:
-                        import ctypes
-                        import time as t_mod
+        dosbox_dir = os.path.dirname(dosbox_abs_path)
+        cpu_settings = details.get("dosbox_settings", {}).get("cpu", {})
+        trace.mark("autoexec")
+        return {"cmd": cmd, "game_name": game_name, "game_folder": game_folder, "dosbox_dir": dosbox_dir, "is_main_game_launch": is_main_game_launch,
+                "reference_conf": reference_conf, "main_exe_path": os.path.join(game_folder, main_exe_rel_path) if main_exe_rel_path else None,
+                "kind": "prompt" if dos_prompt_only else ("test" if config_override_path else ("game" if is_main_game_launch else "exe")),
+                "cpu": {"cycles": str(cpu_settings.get("cycles") or cpu_settings.get("cpu_cycles") or "auto"), "core": str(cpu_settings.get("core", "auto"))}}
+
+    def _start_launch(self, plan, trace):
+        """Hands the launch to the process supervisor. Returns the Session."""
+        game_name, game_folder, dosbox_dir = plan["game_name"], plan["game_folder"], plan["dosbox_dir"]
+        is_main_game_launch = plan["is_main_game_launch"]
+        snap_id = None
+        watcher = None
+
+        def before_start(session):
+            nonlocal snap_id, watcher
+            # DOS games write into their own files, hardlinked duplicates are read-only. Done here and not while
+            # building the plan, a staged plan is built on selection and may predate a dedupe pass
+            if self.dedupe_store.unshare(game_folder, hardlinks_only=True): print(f"Unshared the deduplicated files of {game_name} before launching.")
+            # Captures are moved in while the game runs, the GUI hears about each one
+            def on_capture(path):
+                if self.capture_ingestor(game_name).ingest(path): self.supervisor.post("capture", session)
+            watcher = CaptureWatcher(self._capture_dirs(dosbox_dir, game_folder, game_name), on_capture).start()
+            if is_main_game_launch and self.settings.get("session_snapshots", False):
+                try: snap_id = self.session_snapshots.take(game_name, game_folder)
+                except Exception as e: print(f"Session snapshot failed: {e}")
+            trace.mark("snapshot")
+
+        def after_start(session):
+            trace.mark("spawn")
+            process = session.process
+            if plan["kind"] != "prompt" and self.settings.get("resource_telemetry", True): self.resource_monitor.watch(process.pid)
+            # Attempt to bring window to front (Windows only)
+            if os.name == 'nt':
+                try:
+                    import ctypes
+                    import time as t_mod
                         
-                        # Wait loop for window to appear
-                        hwnd_found = None
+                    # Wait loop for window to appear
+                    hwnd_found = None
+                        
+                    def enum_windows_callback(hwnd, pid):
+                        import ctypes.wintypes
+                        lpdwProcessId = ctypes.c_ulong()
+                        ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(lpdwProcessId))
+                        if lpdwProcessId.value == pid:
+                            # Check if visible
+                            if ctypes.windll.user32.IsWindowVisible(hwnd):
+                                return False # Stop enumeration, found it
+                        return True
+                            
+                    WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
                         
-                        def enum_windows_callback(hwnd, pid):
+                    # Try for up to 10 seconds
+                    for _ in range(40):
+                        t_mod.sleep(0.25)
+                        # We need to find the HWND again because we can't easily pass it out of callback in Python 
+                        # without a mutable object or global, but we can just use FindWindow if we knew the class/title.
+                        # Since we don't, we iterate again or use a mutable list.
+                        found_hwnds = []
+                        def callback_wrapper(hwnd, _):
                             import ctypes.wintypes
                             lpdwProcessId = ctypes.c_ulong()
                             ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(lpdwProcessId))
-                            if lpdwProcessId.value == pid:
-                                # Check if visible
-                                if ctypes.windll.user32.IsWindowVisible(hwnd):
-                                    return False # Stop enumeration, found it
+                            if lpdwProcessId.value == process.pid and ctypes.windll.user32.IsWindowVisible(hwnd):
+                                found_hwnds.append(hwnd)
+                                return False
                             return True
-                            
-                        WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
-                        
-                        # Try for up to 10 seconds
-                        for _ in range(40):
-                            t_mod.sleep(0.25)
-                            # We need to find the HWND again because we can't easily pass it out of callback in Python 
-                            # without a mutable object or global, but we can just use FindWindow if we knew the class/title.
-                            # Since we don't, we iterate again or use a mutable list.
-                            found_hwnds = []
-                            def callback_wrapper(hwnd, _):
-                                import ctypes.wintypes
-                                lpdwProcessId = ctypes.c_ulong()
-                                ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(lpdwProcessId))
-                                if lpdwProcessId.value == process.pid and ctypes.windll.user32.IsWindowVisible(hwnd):
-                                    found_hwnds.append(hwnd)
-                                    return False
-                                return True
                                 
-                            ctypes.windll.user32.EnumWindows(WNDENUMPROC(callback_wrapper), 0)
+                        ctypes.windll.user32.EnumWindows(WNDENUMPROC(callback_wrapper), 0)
                             
-                            if found_hwnds:
-                                hwnd = found_hwnds[0]
-                                # Force to top
-                                HWND_TOPMOST = -1
-                                HWND_NOTOPMOST = -2
-                                HWND_TOP = 0
-                                SWP_NOMOVE = 0x0002
-                                SWP_NOSIZE = 0x0001
-                                SWP_SHOWWINDOW = 0x0040
+                        if found_hwnds:
+                            trace.mark("window"); trace.window_found = True
+                            hwnd = found_hwnds[0]
+                            # Force to top
+                            HWND_TOPMOST = -1
+                            HWND_NOTOPMOST = -2
+                            HWND_TOP = 0
+                            SWP_NOMOVE = 0x0002
+                            SWP_NOSIZE = 0x0001
+                            SWP_SHOWWINDOW = 0x0040
                                 
-                                # 1. Restore if minimized
-                                ctypes.windll.user32.ShowWindow(hwnd, 9) # SW_RESTORE
+                            # 1. Restore if minimized
+                            ctypes.windll.user32.ShowWindow(hwnd, 9) # SW_RESTORE
                                 
-                                # 2. Bring to foreground
-                                ctypes.windll.user32.SetForegroundWindow(hwnd)
+                            # 2. Bring to foreground
+                            ctypes.windll.user32.SetForegroundWindow(hwnd)
                                 
-                                ctypes.windll.user32.SetFocus(hwnd)
-                                break
+                            ctypes.windll.user32.SetFocus(hwnd)
+                            break
                                 
-                    except Exception as e: 
-                        print(f"Focus error: {e}")
-
-                process.wait()
-                end_time = time.time()
-                duration = end_time - start_time
-                
-                if is_main_game_launch:
+                except Exception as e: 
+                    print(f"Focus error: {e}")
+            else:
+                trace.window_found = wait_for_window(process)
+                if trace.window_found: trace.mark("window")
+            self.launch_stats.record(trace)
+            print(f"Launch timing ({game_name}): " + ", ".join(f"{stage} {ms:.1f} ms" for stage, ms in trace.stages.items()))
+
+        def on_exit(session):
+            if session.process and (summary := self.resource_monitor.stop(session.process.pid)):
+                summary.update(plan["cpu"], kind=plan["kind"])
+                self.resource_history.record(game_name, summary)
+            try:
+                if is_main_game_launch and session.process:
                     current_details = self.get_game_details(game_name)
                     current_details['play_count'] = current_details.get('play_count', 0) + 1
                     current_details['last_played'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                    current_details['play_time'] = current_details.get('play_time', 0) + duration
+                    current_details['play_time'] = current_details.get('play_time', 0) + session.duration
                     self.save_game_details(game_name, current_details)
-                
-                # self._handle_screenshots(dosbox_dir, game_folder, game_name) # Moved to finally block
-                pass
-                
-            except Exception as e:
-                print(f"Error running game: {e}")
+                    self.schedule_auto_backup(game_name)
             finally:
-                # Ensure screenshots are handled even if error occurs
-                try:
-                    # Wait a bit for file system to sync?
-                    time.sleep(1)
-                    self._handle_screenshots(dosbox_dir, game_folder, game_name)
-                except Exception as e:
-                    print(f"Screenshot handling error: {e}")
+                if watcher: watcher.stop()
+                if snap_id:
+                    try: self.session_snapshots.finish(game_name, snap_id, game_folder, keep=self.settings.get("snapshots_per_game", 5))
+                    except Exception as e: print(f"Session snapshot failed: {e}")
+                # The process has been reaped, sweep up whatever the watcher did not see finish
+                try: self._handle_screenshots(dosbox_dir, game_folder, game_name)
+                except Exception as e: print(f"Screenshot handling error: {e}")
 
-        t = threading.Thread(target=run_process, daemon=True)
-        t.start()
-        return t
+        return self.supervisor.spawn(plan["cmd"], game_folder, game_name, kind=plan["kind"], before_start=before_start, after_start=after_start, on_exit=on_exit)
 
-    def _handle_screenshots(self, dosbox_dir, game_folder, game_name):
+    def get_resource_advice(self, game_name):
+        """(last session's resource summary or None, cycles/core recommendations) for the game."""
+        return self.resource_history.latest(game_name), self.resource_history.recommend(game_name)
+
+    def _capture_dirs(self, dosbox_dir, game_folder, game_name):
         # Potential capture directories
         # 1. DOSBox default capture folder
         # 2. Game folder capture (if configured there)
         # 3. Temp export folder capture (if running test)
-        
-        capture_dirs = [
+        return [
             os.path.join(dosbox_dir, "capture"),
             os.path.join(game_folder, "capture"),
             os.path.join(self.base_dir, "database", "games_datainfo", game_name, "confs", "capture"), # Check temp folder too
             os.path.join(self.base_dir, "database", "games_datainfo", game_name, "conf", "capture") # Check singular conf folder too
         ]
-        
-        # Destination directory
-        # Screenshots should go to database/games_datainfo/<game>/screenshots
-        dest_dir = os.path.join(self.base_dir, "database", "games_datainfo", game_name, "screenshots")
-        os.makedirs(dest_dir, exist_ok=True)
 
-        # Find next available index
-        last_num = 0
-        # Pattern: game_name_XXX.ext
-        # We need to escape game_name for regex in case it has special chars
-        escaped_name = re.escape(game_name)
-        pattern = re.compile(rf"^{escaped_name}_(\d+)\.(?:png|jpg|jpeg|bmp|avi|mp4|mkv|wav|mid|mp3)$", re.IGNORECASE)
-        
-        for fname in os.listdir(dest_dir):
-            if match := pattern.match(fname):
-                try:
-                    num = int(match.group(1))
-                    last_num = max(last_num, num)
-                except ValueError: pass
-        
-        current_index = last_num + 1
-        
-        # Extensions to look for
-        extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.avi', '.mp4', '.mkv', '.wav', '.mid', '.mp3'}
-        
-        for cap_dir in capture_dirs:
-            if not os.path.isdir(cap_dir): continue
-            
-            # Sort files by modification time to preserve capture order
-            files = []
-            for f in os.listdir(cap_dir):
-                ext = os.path.splitext(f)[1].lower()
-                if ext in extensions:
-                    full_path = os.path.join(cap_dir, f)
-                    files.append((full_path, ext))
-            
-            files.sort(key=lambda x: os.path.getmtime(x[0]))
-            
-            for src_path, ext in files:
-                new_name = f"{game_name}_{current_index:03d}{ext}"
-                dest_path = os.path.join(dest_dir, new_name)
-                
-                try:
-                    shutil.move(src_path, dest_path)
-                    print(f"Moved capture: {src_path} -> {dest_path}")
-                    current_index += 1
-                except Exception as e:
-                    print(f"Failed to move {src_path}: {e}")
+    def capture_ingestor(self, game_name):
+        """Shared per game, so concurrent sessions number their captures from the same counter."""
+        with self._capture_lock:
+            if game_name not in self._capture_ingestors:
+                # Screenshots should go to database/games_datainfo/<game>/screenshots
+                dest_dir = os.path.join(self.base_dir, "database", "games_datainfo", game_name, "screenshots")
+                self._capture_ingestors[game_name] = CaptureIngestor(dest_dir, game_name)
+            return self._capture_ingestors[game_name]
+
+    def _handle_screenshots(self, dosbox_dir, game_folder, game_name):
+        """Moves every capture still left in the capture folders. Returns the new paths."""
+        return self.capture_ingestor(game_name).sweep(self._capture_dirs(dosbox_dir, game_folder, game_name))
 
     def resize_image(self, img, target_size):
         if not HAS_PILLOW: return None
@@ -1321,92 +1645,11 @@ class GameLogic:
         if not dosbox_settings:
             return base_content.splitlines()
 
-        # Parse base content into a structure: [ {'type': 'comment', 'val': '...'}, {'type': 'section', 'name': '...'}, {'type': 'key', 'key': '...', 'val': '...'} ]
-        # This is a simple parser to preserve comments and structure.
-        lines = base_content.splitlines()
-        parsed_lines = []
-        current_section = None
-        
-        for line in lines:
-            s = line.strip()
-            if not s:
-                parsed_lines.append({'type': 'empty', 'val': line})
-                continue
-            if s.startswith(('#', '%', ';')):
-                parsed_lines.append({'type': 'comment', 'val': line})
-                continue
-            if s.startswith('[') and s.endswith(']'):
-                current_section = s[1:-1].lower()
-                parsed_lines.append({'type': 'section', 'name': current_section, 'val': line})
-                continue
-            
-            if '=' in s:
-                key, val = s.split('=', 1)
-                key = key.strip().lower()
-                parsed_lines.append({'type': 'key', 'section': current_section, 'key': key, 'val': line, 'original_key': s.split('=')[0].strip()})
-            else:
-                parsed_lines.append({'type': 'unknown', 'val': line})
-
-        # Now update values
-        # We iterate through our known settings and update the parsed structure
-        # If a section or key doesn't exist, we might need to append it.
-        # For simplicity, if section exists but key doesn't, we append to section.
-        # If section doesn't exist, we append section at end.
-        
-        # Flatten settings for easier lookup
-        # details['dosbox_settings'] = { 'cpu': {'cycles': '...'}, ... }
-        
-        for section, keys in dosbox_settings.items():
-            section = section.lower()
-            for key, value in keys.items():
-                key = key.lower()
-                # Find if this key exists in this section
-                found = False
-                for item in parsed_lines:
-                    if item['type'] == 'key' and item.get('section') == section and item['key'] == key:
-                        # Update value
-                        # Reconstruct line preserving original key case if possible
-                        item['val'] = f"{item['original_key']} = {value}"
-                        found = True
-                        break
-                
-                if not found:
-                    # Key not found. Check if section exists.
-                    section_found = False
-                    last_section_index = -1
-                    for i, item in enumerate(parsed_lines):
-                        if item['type'] == 'section' and item['name'] == section:
-                            section_found = True
-                        if item['type'] == 'section':
-                            if item['name'] == section:
-                                last_section_index = i # Start of section
-                            elif section_found and last_section_index != -1:
-                                # We found the start of NEXT section, so previous section ended here
-                                # Insert before this
-                                # But wait, we need to find the END of the target section.
-                                pass
-                    
-                    if section_found:
-                        # Find the end of the section (either next section start or end of file)
-                        insert_idx = len(parsed_lines)
-                        for i in range(len(parsed_lines)):
-                            if parsed_lines[i]['type'] == 'section' and parsed_lines[i]['name'] == section:
-                                # Found start
-                                for j in range(i + 1, len(parsed_lines)):
-                                    if parsed_lines[j]['type'] == 'section':
-                                        insert_idx = j
-                                        break
-                                break
-                        
-                        parsed_lines.insert(insert_idx, {'type': 'key', 'section': section, 'key': key, 'val': f"{key} = {value}", 'original_key': key})
-                    else:
-                        # Section not found, append to end
-                        parsed_lines.append({'type': 'empty', 'val': ''})
-                        parsed_lines.append({'type': 'section', 'name': section, 'val': f"[{section}]"})
-                        parsed_lines.append({'type': 'key', 'section': section, 'key': key, 'val': f"{key} = {value}", 'original_key': key})
-
-        # Reconstruct content
-        return [item['val'] for item in parsed_lines]
+        # Existing keys are updated in place, missing keys go to the end of their section, missing sections to the end
+        parser = DOSBoxConfigParser()
+        parser.parse(base_content)
+        parser.update(dosbox_settings)
+        return parser.lines()
 
     def _replace_exe_in_autoexec(self, autoexec_lines, specific_exe, full_command=None):
         """
@@ -1540,8 +1783,7 @@ class GameLogic:
                 
                 if os.path.exists(reference_conf_path):
                     try:
-                        with open(reference_conf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            reference_settings = self.parse_dosbox_conf_to_json(f.read())
+                        reference_settings = self.reference_configs.parsed(reference_conf_path, self.parse_dosbox_conf_to_json)
                     except Exception as e:
                         print(f"Error reading reference config: {e}")
             
@@ -1577,7 +1819,9 @@ class GameLogic:
 
         # --- Layer 2: Game Config (dosbox.conf) ---
         dosbox_path = dosbox_path_override or details_copy.get("custom_dosbox_path") or details_copy.get("dosbox_path")
-        base_conf = self.get_clean_dosbox_conf(dosbox_path)
+        # Both layers are applied to one parsed document of the base config
+        document = DOSBoxConfigParser()
+        document.parse(self.get_clean_dosbox_conf(dosbox_path))
         game_folder = self.find_game_folder(game_name)
         game_conf_path = os.path.join(game_folder, "dosbox.conf")
         if os.path.exists(game_conf_path):
@@ -1585,18 +1829,16 @@ class GameLogic:
                 with open(game_conf_path, 'r', encoding='utf-8') as f:
                     game_conf_content = f.read()
                 
-                game_conf_settings = self.parse_dosbox_conf_to_json(game_conf_content)
                 # Apply Layer 2 to base_conf
-                dummy_details = {"dosbox_settings": game_conf_settings}
-                base_conf_lines = self.apply_settings_to_conf(base_conf, dummy_details)
-                base_conf = "\n".join(base_conf_lines)
+                document.update(self.parse_dosbox_conf_to_json(game_conf_content))
                 
             except Exception as e:
                 print(f"Error reading game dosbox.conf: {e}")
         
         # --- Layer 3: User Overrides ---
         # Apply settings from details to base_conf
-        content = self.apply_settings_to_conf(base_conf, details_copy)
+        document.update(details_copy.get("dosbox_settings", {}))
+        content = document.lines()
         
         # Ensure [autoexec] is handled correctly
         # Remove existing [autoexec] from content if present
@@ -1815,8 +2057,7 @@ class GameLogic:
         content_lines = self.generate_config_content(game_name, main_executable, details, for_standalone=dos_prompt_only, dosbox_path_override=dosbox_path_override, auto_exit=should_auto_exit, specific_exe_override=specific_exe_override, minimal=True, clean_export=True, include_autoexec=False)
         final_content = "\n".join(content_lines)
             
-        try:
-            with open(conf_path, 'w', encoding='utf-8') as f: f.write(final_content)
+        try: write_if_changed(conf_path, final_content)
         except IOError as e: raise Exception(f"Failed to write dosbox.conf: {e}")
 
     def update_dosbox_conf(self, game_name, details, from_content=False):
@@ -1850,98 +2091,183 @@ class GameLogic:
             try: os.remove(custom_conf_path)
             except: pass
     
-    def _prepare_export_folder(self, game_name, temp_dir):
-        source_dir = self.find_game_folder(game_name)
-        # Copy content to temp_dir
-        for item in os.listdir(source_dir):
-            s = os.path.join(source_dir, item)
-            d = os.path.join(temp_dir, item)
-            if os.path.isdir(s):
-                shutil.copytree(s, d, dirs_exist_ok=True)
-            else:
-                shutil.copy2(s, d)
-                
-        # Clean dosbox.conf
-        conf_path = os.path.join(temp_dir, "dosbox.conf")
+    def _get_export_conf_content(self, game_name):
+        """Generates the cleaned dosbox.conf (with autoexec) that replaces the game's own one in exports."""
         details = self.get_game_details(game_name)
         exe_map = details.get("executables", {})
         main_exe = next((exe for exe, info in exe_map.items() if info.get("role") == constants.ROLE_MAIN), None)
-        
-        # Generate clean config with autoexec
         content = self.generate_config_content(game_name, main_exe, details, minimal=True, clean_export=True, include_autoexec=True)
-        
-        with open(conf_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(content))
-            
-        return temp_dir
+        return "\n".join(content)
+
+    def _scan_export_files(self, game_name):
+        """
+        Single scan of the installed game for export.
+        Returns ([(full_path, arcname, size), ...], total_bytes). The root dosbox.conf is left out,
+        exports inject the generated one from memory instead.
+        """
+        source_dir = self.find_game_folder(game_name)
+        if not os.path.isdir(source_dir): raise Exception(f"Game '{game_name}' is not installed.")
+        entries = []; total = 0
+        for root, _, files in os.walk(source_dir):
+            for file in files:
+                full_path = os.path.join(root, file)
+                arcname = os.path.relpath(full_path, source_dir)
+                if arcname.lower() == "dosbox.conf": continue
+                try: size = os.path.getsize(full_path)
+                except OSError: continue
+                entries.append((full_path, arcname, size))
+                total += size
+        return entries, total
 
     def make_zip_archive(self, game_name, output_path, progress_callback=None):
+        """
+        Exports the installed game straight from its folder, no temporary copy.
+        Each member is stored or deflated according to the compression preset setting.
+        progress_callback(done_bytes, total_bytes). Returns the CompressionPolicy report dict.
+        """
         # Check extension to decide format
         if output_path.lower().endswith('.7z'):
             if HAS_7ZIP:
-                self.make_7z_archive(game_name, output_path, progress_callback)
-                return
+                return self.make_7z_archive(game_name, output_path, progress_callback)
             else:
                 pass
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            export_root = self._prepare_export_folder(game_name, temp_dir)
-            
-            total_files = 0
-            for _, _, files in os.walk(export_root):
-                total_files += len(files)
-            processed_files = 0
-                
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(export_root):
-                    arcname = os.path.relpath(root, export_root)
-                    for file in files: 
-                        zipf.write(os.path.join(root, file), os.path.join(arcname, file))
-                        processed_files += 1
-                        if progress_callback:
-                            progress_callback(processed_files, total_files)
+        start = time.time()
+        policy = CompressionPolicy(self.settings.get("compression_preset", DEFAULT_PRESET))
+        entries, total = self._scan_export_files(game_name)
+        conf_data = self._get_export_conf_content(game_name).encode('utf-8')
+
+        # Members are deflated on all cores, big files in 1 MB slices
+        with ParallelZipWriter(output_path, progress_callback=progress_callback) as zipw:
+            for full_path, arcname, size in entries:
+                zipw.add_file(full_path, arcname, *policy.choose(full_path, size))
+            zipw.add_bytes(conf_data, "dosbox.conf", level=policy.options["level"])
+        return policy.make_report(total + len(conf_data), output_path, time.time() - start)
 
     def make_7z_archive(self, game_name, output_path, progress_callback=None):
+        """
+        Same as make_zip_archive, but 7z. py7zr compresses a whole member per call, so progress moves per file.
+        py7zr uses one filter chain for the whole archive, so the preset only picks the LZMA2 level here.
+        """
         if not HAS_7ZIP: raise Exception("py7zr module not found.")
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            export_root = self._prepare_export_folder(game_name, temp_dir)
-            
-            # Calculate total files for progress
-            total_files = 0
-            for _, _, files in os.walk(export_root):
-                total_files += len(files)
-                
-            processed_files = 0
-            
-            with py7zr.SevenZipFile(output_path, 'w') as z:
-                for root, _, files in os.walk(export_root):
-                    for file in files:
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, export_root)
-                        z.write(full_path, rel_path)
-                        processed_files += 1
-                        if progress_callback:
-                            progress_callback(processed_files, total_files)
-
-    def make_standalone_archive(self, game_name, msdos_name, zip_path, flat_structure):
+        start = time.time()
+        policy = CompressionPolicy(self.settings.get("compression_preset", DEFAULT_PRESET))
+        entries, total = self._scan_export_files(game_name)
+        conf_data = self._get_export_conf_content(game_name).encode('utf-8')
+        total += len(conf_data)
+        done = 0
+        
+        with py7zr.SevenZipFile(output_path, 'w', filters=policy.sevenzip_filters()) as z:
+            for full_path, arcname, size in entries:
+                z.write(full_path, arcname)
+                done += size
+                if progress_callback:
+                    progress_callback(done, total)
+            z.writestr(conf_data, "dosbox.conf")
+            done += len(conf_data)
+            if progress_callback: progress_callback(done, total)
+        return policy.make_report(total, output_path, time.time() - start)
+
+    EXPORT_FORMATS = {"zip": "ZIP", "7z": "7z", "standalone": "Standalone", "standalone_flat": "Standalone (flat)"}
+
+    def get_standalone_msdos_name(self, game_name):
+        """Folder name of the game on the virtual C: drive, used by standalone packages."""
+        details = self.get_game_details(game_name); msdos_name = "GAME"
+        if (exe_paths := details.get("executables")) and (first_exe_path := next(iter(exe_paths), None)):
+            path_parts = first_exe_path.replace("\\", "/").split('/')
+            if len(path_parts) > 2 and path_parts[0] == 'drives' and path_parts[1] == 'c': msdos_name = path_parts[2]
+        return msdos_name
+
+    def get_export_path(self, game_name, fmt):
+        if fmt.startswith("standalone"): return os.path.join(self.export_dir, f"{game_name}_standalone.zip")
+        return os.path.join(self.export_dir, f"{game_name}.{fmt}")
+
+    def export_game(self, game_name, fmt, output_path):
+        """Single entry point for the bulk export queue. fmt is a key of EXPORT_FORMATS."""
+        if fmt == "zip": return self.make_zip_archive(game_name, output_path)
+        if fmt == "7z": return self.make_7z_archive(game_name, output_path)
+        if fmt in ("standalone", "standalone_flat"):
+            return self.make_standalone_archive(game_name, self.get_standalone_msdos_name(game_name), output_path, fmt == "standalone_flat")
+        raise Exception(f"Unknown export format: {fmt}")
+
+    def get_export_queue(self):
+        return ExportQueue(os.path.join(self.base_dir, "database", "export_queue.json"), os.path.join(self.cache_dir, "export_fingerprints.json"))
+
+    def run_export_queue(self, export_queue, event_callback=None, stop_event=None):
+        """Runs the queue on a process pool sized by the 'export_workers' setting (0 = one per CPU)."""
+        settings_path = os.path.abspath(self.settings.filepath)
+        return export_queue.run(self.base_dir, settings_path, self.settings.get("export_workers", 0) or None, event_callback, stop_event)
+
+    def get_export_fingerprint(self, game_name, fmt):
+        """
+        Hash of everything an export of this game depends on: game files, its database entry and confs,
+        the reference config, the compression preset and, for standalone packages, the DOSBox install.
+        Returns (fingerprint, game_bytes).
+        """
+        h = hashlib.sha1(f"{fmt}\0{self.settings.get('compression_preset', DEFAULT_PRESET)}\n".encode('utf-8'))
+        game_bytes = 0
+        game_folder = self.find_game_folder(game_name)
+        data_dir = os.path.join(self.base_dir, "database", "games_datainfo", game_name)
+        for label, folder in (("game", game_folder), ("data", data_dir)):
+            for root, dirs, files in os.walk(folder):
+                if label == "data": dirs[:] = [d for d in dirs if d != "screenshots"]
+                dirs.sort()
+                for file in sorted(files):
+                    if file.endswith(".manifest"): continue
+                    path = os.path.join(root, file)
+                    try: st = os.stat(path)
+                    except OSError: continue
+                    if label == "game": game_bytes += st.st_size
+                    h.update(f"{label}\0{os.path.relpath(path, folder)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+        details = self.get_game_details(game_name)
+        if ref_conf := details.get("reference_conf"):
+            ref_path = ref_conf if os.path.isabs(ref_conf) else os.path.join(self.base_dir, ref_conf)
+            try: h.update(f"ref\0{ref_conf}\0{os.stat(ref_path).st_mtime_ns}\n".encode('utf-8'))
+            except OSError: pass
+        if fmt.startswith("standalone"):
+            dosbox_path = details.get("custom_dosbox_path") or self.default_dosbox_exe
+            if dosbox_path and os.path.isdir(os.path.dirname(dosbox_path)):
+                h.update(f"dosbox\0{self.runtime_cache.fingerprint(os.path.dirname(dosbox_path))}\n".encode('utf-8'))
+        return h.hexdigest(), game_bytes
+
+    def make_standalone_archive(self, game_name, msdos_name, zip_path, flat_structure, progress_callback=None):
+        """
+        Builds '<game>/' + DOSBox + dosbox.conf + !start.bat straight into zip_path, without a temp copy.
+        The DOSBox runtime comes pre-compressed from the runtime cache, so per package only the game data is compressed.
+        """
         details = self.get_game_details(game_name); game_folder = self.find_game_folder(game_name)
         dosbox_path = details.get("custom_dosbox_path") or self.default_dosbox_exe
         if not dosbox_path or not os.path.isdir(os.path.dirname(dosbox_path)): raise Exception("Valid DOSBox path not found.")
         dosbox_root = os.path.dirname(dosbox_path)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            package_root = os.path.join(temp_dir, game_name); os.makedirs(package_root)
-            shutil.copytree(game_folder, package_root, dirs_exist_ok=True)
-            dest_dosbox_path = os.path.join(package_root, "DOSBox") if not flat_structure else package_root
-            if not flat_structure: os.makedirs(dest_dosbox_path, exist_ok=True)
-            shutil.copytree(dosbox_root, dest_dosbox_path, dirs_exist_ok=True, ignore=shutil.ignore_patterns('*.zip'))
-            main_exe = next((exe for exe, info in details.get("executables", {}).items() if info.get("role") == constants.ROLE_MAIN), None)
-            conf_content = "\n".join(self.generate_config_content(game_name, main_exe, details, for_standalone=True, standalone_msdos_name=msdos_name))
-            with open(os.path.join(package_root, "dosbox.conf"), 'w') as f: f.write(conf_content)
-            bat_path = os.path.join(package_root, "!start.bat"); dosbox_exe_rel_path = os.path.join("DOSBox", "dosbox.exe") if not flat_structure else "dosbox.exe"; conf_rel_path = "dosbox.conf"
-            bat_content = f'@echo off\npushd %~dp0\n"{dosbox_exe_rel_path}" -conf "{conf_rel_path}" -exit\npopd'
-            with open(bat_path, 'w') as f: f.write(bat_content)
-            shutil.make_archive(os.path.splitext(zip_path)[0], 'zip', temp_dir)
+        cache_zip, runtime_members = self.runtime_cache.get(dosbox_root)
+
+        main_exe = next((exe for exe, info in details.get("executables", {}).items() if info.get("role") == constants.ROLE_MAIN), None)
+        conf_content = "\n".join(self.generate_config_content(game_name, main_exe, details, for_standalone=True, standalone_msdos_name=msdos_name))
+        dosbox_exe_rel_path = os.path.join("DOSBox", "dosbox.exe") if not flat_structure else "dosbox.exe"; conf_rel_path = "dosbox.conf"
+        bat_content = f'@echo off\npushd %~dp0\n"{dosbox_exe_rel_path}" -conf "{conf_rel_path}" -exit\npopd'
+        # Same bytes the old text-mode writes produced
+        generated = {name: content.replace("\n", os.linesep) for name, content in (("dosbox.conf", conf_content), ("!start.bat", bat_content))}
+
+        package_prefix = f"{game_name}/"
+        dosbox_prefix = package_prefix + ("DOSBox/" if not flat_structure else "")
+        # Precedence stays as with the copies: generated files over DOSBox files over game files
+        generated_names = {(package_prefix + name).lower() for name in generated}
+        taken = generated_names | {(dosbox_prefix + zinfo.filename).lower() for zinfo, _ in runtime_members}
+
+        policy = CompressionPolicy(self.settings.get("compression_preset", DEFAULT_PRESET))
+        with ParallelZipWriter(zip_path, progress_callback=progress_callback) as zipw:
+            for root, _, files in os.walk(game_folder):
+                for file in files:
+                    full_path = os.path.join(root, file)
+                    arcname = package_prefix + os.path.relpath(full_path, game_folder).replace(os.sep, "/")
+                    if arcname.lower() in taken: continue
+                    zipw.add_file(full_path, arcname, *policy.choose(full_path))
+            for zinfo, data_offset in runtime_members:
+                if (dosbox_prefix + zinfo.filename).lower() in generated_names: continue
+                zipw.add_raw(cache_zip, zinfo, data_offset, dosbox_prefix + zinfo.filename)
+            for name, content in generated.items():
+                zipw.add_bytes(content, package_prefix + name, level=policy.options["level"])
 
     def find_vlc(self):
         if os.name == 'nt':
@@ -2009,24 +2335,10 @@ class GameLogic:
 
         dosbox_exe_path = custom_dosbox_path or self.default_dosbox_exe
         if not dosbox_exe_path: return None
-        dosbox_dir = os.path.dirname(dosbox_exe_path)
-        # Added dosbox-x.reference.conf to the list
-        # Priority: dosbox-staging.conf > dosbox-x.reference.conf > dosbox.conf
-        possible_conf_names = ['dosbox-staging.conf', 'dosbox-x.reference.conf', 'dosbox.conf']
-        for conf_name in possible_conf_names:
-            conf_path = os.path.join(dosbox_dir, conf_name)
-            if os.path.exists(conf_path):
-                try:
-                    with open(conf_path, 'r', encoding='utf-8') as f: return f.read()
-                except IOError as e: print(f"Error reading default DOSBox conf at {conf_path}: {e}"); return None
-        try:
-            result = subprocess.run([dosbox_exe_path, "-printconf"], capture_output=True, text=True, check=True, creationflags=0x08000000 if os.name == 'nt' else 0)
-            conf_path = result.stdout.strip()
-            if os.path.exists(conf_path):
-                with open(conf_path, 'r', encoding='utf-8') as f: return f.read()
-        except (subprocess.CalledProcessError, FileNotFoundError, IOError) as e:
-            print(f"Error getting default DOSBox conf via -printconf: {e}")
-        return None
+        # The probe looked next to the executable and asked -printconf once, see EngineProbe
+        info = self.engine_probe.get(dosbox_exe_path)
+        if not info or not info["conf_path"]: return None
+        return self.reference_configs.read(info["conf_path"]) or None
 
     def parse_dosbox_conf_to_json(self, conf_content):
         if not conf_content: return copy.deepcopy(constants.DEFAULT_GAME_DETAILS['dosbox_settings'])
@@ -2100,292 +2412,130 @@ class GameLogic:
 
     def load_dosbox_metadata_json(self, variant):
         """
-        Loads metadata from JSON based on DOSBox variant.
-        Returns a dictionary: {section: {key: {'default': val, 'possible': list, 'info': text}}}
+        Loads metadata from JSON based on DOSBox variant, compiled and cached by the option metadata store.
+        Returns (read-only {section: {key: {'default', 'possible', 'possible_set', 'info', 'search'}}}, json name).
         """
-        json_name = "dosbox_standard.json"
-        variant_lower = variant.lower()
-        
-        if "staging" in variant_lower: 
-            json_name = "dosbox_staging.json"
-        elif "x" in variant_lower or "-x" in variant_lower: 
-            json_name = "dosbox_x.json"
-        
-        json_path = os.path.join(self.base_dir, "database", json_name)
-        if not os.path.exists(json_path): 
-            # print(f"JSON not found: {json_path}") # Suppress error as requested
-            return {}, "n/a"
-        
-        metadata = {}
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-                
-                # Handle List of Objects (e.g. from CSV conversion)
-                if isinstance(raw_data, list):
-                    for item in raw_data:
-                        # Expecting keys: section, key, default, possible, info
-                        sec = item.get("section", "General")
-                        key = item.get("key", "")
-                        if not key: continue
-                        
-                        sec_lower = sec.lower()
-                        k_lower = key.lower()
-                        
-                        if sec_lower not in metadata: metadata[sec_lower] = {}
-                        
-                        # Parse possible values if string
-                        poss = item.get("possible", [])
-                        if isinstance(poss, str):
-                            poss = [x.strip() for x in poss.split(',')] if poss else []
-                            
-                        metadata[sec_lower][k_lower] = {
-                            "section": sec,
-                            "default": item.get("default", ""),
-                            "possible": poss,
-                            "info": item.get("info", "")
-                        }
-
-                # Handle Dictionary Structure
-                elif isinstance(raw_data, dict):
-                    for sec, keys in raw_data.items():
-                        sec_lower = sec.lower()
-                        if sec_lower not in metadata: metadata[sec_lower] = {}
-                        
-                        for k, v in keys.items():
-                            k_lower = k.lower()
-                            # Ensure fields exist, handling both "default" and "default_value" styles
-                            default_val = v.get("default_value", v.get("default", ""))
-                            possible_val = v.get("possible_values", v.get("possible", []))
-                            
-                            metadata[sec_lower][k_lower] = {
-                                "section": sec,
-                                "default": default_val,
-                                "possible": possible_val,
-                                "info": v.get("info", "")
-                            }
-                            
-        except Exception as e:
-            print(f"Error loading JSON metadata: {e}")
-            
-        return metadata, json_name
+        return self.option_metadata.get(variant)
 
-    def parse_dosbox_conf_with_metadata(self, conf_content):
+    def check_dosbox_setting(self, variant, section, key, value, dosbox_path=None):
         """
-        Parses DOSBox config content to extract structure (sections/keys).
-        Metadata is now loaded from CSV files via load_dosbox_metadata_csv, 
-        but we still return the structure here.
+        None if the option exists in the engine (probe cache of dosbox_path or the default binary) and value is
+        valid for it according to the variant's metadata, otherwise why not.
         """
-        if not conf_content: return {}
-        
-        extracted_data = {}
-        current_section = "General"
-        
-        lines = conf_content.splitlines()
-        
-        for line in lines:
-            raw_line = line.strip()
-            
-            if not raw_line: continue
-                
-            if raw_line.startswith('[') and raw_line.endswith(']'):
-                current_section = raw_line[1:-1]
-                if current_section not in extracted_data:
-                    extracted_data[current_section] = {}
-                continue
-                
-            if raw_line.startswith('#') or raw_line.startswith('%'): continue
-                
-            if '=' in raw_line:
-                key, value = raw_line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if current_section not in extracted_data:
-                    extracted_data[current_section] = {}
-                    
-                # We only store the value here. Metadata comes from CSV later.
-                extracted_data[current_section][key] = {
+        dosbox_path = dosbox_path or self.default_dosbox_exe
+        if dosbox_path and not self.engine_probe.supports(dosbox_path, section, key): return f"[{section}] {key} is not an option of this DOSBox build"
+        return self.option_metadata.check_value(variant, section, key, value)
+
+    def parse_engine_defaults(self, conf_content):
+        """{section: {key: default}} of a reference config with lowercase names, [autoexec] left out. Kept per engine by the probe."""
+        return {section.lower(): {key.lower(): "" if value is None else value for key, value in keys.items()}
+                for section, keys in self.parse_dosbox_conf_to_json(conf_content).items() if section.lower() != "autoexec"}
+
+    def get_engine_options(self, custom_dosbox_path=None, specific_conf_path=None):
+        """
+        {section: {key: default}} the Edit window offers for the game's engine. Comes from the engine probe cache,
+        or from specific_conf_path when a reference config other than the engine's own is selected. Never probes;
+        an engine that is not probed yet gets probed in the background and offers nothing this time.
+        """
+        dosbox_path = custom_dosbox_path or self.default_dosbox_exe
+        info = self.engine_probe.cached(dosbox_path) if dosbox_path else None
+        if specific_conf_path and os.path.isfile(specific_conf_path):
+            own_conf = info and info["conf_path"] and os.path.normcase(os.path.abspath(info["conf_path"])) == os.path.normcase(os.path.abspath(specific_conf_path))
+            if not own_conf: return self.reference_configs.parsed(specific_conf_path, self.parse_engine_defaults)
+        if info is None:
+            if dosbox_path: self._probe_in_background(dosbox_path)
+            return {}
+        return info["defaults"]
+
+    def describe_dosbox_options(self, options, metadata=None):
+        """
+        {section: {key: default}} (see get_engine_options) as {section: {key: {"value", "description", "possible_values",
+        "possible_values_list"}}}. Description and possible values come from metadata (see load_dosbox_metadata_json) when given.
+        """
+        metadata = metadata or {}
+        described = {}
+        for section, keys in options.items():
+            described[section] = {}
+            for key, value in keys.items():
+                meta = metadata.get(section.lower(), {}).get(key.lower(), {})
+                described[section][key] = {
                     "value": value,
-                    "description": "", # Will be filled from CSV
-                    "possible_values": "",
-                    "possible_values_list": []
+                    "description": meta.get("info", ""),
+                    "possible_values": ", ".join(meta.get("possible", ())),
+                    "possible_values_list": list(meta.get("possible", ()))
                 }
-        
-        return extracted_data
+        return described
 
     def update_dosbox_conf_content(self, original_content, new_settings):
         """
         Updates the original DOSBox configuration content with new settings.
         Preserves comments and structure. Adds missing keys and sections.
         """
-        lines = original_content.splitlines()
-        updated_lines = []
-        current_section = None
-        
-        # Create a mutable copy of new_settings to track what has been applied
-        settings_to_apply = copy.deepcopy(new_settings)
-        
-        # First pass: Update existing keys
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('[') and stripped.endswith(']'):
-                current_section = stripped[1:-1].lower()
-                updated_lines.append(line)
-                continue
-            
-            if current_section and current_section in settings_to_apply:
-                if '=' in stripped and not stripped.startswith(('#', ';', '%')):
-                    key = stripped.split('=', 1)[0].strip().lower()
-                    match_key = next((k for k in settings_to_apply[current_section] if k.lower() == key), None)
-                    
-                    if match_key:
-                        new_value = settings_to_apply[current_section][match_key]
-                        indent = line[:line.find(stripped)]
-                        updated_lines.append(f"{indent}{match_key} = {new_value}")
-                        del settings_to_apply[current_section][match_key]
-                        continue
+        parser = DOSBoxConfigParser()
+        parser.parse(original_content)
+        parser.update(new_settings)
+        return parser.to_string()
 
-            updated_lines.append(line)
-            
-        # Second pass: Add missing keys to existing sections or add new sections
-        final_lines = []
-        current_section = None
-        
-        for line in updated_lines:
-            stripped = line.strip()
-            if stripped.startswith('[') and stripped.endswith(']'):
-                # Before switching section, append leftover keys for the PREVIOUS section
-                if current_section and current_section in settings_to_apply and settings_to_apply[current_section]:
-                    for k, v in settings_to_apply[current_section].items():
-                        final_lines.append(f"{k} = {v}")
-                    del settings_to_apply[current_section]
-                
-                current_section = stripped[1:-1].lower()
-                final_lines.append(line)
-                continue
-            
-            final_lines.append(line)
-            
-        # Handle the last section
-        if current_section and current_section in settings_to_apply and settings_to_apply[current_section]:
-            for k, v in settings_to_apply[current_section].items():
-                final_lines.append(f"{k} = {v}")
-            del settings_to_apply[current_section]
-            
-        # Add completely new sections
-        for section, keys in settings_to_apply.items():
-            if not keys: continue
-            final_lines.append("")
-            final_lines.append(f"[{section}]")
-            for k, v in keys.items():
-                final_lines.append(f"{k} = {v}")
-                
-        return "\n".join(final_lines)
+    def get_reference_parser(self, ref_conf_path):
+        """Parsed reference config, shared through the reference config cache. Callers must not modify it."""
+        if not os.path.isabs(ref_conf_path):
+            ref_conf_path = os.path.join(self.base_dir, ref_conf_path)
+        if not os.path.exists(ref_conf_path): return None
+        return self.reference_configs.parsed(ref_conf_path, DOSBoxConfigParser.from_string)
 
     def sync_dosbox_settings_with_reference(self, game_data):
         """
         Synchronizes game_data['dosbox_settings'] with the reference configuration.
         1. Identifies the target DOSBox variant (Staging vs X vs Standard) from reference_conf.
-        2. Loads mapping_functions.json.
-        3. Iterates through dosbox_settings.
-        4. Maps keys to the target variant.
-        5. Removes keys that do not exist in the reference configuration.
+        2. Maps keys missing from the reference to the target variant (mapping_functions.json).
+        3. Removes keys that do not exist in the reference configuration.
+        The parsed reference and the compiled mapping are cached, so this is a few lookups per key.
         """
         if 'reference_conf' not in game_data or not game_data['reference_conf']:
             return game_data
-
-        ref_conf_path = game_data['reference_conf']
-        if not os.path.isabs(ref_conf_path):
-            ref_conf_path = os.path.join(self.base_dir, ref_conf_path)
-
-        if not os.path.exists(ref_conf_path):
+        if 'dosbox_settings' not in game_data:
             return game_data
 
-        # Determine target variant
-        target_variant = "standard"
-        lower_path = ref_conf_path.lower()
-        if "staging" in lower_path:
-            target_variant = "staging"
-        elif "dosbox-x" in lower_path or "dosbox_x" in lower_path:
-            target_variant = "x"
-        
-        # Load reference config to check for existence of keys
-        try:
-            with open(ref_conf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                ref_content = f.read()
-            
-            ref_parser = DOSBoxConfigParser()
-            ref_parser.parse(ref_content)
-        except Exception:
+        ref_parser = self.get_reference_parser(game_data['reference_conf'])
+        if ref_parser is None:
             return game_data
+        ref_sections = ref_parser.sections
 
-        # Load mapping functions
-        mapping_path = os.path.join(self.base_dir, "database", "mapping_functions.json")
-        mapping = {}
-        if os.path.exists(mapping_path):
-            try:
-                with open(mapping_path, 'r', encoding='utf-8') as f:
-                    mapping = json.load(f)
-            except Exception:
-                pass
-
-        if 'dosbox_settings' not in game_data:
-            return game_data
+        # Determine target variant
+        target_variant = {"dosbox-staging": "staging", "dosbox-x": "x"}.get(guess_variant(game_data['reference_conf']), "standard")
 
         new_settings = {}
-        
-        # Iterate through existing settings
         for section, keys in game_data['dosbox_settings'].items():
             section_lower = section.lower()
-            
             for key, value in keys.items():
-                key_lower = key.lower()
+                final_section, final_key = section_lower, key.lower()
                 
-                # Check if key exists in reference
-                ref_val = ref_parser.get(section_lower, key_lower)
+                if final_key not in ref_sections.get(final_section, {}):
+                    # Key not found in reference. Check mapping (by canonical or any variant's key name).
+                    target_map = self.setting_mappings.resolve(section_lower, final_key, target_variant)
+                    if not target_map or not target_map.get('key'): continue
+                    final_section = target_map.get('section', section_lower)
+                    final_key = target_map['key']
+                    # Key doesn't exist in reference and no valid mapping found.
+                    if final_key.lower() not in ref_sections.get(final_section.lower(), {}): continue
                 
-                final_section = section_lower
-                final_key = key_lower
-                
-                if ref_val is None:
-                    # Key not found in reference. Check mapping.
-                    mapped_found = False
-                    target_map = None
-                    
-                    if section_lower in mapping:
-                        # Case 1: key is in mapping
-                        if key_lower in mapping[section_lower]:
-                            target_map = mapping[section_lower][key_lower].get(target_variant)
-                        else:
-                            # Case 2: key might be the source for another variant
-                            for canonical, variants in mapping[section_lower].items():
-                                for var_name, var_data in variants.items():
-                                    if var_data and var_data.get('key') == key_lower:
-                                        target_map = variants.get(target_variant)
-                                        break
-                                if target_map: break
-                    
-                    if target_map and target_map.get('key'):
-                        final_section = target_map.get('section', section_lower)
-                        final_key = target_map.get('key')
-                        
-                        # Check if mapped key exists in reference
-                        if ref_parser.get(final_section, final_key) is not None:
-                            mapped_found = True
-                    
-                    if not mapped_found:
-                        # Key doesn't exist in reference and no valid mapping found.
-                        continue
-                
-                # Add to new_settings
-                if final_section not in new_settings:
-                    new_settings[final_section] = {}
-                new_settings[final_section][final_key] = value
+                new_settings.setdefault(final_section, {})[final_key] = value
 
         game_data['dosbox_settings'] = new_settings
         return game_data
 
+    def sync_games_with_reference(self, game_names, progress_callback=None):
+        """Syncs the DOSBox settings of many games with their reference configs. Only changed games are saved."""
+        changed = 0
+        for i, game_name in enumerate(game_names):
+            if progress_callback: progress_callback(i, len(game_names), game_name)
+            details = self.get_game_details(game_name)
+            before = copy.deepcopy(details.get('dosbox_settings'))
+            if self.sync_dosbox_settings_with_reference(details).get('dosbox_settings') != before:
+                self.save_game_details(game_name, details)
+                changed += 1
+        return f"Synced DOSBox settings of {len(game_names)} games, {changed} changed."
+
     def import_from_dosbox_conf(self, game_name):
         if os.path.exists(self._get_game_json_path(game_name)):
             return self.get_game_details(game_name)
@@ -2395,21 +2545,9 @@ class GameLogic:
         # Set default DOSBox config based on settings
         default_exe = self.default_dosbox_exe
         if default_exe and os.path.exists(default_exe):
-            exe_dir = os.path.dirname(default_exe)
-            conf_candidates = [f for f in os.listdir(exe_dir) if f.lower().endswith(".conf")]
-            selected_conf = None
-            exe_name = os.path.basename(default_exe).lower()
-            
-            if "staging" in exe_name:
-                selected_conf = next((f for f in conf_candidates if "staging" in f.lower()), None)
-            elif "dosbox-x" in exe_name:
-                selected_conf = next((f for f in conf_candidates if "dosbox-x" in f.lower()), None)
-            
-            if not selected_conf and conf_candidates:
-                selected_conf = next((f for f in conf_candidates if "dosbox.conf" in f.lower()), conf_candidates[0])
-                
+            selected_conf = self.get_default_dosbox_conf_path(default_exe)
             if selected_conf:
-                details['reference_conf'] = os.path.join(exe_dir, selected_conf)
+                details['reference_conf'] = selected_conf
                 self.save_game_details(game_name, details)
 
         game_folder = self.find_game_folder(game_name)
@@ -2457,13 +2595,7 @@ class GameLogic:
         target_variant: "dosbox-staging", "dosbox-x", "dosbox-standard"
         Returns (new_settings, remapped_keys) where remapped_keys is a set of (section, key) tuples that were remapped/removed.
         """
-        mapping_path = os.path.join(self.base_dir, "database", "mapping_functions.json")
-        if not os.path.exists(mapping_path): return settings, set()
-        
-        try:
-            with open(mapping_path, 'r') as f:
-                mapping = json.load(f)
-        except: return settings, set()
+        if not self.setting_mappings.raw(): return settings, set()
         
         # Map variant to JSON keys: "staging", "x"
         variant_key = "x" 
@@ -2473,24 +2605,12 @@ class GameLogic:
         new_settings = {}
         remapped_keys = set()
         
-        # Normalize mapping keys to lowercase for case-insensitive lookup
-        normalized_mapping = {k.lower(): {sub_k.lower(): sub_v for sub_k, sub_v in v.items()} for k, v in mapping.items()}
-        
         for section, keys in settings.items():
             for key, value in keys.items():
                 # Find mapping
                 # Mapping structure: section -> key -> variant -> {section, key}
                 
-                map_info = None
-                sec_lower = section.lower()
-                key_lower = key.lower()
-                
-                # Check if section exists in mapping
-                if sec_lower in normalized_mapping:
-                    # Check if key exists in mapping[section]
-                    if key_lower in normalized_mapping[sec_lower]:
-                        if variant_key in normalized_mapping[sec_lower][key_lower]:
-                            map_info = normalized_mapping[sec_lower][key_lower][variant_key]
+                map_info = self.setting_mappings.target(section, key, variant_key)
                 
                 if map_info:
                     target_sec = map_info.get("section")
@@ -2535,13 +2655,6 @@ class GameLogic:
         Returns (success, message)
         """
         try:
-            backup_dir = os.path.join(self.base_dir, "archive", "backups")
-            if not os.path.exists(backup_dir): os.makedirs(backup_dir)
-            
-            timestamp = datetime.now().strftime("%Y-%m-%d")
-            archive_name = f"{game_name}_{timestamp}.save.7z"
-            archive_path = os.path.join(backup_dir, archive_name)
-            
             game_folder = self.find_game_folder(game_name)
             if not os.path.exists(game_folder):
                 return False, "Game folder not found."
@@ -2558,49 +2671,29 @@ class GameLogic:
             if not original_zip:
                 return False, "Original archive not found. Cannot perform differential backup."
 
-            # Get list of files in original archive with their CRCs or sizes
-            original_files = {} # path -> size
-            
+            # Sizes and CRC32s straight from the ZIP central directory / 7z header, nothing is unpacked
             if progress_callback: progress_callback(0, 100, "Scanning original archive...")
-
-            if original_zip.lower().endswith(".zip"):
-                with zipfile.ZipFile(original_zip, 'r') as zf:
-                    for info in zf.infolist():
-                        norm_path = os.path.normpath(info.filename)
-                        original_files[norm_path] = info.file_size
-            elif original_zip.lower().endswith(".7z") and HAS_7ZIP:
-                with py7zr.SevenZipFile(original_zip, 'r') as zf:
-                    for info in zf.list():
-                        norm_path = os.path.normpath(info.filename)
-                        original_files[norm_path] = info.uncompressed
-            
-            # Identify changed files
-            files_to_backup = []
+            original_files = archive_member_crcs(original_zip) if not original_zip.lower().endswith(".rar") else {}
             
             if progress_callback: progress_callback(20, 100, "Scanning game folder...")
             
-            all_files = []
+            files_to_backup = []
+            same_size = [] # Only these need a CRC
             for root, dirs, files in os.walk(game_folder):
                 for file in files:
-                    all_files.append(os.path.join(root, file))
-            
-            total_scan = len(all_files)
-            for i, file_path in enumerate(all_files):
-                rel_path = os.path.relpath(file_path, game_folder)
-                norm_rel_path = os.path.normpath(rel_path)
-                
-                should_backup = False
-                if norm_rel_path not in original_files:
-                    should_backup = True # New file
-                else:
-                    if os.path.getsize(file_path) != original_files[norm_rel_path]:
-                        should_backup = True # Modified size
-                
-                if should_backup:
-                    files_to_backup.append((file_path, rel_path))
-                
-                if progress_callback and i % 10 == 0:
-                     progress_callback(20 + int((i / total_scan) * 30), 100, f"Scanning: {rel_path}")
+                    file_path = os.path.join(root, file)
+                    rel_path = os.path.relpath(file_path, game_folder)
+                    original = original_files.get(os.path.normpath(rel_path))
+                    if original is None or os.path.getsize(file_path) != original[0]:
+                        files_to_backup.append((file_path, rel_path)) # New file or modified size
+                    elif original[1] is not None:
+                        same_size.append((file_path, rel_path, original[1]))
+            
+            # Files rewritten in place at the same size are found by CRC, unchanged files come from the cache
+            def hash_progress(done, total):
+                if progress_callback: progress_callback(20 + int((done / total) * 30), 100, f"Checking files: {done} of {total}")
+            crcs = self.crc_cache.get_many([f for f, _, _ in same_size], progress_callback=hash_progress)
+            files_to_backup += [(f, rel) for f, rel, crc in same_size if crcs.get(f) != crc]
 
             # Filter out if only dosbox.conf changed
             # User request: "Ak je archiv 0 rozdiel, alebo tam ides zbalit len subor dosbox.conf, tak to ani nerob"
@@ -2619,19 +2712,19 @@ class GameLogic:
             if only_configs:
                 return True, "Only configuration files changed. Backup skipped as requested."
 
-            # Create backup archive
+            # Add an incremental point to the game's backup chain, only files changed since the last point are archived
             if progress_callback: progress_callback(50, 100, "Creating backup archive...")
             
-            total_backup = len(files_to_backup)
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for i, (file_path, arcname) in enumerate(files_to_backup):
-                    zipf.write(file_path, arcname)
-                    if progress_callback and i % 5 == 0:
-                        progress_callback(50 + int((i / total_backup) * 50), 100, f"Archiving: {arcname}")
-            
+            def archive_progress(done, total):
+                if progress_callback and total:
+                    progress_callback(50 + int((done / total) * 50), 100, f"Archiving: {format_size(done)} of {format_size(total)}")
+
+            point = self.add_backup_point(game_name, files_to_backup, progress_callback=archive_progress)
             if progress_callback: progress_callback(100, 100, "Done!")
+            if point is None:
+                return True, "No changes since the last backup. Backup skipped."
             
-            return True, f"Differential backup created:\n{archive_name}\n({len(files_to_backup)} files)"
+            return True, f"Differential backup created:\n{self._describe_point(point)}"
             
         except Exception as e:
             return False, f"Failed to create backup: {e}"
\ No newline at end of file
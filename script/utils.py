@@ -57,4 +57,27 @@ def get_file_size(path):
     except FileNotFoundError: return 0
 
 def remove_readonly(func, path, exc_info):
-    import stat; os.chmod(path, stat.S_IWRITE); func(path)
\ No newline at end of file
+    import stat; os.chmod(path, stat.S_IWRITE); func(path)
+
+def lower_io_priority():
+    """
+    Best effort: puts the calling thread into background I/O (and CPU) priority,
+    so maintenance work never makes a running game stutter.
+    """
+    try:
+        if os.name == 'nt':
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith('linux'):
+            import ctypes, platform, threading
+            syscalls = {"x86_64": 251, "i686": 289, "i386": 289, "aarch64": 30, "armv7l": 314}
+            if (nr := syscalls.get(platform.machine())) is not None:
+                IOPRIO_WHO_PROCESS, IOPRIO_CLASS_IDLE = 1, 3
+                # who=0 means the calling thread
+                ctypes.CDLL(None, use_errno=True).syscall(nr, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << 13)
+            # On Linux the nice value is per thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except Exception:
+        pass
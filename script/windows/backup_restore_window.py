@@ -0,0 +1,46 @@
+from tkinter import messagebox
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+class BackupRestoreWindow(tb.Toplevel):
+    """Lists the save backup points of a game and restores the chosen one."""
+    def __init__(self, parent, logic, game_name):
+        super().__init__(parent)
+        self.parent = parent
+        self.logic = logic
+        self.game_name = game_name
+        self.title(f"Restore Save Backup - {game_name}")
+        self.geometry("650x400")
+        self.transient(parent)
+
+        main_frame = tb.Frame(self, padding=10)
+        main_frame.pack(fill=BOTH, expand=True)
+        tb.Label(main_frame, text="Restoring a point puts every file saved at that time back, composed from the backup chain.", bootstyle="secondary", wraplength=600).pack(anchor="w", pady=5)
+
+        cols = ["Date", "Type", "Files", "Changed", "Size"]
+        self.tree = tb.Treeview(main_frame, columns=cols, show="headings", height=12)
+        for col in cols: self.tree.heading(col, text=col)
+        self.tree.column("Date", width=170); self.tree.column("Type", width=110)
+        for col in ("Files", "Changed", "Size"): self.tree.column(col, width=90, anchor="e")
+        self.tree.pack(fill=BOTH, expand=True, pady=5)
+
+        self.rows = {}
+        for i, row in enumerate(self.logic.list_backup_points(game_name)):
+            self.rows[str(i)] = row
+            self.tree.insert("", END, iid=str(i), values=(row["created"], "Incremental" if row["kind"] == "chain" else "Single archive", row["files"], row["stored"], row["size"]))
+        if self.rows: self.tree.selection_set("0")
+
+        btn_frame = tb.Frame(main_frame); btn_frame.pack(fill=X, pady=(5, 0))
+        tb.Button(btn_frame, text="Close", command=self.destroy, bootstyle="secondary").pack(side=RIGHT)
+        tb.Button(btn_frame, text="Restore Selected", command=self._on_restore, bootstyle="success", state=NORMAL if self.rows else DISABLED).pack(side=RIGHT, padx=10)
+
+    def _on_restore(self):
+        if not (sel := self.tree.selection()): return
+        row = self.rows[sel[0]]
+        if not messagebox.askyesno("Restore Backup", f"Restore the save data of {row['created']}?\nFiles in the game folder are overwritten, saves made after it are reverted or removed.", parent=self): return
+        try:
+            count = self.logic.restore_backup_point(self.game_name, row["kind"], row["id"])
+            messagebox.showinfo("Restore Complete", f"Restored {count} files.", parent=self)
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror("Restore Error", f"Failed to restore backup: {e}", parent=self)
@@ -4,7 +4,13 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import os
 
+from .export_queue_window import ExportQueueWindow
+from .install_queue_window import InstallQueueWindow
+from ..components.install_queue import InstallQueue
+
 class BatchUtilsWizard(tb.Toplevel):
+    STEP_3_ACTIONS = ("ref_config", "export", "install", "uninstall")
+
     def __init__(self, parent, logic):
         super().__init__(parent)
         self.parent = parent
@@ -93,6 +99,12 @@ class BatchUtilsWizard(tb.Toplevel):
         modes = [
             ("Fetch Metadata (Offline DB)", "metadata"),
             ("Update Reference Config", "ref_config"),
+            ("Sync DOSBox Settings with Reference Config", "sync_settings"),
+            ("Export Games (Bulk Queue)", "export"),
+            ("Install Games", "install"),
+            ("Uninstall Games (keep archives)", "uninstall"),
+            ("Deduplicate Identical Files", "dedupe"),
+            ("Undo Deduplication", "undo_dedupe"),
             ("Delete Games", "delete"),
             ("Clear Metadata", "clear_meta")
         ]
@@ -100,10 +112,10 @@ class BatchUtilsWizard(tb.Toplevel):
         for text, mode in modes:
             tb.Radiobutton(self.content_frame, text=text, variable=self.action, value=mode).pack(anchor="w", pady=5)
 
-        self.btn_next.config(text="Next >" if self.action.get() == "ref_config" else "Execute")
+        self.btn_next.config(text="Next >" if self.action.get() in self.STEP_3_ACTIONS else "Execute")
         
         def on_mode_change(*args):
-            self.btn_next.config(text="Next >" if self.action.get() == "ref_config" else "Execute")
+            self.btn_next.config(text="Next >" if self.action.get() in self.STEP_3_ACTIONS else "Execute")
         self.action.trace("w", on_mode_change)
 
     def _show_step_3_ref_config(self):
@@ -122,6 +134,43 @@ class BatchUtilsWizard(tb.Toplevel):
         
         self.btn_next.config(text="Execute")
 
+    def _show_step_3_export(self):
+        for w in self.content_frame.winfo_children(): w.destroy()
+        self.header.config(text="Step 3: Select Export Format")
+        
+        tb.Label(self.content_frame, text=f"Export {len(self.selected_games)} games to '{self.logic.export_dir}' as:").pack(anchor="w", pady=(0, 10))
+        
+        self.export_format_var = tk.StringVar(value="zip")
+        for fmt, label in self.logic.EXPORT_FORMATS.items():
+            state = DISABLED if fmt == "7z" and not self.logic.HAS_7ZIP else NORMAL
+            tb.Radiobutton(self.content_frame, text=label, variable=self.export_format_var, value=fmt, state=state).pack(anchor="w", pady=5)
+        
+        tb.Label(self.content_frame, text="Games whose export is already up to date are skipped. The queue survives restarts.", bootstyle="secondary").pack(anchor="w", pady=(10, 0))
+        self.btn_next.config(text="Execute")
+
+    def _show_step_3_install(self):
+        for w in self.content_frame.winfo_children(): w.destroy()
+        installing = self.action.get() == "install"
+        self.header.config(text="Step 3: Install Options" if installing else "Step 3: Uninstall Options")
+        
+        settings = self.logic.settings
+        tb.Label(self.content_frame, text=f"{len(self.selected_games)} games will be {'installed' if installing else 'uninstalled'} without further questions.").pack(anchor="w", pady=(0, 10))
+        
+        row = tb.Frame(self.content_frame); row.pack(anchor="w", pady=5)
+        tb.Label(row, text="Games processed at the same time:").pack(side=LEFT)
+        self.install_workers_var = tk.IntVar(value=settings.get("install_workers", 2))
+        tb.Spinbox(row, from_=1, to=16, textvariable=self.install_workers_var, width=5).pack(side=LEFT, padx=10)
+        
+        if installing:
+            self.restore_backups_var = tk.BooleanVar(value=settings.get("bulk_restore_backups", False))
+            tb.Checkbutton(self.content_frame, text="Restore the newest save backup of each game", variable=self.restore_backups_var, bootstyle="round-toggle").pack(anchor="w", pady=5)
+            tb.Label(self.content_frame, text="Installs only start when the archive's unpacked size fits on the games drive.", bootstyle="secondary").pack(anchor="w", pady=(10, 0))
+        else:
+            self.keep_saves_var = tk.BooleanVar(value=settings.get("bulk_keep_saves", True))
+            tb.Checkbutton(self.content_frame, text="Back up changed files (save data) before uninstalling", variable=self.keep_saves_var, bootstyle="round-toggle").pack(anchor="w", pady=5)
+            tb.Label(self.content_frame, text="Games without an archive are skipped, uninstall those one by one.", bootstyle="secondary").pack(anchor="w", pady=(10, 0))
+        self.btn_next.config(text="Execute")
+
     def _next(self):
         if self.step == 1:
             self.selected_games = [z for z, v in self.check_vars.items() if v.get()]
@@ -134,6 +183,12 @@ class BatchUtilsWizard(tb.Toplevel):
             if self.action.get() == "ref_config":
                 self.step = 3
                 self._show_step_3_ref_config()
+            elif self.action.get() == "export":
+                self.step = 3
+                self._show_step_3_export()
+            elif self.action.get() in ("install", "uninstall"):
+                self.step = 3
+                self._show_step_3_install()
             else:
                 if messagebox.askyesno("Confirm", "Are you sure you want to proceed?", parent=self):
                     self._execute()
@@ -183,6 +238,42 @@ class BatchUtilsWizard(tb.Toplevel):
                     print(f"Error updating {zip_name}: {e}")
             messagebox.showinfo("Done", f"Updated Reference Config for {count} games.", parent=self)
         
+        elif action == "export":
+            fmt = self.export_format_var.get()
+            export_queue = self.logic.get_export_queue()
+            for zip_name in self.selected_games:
+                game_name = os.path.splitext(zip_name)[0]
+                export_queue.add(game_name, fmt, self.logic.get_export_path(game_name, fmt))
+            export_queue.save()
+            ExportQueueWindow(self.parent, self.logic, export_queue)
+            self.destroy()
+            return
+            
+        elif action in ("install", "uninstall"):
+            settings = self.logic.settings
+            workers = max(1, self.install_workers_var.get())
+            settings.set("install_workers", workers)
+            if action == "install": settings.set("bulk_restore_backups", self.restore_backups_var.get())
+            else: settings.set("bulk_keep_saves", self.keep_saves_var.get())
+            install_queue = InstallQueue(self.logic, workers=workers, keep_saves=settings.get("bulk_keep_saves", True), restore_backups=settings.get("bulk_restore_backups", False))
+            for zip_name in self.selected_games: install_queue.add(action, zip_name)
+            InstallQueueWindow(self.parent, install_queue)
+            self.destroy()
+            return
+            
+        elif action == "sync_settings":
+            game_names = [os.path.splitext(z)[0] for z in self.selected_games]
+            self.parent._run_long_operation(self.logic.sync_games_with_reference, game_names, success_message="{result}")
+            self.destroy()
+            return
+            
+        elif action in ("dedupe", "undo_dedupe"):
+            game_names = [os.path.splitext(z)[0] for z in self.selected_games]
+            operation = self.logic.dedupe_games if action == "dedupe" else self.logic.undo_dedupe
+            self.parent._run_long_operation(operation, game_names, success_message="{result}")
+            self.destroy()
+            return
+            
         elif action == "metadata":
             self.parent.batch_metatag(self.selected_games) # Reuse existing logic but pass list
             self.destroy()
@@ -196,6 +287,7 @@ class BatchUtilsWizard(tb.Toplevel):
                     folder = self.logic.find_game_folder(game_name)
                     if os.path.exists(folder):
                         import shutil
+                        self.logic.dedupe_store.release(folder)
                         shutil.rmtree(folder)
                     # Delete ZIP
                     zip_path = os.path.join(self.logic.zipped_dir, zip_name)
@@ -234,17 +234,14 @@ class EditWindow(tb.Toplevel):
                 
             # Ensure window is not topmost
             self.attributes("-topmost", False)
-            thread = self.logic.launch_game(self.zip_name, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get())
+            session = self.logic.launch_game(self.zip_name, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get())
             
-            def check_thread():
-                if thread.is_alive():
-                    self.after(1000, check_thread)
-                else:
-                    if should_minimize:
-                        self.deiconify()
-                    self.lift()
+            def on_exit():
+                if should_minimize:
+                    self.deiconify()
+                self.lift()
             
-            self.after(1000, check_thread)
+            self.parent_app.watch_session(session, on_exit)
             
         except Exception as e:
             if should_minimize: self.deiconify()
@@ -280,18 +277,15 @@ class EditWindow(tb.Toplevel):
                 f.write(content)
                 
             # Launch with override
-            thread = self.logic.launch_game(self.zip_name, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get(), config_override_path=temp_conf_path, dosbox_path_override=details.get("custom_dosbox_path"), details_override=details)
+            session = self.logic.launch_game(self.zip_name, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get(), config_override_path=temp_conf_path, dosbox_path_override=details.get("custom_dosbox_path"), details_override=details)
             
-            # Monitor thread to restore window
-            def check_thread():
-                if thread.is_alive():
-                    self.after(1000, check_thread)
-                else:
-                    if should_minimize:
-                        self.deiconify()
-                    self.lift()
+            # Restore the window when DOSBox exits
+            def on_exit():
+                if should_minimize:
+                    self.deiconify()
+                self.lift()
             
-            self.after(1000, check_thread)
+            self.parent_app.watch_session(session, on_exit)
             
         except Exception as e:
             if should_minimize: self.deiconify()
@@ -829,17 +823,19 @@ class EditWindow(tb.Toplevel):
                     # Check description
                     if not match:
                         meta = csv_meta.get(section.lower(), {}).get(key.lower(), {})
-                        desc = meta.get("info", "").lower()
-                        if search_query in desc:
+                        if search_query in meta.get("search", ""):
                             match = True
                     
                     if not match: continue
 
                 item_id = self.expert_tree.insert("", "end", values=(section, key, val, ref_val))
                 if is_changed:
-                    self.expert_tree.item(item_id, tags=("changed",))
+                    # Values outside the option's known list are flagged separately
+                    invalid = self.logic.check_dosbox_setting(getattr(self, 'detected_variant', 'dosbox-standard'), section, key, val, dosbox_path=self.game_data.get("custom_dosbox_path"))
+                    self.expert_tree.item(item_id, tags=("invalid_value",) if invalid else ("changed",))
                     
         self.expert_tree.tag_configure("changed", foreground="#ff5555")
+        self.expert_tree.tag_configure("invalid_value", foreground="#ffaa00")
         self._update_add_param_button_state()
 
     def _on_expert_select(self, event):
@@ -861,6 +857,8 @@ class EditWindow(tb.Toplevel):
         self.txt_expert_desc.insert("1.0", f"[{sec}] {key}\n\n{desc}")
         if possible:
              self.txt_expert_desc.insert(tk.END, f"\n\nPossible Values: {', '.join(possible)}")
+        if invalid := self.logic.check_dosbox_setting(getattr(self, 'detected_variant', 'dosbox-standard'), sec, key, current_val, dosbox_path=self.game_data.get("custom_dosbox_path")):
+             self.txt_expert_desc.insert(tk.END, f"\n\nWarning: {invalid}")
         self.txt_expert_desc.config(state="disabled")
         
         # Update Edit Frame
@@ -907,7 +905,8 @@ class EditWindow(tb.Toplevel):
                 
                 # Re-check highlighting
                 if str(new_val) != str(ref_val):
-                    self.expert_tree.item(item, tags=("changed",))
+                    invalid = self.logic.check_dosbox_setting(getattr(self, 'detected_variant', 'dosbox-standard'), sec, key, new_val, dosbox_path=self.game_data.get("custom_dosbox_path"))
+                    self.expert_tree.item(item, tags=("invalid_value",) if invalid else ("changed",))
                 else:
                     self.expert_tree.item(item, tags=())
             except:
@@ -989,9 +988,7 @@ class EditWindow(tb.Toplevel):
             selected_conf = self.selected_conf_var.get()
             if selected_conf:
                 if not os.path.isabs(selected_conf): selected_conf = os.path.join(self.logic.base_dir, selected_conf)
-                try:
-                    with open(selected_conf, 'r', encoding='utf-8', errors='ignore') as f:
-                        ref_settings = self.logic.parse_dosbox_conf_to_json(f.read())
+                try: ref_settings = self.logic.reference_configs.parsed(selected_conf, self.logic.parse_dosbox_conf_to_json)
                 except: pass
         
         if not ref_settings:
@@ -1000,12 +997,7 @@ class EditWindow(tb.Toplevel):
             return
 
         # Load Mapping
-        mapping_path = os.path.join(self.logic.base_dir, "database", "mapping_functions.json")
-        mapping = {}
-        if os.path.exists(mapping_path):
-            try:
-                with open(mapping_path, 'r', encoding='utf-8') as f: mapping = json.load(f)
-            except: pass
+        mapping = self.logic.setting_mappings.raw()
             
         # Determine Target Variant
         target_variant = "standard"
@@ -1248,12 +1240,9 @@ class EditWindow(tb.Toplevel):
             
             # Override variant if custom path or default exe points to a specific engine
             custom_path = self.game_data.get("custom_dosbox_path", "")
-            if custom_path:
-                if "staging" in custom_path.lower(): variant = "dosbox-staging"
-                elif "dosbox-x" in custom_path.lower(): variant = "dosbox-x"
-            elif self.logic.default_dosbox_exe:
-                if "staging" in self.logic.default_dosbox_exe.lower(): variant = "dosbox-staging"
-                elif "dosbox-x" in self.logic.default_dosbox_exe.lower(): variant = "dosbox-x"
+            if custom_path or self.logic.default_dosbox_exe:
+                engine_type = self.logic.engine_type_for(custom_path)
+                if engine_type != "dosbox": variant = engine_type
             
             self.detected_variant = variant # Store for Quick Settings
             self.current_metadata, json_name = self.logic.load_dosbox_metadata_json(variant)
@@ -1375,11 +1364,11 @@ class EditWindow(tb.Toplevel):
         if selected_conf and not os.path.isabs(selected_conf):
             selected_conf = os.path.join(self.logic.base_dir, selected_conf)
             
-        default_conf = self.logic.get_default_dosbox_conf(self.game_data.get("custom_dosbox_path"), specific_conf_path=selected_conf)
-        defaults = self.logic.parse_dosbox_conf_with_metadata(default_conf)
-        
+        # Sections/keys the engine supports, from the engine probe cache (or the selected reference config)
+        engine_options = self.logic.get_engine_options(self.game_data.get("custom_dosbox_path"), specific_conf_path=selected_conf)
         # Use pre-loaded metadata from CSV
         csv_meta = getattr(self, 'current_metadata', {})
+        defaults = self.logic.describe_dosbox_options(engine_options, csv_meta)
         
         # Get existing parameters to filter them out
         existing_params = set()
@@ -1526,11 +1515,11 @@ class EditWindow(tb.Toplevel):
         if selected_conf and not os.path.isabs(selected_conf):
             selected_conf = os.path.join(self.logic.base_dir, selected_conf)
             
-        default_conf = self.logic.get_default_dosbox_conf(self.game_data.get("custom_dosbox_path"), specific_conf_path=selected_conf)
-        defaults = self.logic.parse_dosbox_conf_with_metadata(default_conf)
-        
+        # Sections/keys the engine supports, from the engine probe cache (or the selected reference config)
+        engine_options = self.logic.get_engine_options(self.game_data.get("custom_dosbox_path"), specific_conf_path=selected_conf)
         # Use pre-loaded metadata from CSV
         csv_meta = getattr(self, 'current_metadata', {})
+        defaults = self.logic.describe_dosbox_options(engine_options, csv_meta)
         meta = csv_meta.get(sec.lower(), {}).get(key.lower(), {})
         
         # Fallback to parsed data
@@ -1836,13 +1825,10 @@ class EditWindow(tb.Toplevel):
         else:
             # Priority 2: Check custom path (User selection)
             path = self.game_data.get("custom_dosbox_path", "")
-            if path:
-                if "staging" in path.lower(): is_staging = True
-                elif "dosbox-x" in path.lower(): is_x = True
-            elif self.logic.default_dosbox_exe:
-                # Priority 2.5: Check default exe
-                if "staging" in self.logic.default_dosbox_exe.lower(): is_staging = True
-                elif "dosbox-x" in self.logic.default_dosbox_exe.lower(): is_x = True
+            if path or self.logic.default_dosbox_exe:
+                # Priority 2.5: Default exe, both resolved by the engine probe
+                engine_type = self.logic.engine_type_for(path)
+                is_staging = engine_type == "dosbox-staging"; is_x = engine_type == "dosbox-x"
             else:
                 # Priority 3: Fallback to reference conf
                 ref_conf = self.game_data.get("reference_conf", "")
@@ -1874,11 +1860,7 @@ class EditWindow(tb.Toplevel):
         if ref_conf_path:
             if not os.path.isabs(ref_conf_path): ref_conf_path = os.path.join(self.logic.base_dir, ref_conf_path)
             if os.path.exists(ref_conf_path):
-                try:
-                    from ..logic import DOSBoxConfigParser
-                    ref_parser = DOSBoxConfigParser()
-                    with open(ref_conf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        ref_parser.parse(f.read())
+                try: ref_parser = self.logic.get_reference_parser(ref_conf_path)
                 except: pass
 
         settings = self.game_data.get("dosbox_settings", {})
@@ -1915,12 +1897,7 @@ class EditWindow(tb.Toplevel):
             target_variant = strict_variant
             
             # Load mapping
-            mapping_path = os.path.join(self.logic.base_dir, "database", "mapping_functions.json")
-            mapping = {}
-            if os.path.exists(mapping_path):
-                try:
-                    with open(mapping_path, 'r', encoding='utf-8') as f: mapping = json.load(f)
-                except: pass
+            mapping = self.logic.setting_mappings.raw()
             
             # Check mapping for the canonical key
             # We assume 'key' passed here is the canonical key (e.g. 'cycles')
@@ -2243,6 +2220,31 @@ class EditWindow(tb.Toplevel):
         e_cycles_prot.bind("<FocusOut>", on_cycles_prot_change)
         e_cycles_prot.bind("<Return>", on_cycles_prot_change)
 
+        # Measured usage of the last sessions and the advice drawn from it
+        last_session, advice = self.logic.get_resource_advice(self.name)
+        f_usage = tb.Frame(f_cpu)
+        f_usage.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        f_usage.columnconfigure(0, weight=1)
+        if last_session:
+            usage_text = (f"Last session: {last_session['thread_avg']:.0f}% avg / {last_session['thread_p90']:.0f}% peak of a host core, "
+                          f"{last_session['rss_peak_mb']:.0f} MB, cycles={last_session.get('cycles', 'auto')}")
+        else:
+            usage_text = "No usage measured yet (sampled on Linux while the game runs)."
+        tb.Label(f_usage, text=usage_text, font="-size 8", bootstyle="secondary", wraplength=320, justify=tk.LEFT).grid(row=0, column=0, columnspan=2, sticky="w", padx=5)
+
+        def apply_advice(rec, button):
+            var = v_core if rec["key"] == "core" else v_cycles
+            var.set(rec["value"])
+            update_setting(rec["section"], rec["key"], rec["value"])
+            button.config(state="disabled", text="Applied")
+
+        for i, rec in enumerate(advice, start=1):
+            tb.Label(f_usage, text=rec["text"], font="-size 8", bootstyle="info", wraplength=260, justify=tk.LEFT).grid(row=i, column=0, sticky="w", padx=5, pady=2)
+            if rec["value"]:
+                btn = tb.Button(f_usage, text=f"Use {rec['value']}", bootstyle="info-outline", padding=(4, 1))
+                btn.config(command=lambda r=rec, b=btn: apply_advice(r, b))
+                btn.grid(row=i, column=1, sticky="e", padx=5, pady=2)
+
         # 3. Display Options - Row 1, Col 1 (Rowspan 3)
         f_disp = tb.Labelframe(scrollable_frame, text="Display Options", bootstyle="warning", padding=10)
         f_disp.grid(row=1, column=1, rowspan=3, sticky="nsew", padx=10, pady=10)
@@ -2515,21 +2517,18 @@ class EditWindow(tb.Toplevel):
             self.withdraw() # Use withdraw for transient windows
             self.parent_app.update() # Force update to ensure minimization happens immediately
             
-            thread = self.logic.launch_game(self.zip_name, specific_exe=specific_exe, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get())
+            session = self.logic.launch_game(self.zip_name, specific_exe=specific_exe, force_fullscreen=self.parent_app.force_fullscreen_var.get(), auto_exit=self.parent_app.auto_exit_var.get())
             
-            def check_thread():
-                if thread.is_alive():
-                    self.after(1000, check_thread)
-                else:
-                    # Restore windows
-                    self.parent_app.deiconify()
-                    self.parent_app.state('normal')
-                    self.deiconify()
-                    self.state('normal')
-                    self.lift()
-                    self.focus_force()
+            def on_exit():
+                # Restore windows
+                self.parent_app.deiconify()
+                self.parent_app.state('normal')
+                self.deiconify()
+                self.state('normal')
+                self.lift()
+                self.focus_force()
             
-            self.after(1000, check_thread)
+            self.parent_app.watch_session(session, on_exit)
             
         except Exception as e:
             self.parent_app.deiconify()
@@ -3166,9 +3165,8 @@ class EditWindow(tb.Toplevel):
             
             is_staging = False
             if hasattr(self, 'detected_variant') and "staging" in self.detected_variant.lower(): is_staging = True
-            elif "staging" in data.get("custom_dosbox_path", "").lower(): is_staging = True
+            elif self.logic.engine_type_for(data.get("custom_dosbox_path")) == "dosbox-staging": is_staging = True
             elif "staging" in data.get("reference_conf", "").lower(): is_staging = True
-            elif not data.get("custom_dosbox_path") and self.logic.default_dosbox_exe and "staging" in self.logic.default_dosbox_exe.lower(): is_staging = True
             
             if is_staging:
                 # Use v_cycles for cpu_cycles if available (since we bind v_cycles to cpu_cycles in Staging)
@@ -0,0 +1,109 @@
+from tkinter import messagebox
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from ttkbootstrap.scrolled import ScrolledText
+import os
+import queue
+import threading
+
+from ..utils import format_size
+
+class ExportQueueWindow(tb.Toplevel):
+    """Runs the persisted bulk export queue and shows per-job results and per-worker throughput."""
+    def __init__(self, parent, logic, export_queue):
+        super().__init__(parent)
+        self.parent = parent
+        self.logic = logic
+        self.export_queue = export_queue
+        self.events = queue.Queue()
+        self.stop_event = threading.Event()
+        self.running = False
+        self._after_id = None
+        self.title("Bulk Export")
+        self.geometry("650x450")
+        self.transient(parent)
+
+        main_frame = tb.Frame(self, padding=10)
+        main_frame.pack(fill=BOTH, expand=True)
+
+        workers = self.logic.settings.get("export_workers", 0) or os.cpu_count() or 1
+        self.lbl_status = tb.Label(main_frame, text=f"{len(self.export_queue.pending())} jobs queued, {workers} worker processes.", bootstyle="info")
+        self.lbl_status.pack(anchor="w", pady=5)
+        self.progress_bar = tb.Progressbar(main_frame, mode='determinate')
+        self.progress_bar.pack(fill=X, pady=5)
+
+        self.log_text = ScrolledText(main_frame, height=15, autohide=True)
+        self.log_text.pack(fill=BOTH, expand=True, pady=5)
+
+        btn_frame = tb.Frame(main_frame); btn_frame.pack(fill=X, pady=(5, 0))
+        self.btn_close = tb.Button(btn_frame, text="Close", command=self._on_close, bootstyle="secondary")
+        self.btn_close.pack(side=RIGHT)
+        self.btn_stop = tb.Button(btn_frame, text="Stop After Running Jobs", command=self._on_stop, bootstyle="danger-outline")
+        self.btn_stop.pack(side=RIGHT, padx=10)
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.bind("<Destroy>", self._on_destroy)
+        self._after_id = self.after(100, self.start)
+
+    def log(self, msg):
+        self.log_text.text.insert(END, msg + "\n")
+        self.log_text.text.see(END)
+
+    def start(self):
+        self.running = True
+        def on_event(job, finished, total): self.events.put(("job", (job, finished, total)))
+        def run_op():
+            try: self.events.put(("summary", self.logic.run_export_queue(self.export_queue, event_callback=on_event, stop_event=self.stop_event)))
+            except Exception as e: self.events.put(("error", e))
+        threading.Thread(target=run_op, daemon=True).start()
+        self._after_id = self.after(100, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        try:
+            while True:
+                kind, data = self.events.get_nowait()
+                if kind == "job":
+                    job, finished, total = data
+                    self.progress_bar['value'] = finished / total * 100
+                    self.lbl_status.config(text=f"Finished {finished} of {total} jobs")
+                    label = self.logic.EXPORT_FORMATS.get(job["format"], job["format"])
+                    if job["status"] == "failed": self.log(f"[FAIL] {job['game']} ({label}): {job.get('error')}")
+                    elif job["status"] == "skipped": self.log(f"[SKIP] {job['game']} ({label}): up to date")
+                    else: self.log(f"[OK] {job['game']} ({label}): {format_size(job.get('bytes', 0))} in {job.get('seconds', 0):.1f} s")
+                elif kind == "summary":
+                    self._finish(data); return
+                elif kind == "error":
+                    self.running = False
+                    messagebox.showerror("Bulk Export", str(data), parent=self); return
+        except queue.Empty:
+            pass
+        self._after_id = self.after(200, self._poll)
+
+    def _finish(self, summary):
+        self.running = False
+        self.btn_stop.config(state=DISABLED)
+        left = len(self.export_queue.pending())
+        self.lbl_status.config(text="Stopped, remaining jobs stay queued." if left else "All jobs finished.")
+        self.log("\nThroughput per worker:")
+        for pid, entry in sorted(summary.items()):
+            name = f"Worker {pid}" if pid else "Unknown worker"
+            self.log(f"  {name}: {entry['jobs']} jobs ({entry['skipped']} skipped, {entry['failed']} failed), "
+                     f"{format_size(entry['bytes'])} in {entry['seconds']:.1f} s = {format_size(entry['throughput'])}/s")
+        self.parent.refresh_library()
+
+    def _on_stop(self):
+        self.stop_event.set()
+        self.btn_stop.config(state=DISABLED)
+        self.lbl_status.config(text="Stopping after the running jobs...")
+
+    def _on_destroy(self, event):
+        if event.widget is not self: return # Children send <Destroy> through the toplevel's bindings too
+        if self._after_id: self.after_cancel(self._after_id); self._after_id = None
+        self.stop_event.set()
+
+    def _on_close(self):
+        if self.running:
+            if not messagebox.askyesno("Bulk Export", "Exports are still running. Stop after the running jobs and close?\nThe remaining jobs will resume next time.", parent=self): return
+            self.stop_event.set()
+        self.destroy()
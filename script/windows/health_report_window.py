@@ -0,0 +1,52 @@
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+import os
+
+from ..utils import format_size
+
+class HealthReportWindow(tb.Toplevel):
+    """Lists the cached verification result of every archive in the archive folder."""
+    def __init__(self, parent, parent_app):
+        super().__init__(parent)
+        self.parent_app = parent_app
+        self.logic = parent_app.logic
+        self.title("Archive Health Report")
+        self.geometry("700x450")
+        self.transient(parent)
+
+        main_frame = tb.Frame(self, padding=10)
+        main_frame.pack(fill=BOTH, expand=True)
+
+        self.lbl_summary = tb.Label(main_frame, text="", bootstyle="info")
+        self.lbl_summary.pack(anchor="w", pady=5)
+
+        cols = ["Archive", "Size", "Status", "Checked"]
+        self.tree = tb.Treeview(main_frame, columns=cols, show="headings", height=14)
+        for col in cols: self.tree.heading(col, text=col)
+        self.tree.column("Archive", width=250); self.tree.column("Size", width=80, anchor="e")
+        self.tree.column("Status", width=240); self.tree.column("Checked", width=110, anchor="center")
+        self.tree.pack(fill=BOTH, expand=True, pady=5)
+
+        btn_frame = tb.Frame(main_frame); btn_frame.pack(fill=X, pady=(5, 0))
+        tb.Button(btn_frame, text="Close", command=self.destroy, bootstyle="secondary").pack(side=RIGHT)
+        tb.Button(btn_frame, text="Re-verify All", command=self._on_reverify, bootstyle="warning-outline").pack(side=RIGHT, padx=10)
+        tb.Button(btn_frame, text="Refresh", command=self.refresh, bootstyle="info-outline").pack(side=RIGHT)
+
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        counts = {"ok": 0, "corrupt": 0, "skipped": 0, "unchecked": 0}
+        for path, size, entry in self.logic.archive_verifier.report(self.logic.zipped_dir):
+            state = entry["state"] if entry else "unchecked"
+            counts[state] += 1
+            status = {"ok": "OK", "corrupt": "CORRUPT", "skipped": "Not tested", "unchecked": "Not checked yet"}[state]
+            if entry and entry["message"]: status += f": {entry['message']}"
+            self.tree.insert("", END, values=(os.path.basename(path), format_size(size), status, entry["checked"] if entry else ""))
+        running = " Verification is running..." if self.logic.archive_verifier.running else ""
+        self.lbl_summary.config(text=f"{counts['ok']} OK, {counts['corrupt']} corrupt, {counts['skipped']} not testable, {counts['unchecked']} not checked yet.{running}",
+                                bootstyle="danger" if counts["corrupt"] else "info")
+
+    def _on_reverify(self):
+        self.parent_app.start_archive_verification(force=True)
+        self.after(500, self.refresh)
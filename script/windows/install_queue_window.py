@@ -0,0 +1,96 @@
+from tkinter import messagebox
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+import queue
+import threading
+
+from ..utils import format_size
+
+class InstallQueueWindow(tb.Toplevel):
+    """Runs an InstallQueue and shows every job with its byte progress."""
+    def __init__(self, parent, install_queue):
+        super().__init__(parent)
+        self.parent = parent
+        self.install_queue = install_queue
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.running = False
+        self.title("Bulk Install / Uninstall")
+        self.geometry("700x450")
+        self.transient(parent)
+
+        main_frame = tb.Frame(self, padding=10)
+        main_frame.pack(fill=BOTH, expand=True)
+
+        self.lbl_status = tb.Label(main_frame, text=f"{len(install_queue.jobs)} jobs, up to {install_queue.workers} at a time.", bootstyle="info")
+        self.lbl_status.pack(anchor="w", pady=5)
+
+        cols = ["Game", "Action", "Status", "Progress"]
+        self.tree = tb.Treeview(main_frame, columns=cols, show="headings", height=14)
+        for col in cols: self.tree.heading(col, text=col)
+        self.tree.column("Game", width=250); self.tree.column("Action", width=80, anchor="center")
+        self.tree.column("Status", width=200); self.tree.column("Progress", width=150, anchor="e")
+        self.tree.pack(fill=BOTH, expand=True, pady=5)
+        for i, job in enumerate(install_queue.jobs):
+            self.tree.insert("", END, iid=str(i), values=(job["game"], job["action"].capitalize(), "Pending", ""))
+        self.job_ids = {id(job): str(i) for i, job in enumerate(install_queue.jobs)}
+
+        btn_frame = tb.Frame(main_frame); btn_frame.pack(fill=X, pady=(5, 0))
+        self.btn_close = tb.Button(btn_frame, text="Close", command=self._on_close, bootstyle="secondary")
+        self.btn_close.pack(side=RIGHT)
+        self.btn_cancel = tb.Button(btn_frame, text="Cancel Remaining", command=self._on_cancel, bootstyle="danger-outline")
+        self.btn_cancel.pack(side=RIGHT, padx=10)
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(100, self.start)
+
+    def start(self):
+        self.running = True
+        def run_op():
+            try: self.install_queue.run(event_callback=lambda job: self.events.put(("job", job)), cancel_event=self.cancel_event)
+            except Exception as e: self.events.put(("error", e))
+            self.events.put(("finished", None))
+        threading.Thread(target=run_op, daemon=True).start()
+        self.after(100, self._poll)
+
+    def _poll(self):
+        if not self.winfo_exists(): return
+        updated = {}
+        try:
+            while True:
+                kind, data = self.events.get_nowait()
+                if kind == "job": updated[id(data)] = data # Only the latest state of each job is drawn
+                elif kind == "error": messagebox.showerror("Bulk Install", str(data), parent=self)
+                elif kind == "finished":
+                    for job in updated.values(): self._draw(job)
+                    self._finish(); return
+        except queue.Empty:
+            pass
+        for job in updated.values(): self._draw(job)
+        self.after(200, self._poll)
+
+    def _draw(self, job):
+        status = job["status"].capitalize() + (f": {job['message']}" if job["message"] else "")
+        progress = ""
+        if job["action"] == "install" and job["total"]:
+            progress = f"{format_size(job['done'])} / {format_size(job['total'])}"
+        self.tree.item(self.job_ids[id(job)], values=(job["game"], job["action"].capitalize(), status, progress))
+
+    def _finish(self):
+        self.running = False
+        self.btn_cancel.config(state=DISABLED)
+        counts = {}
+        for job in self.install_queue.jobs: counts[job["status"]] = counts.get(job["status"], 0) + 1
+        self.lbl_status.config(text="Finished: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+        self.parent.refresh_library()
+
+    def _on_cancel(self):
+        self.cancel_event.set()
+        self.btn_cancel.config(state=DISABLED)
+        self.lbl_status.config(text="Cancelling...")
+
+    def _on_close(self):
+        if self.running:
+            if not messagebox.askyesno("Bulk Install", "Jobs are still running. Cancel them and close?", parent=self): return
+            self.cancel_event.set()
+        self.destroy()
@@ -0,0 +1,79 @@
+from tkinter import filedialog, messagebox
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+from ..components.launch_timer import STAGES
+
+STAGE_LABELS = {"engine": "Engine resolution", "game_config": "Game config", "prepare_configs": "Layered configs", "autoexec": "Autoexec",
+                "snapshot": "Session snapshot", "spawn": "Process start", "window": "Until window shows"}
+
+def _ms(value): return "" if value is None else f"{value:.0f} ms"
+
+class LaunchStatsWindow(tb.Toplevel):
+    """Per-game launch timings: stage breakdown of the recent launches and a histogram of the totals."""
+    def __init__(self, parent, logic):
+        super().__init__(parent)
+        self.logic = logic
+        self.stats = logic.launch_stats
+        self.title("Launch Timing Report")
+        self.geometry("760x560")
+        self.transient(parent)
+
+        main_frame = tb.Frame(self, padding=10)
+        main_frame.pack(fill=BOTH, expand=True)
+
+        cols = ["Game", "Launches", "Median", "90th Pct.", "Slowest Stage"]
+        self.games_tree = tb.Treeview(main_frame, columns=cols, show="headings", height=8, selectmode="browse")
+        for col in cols: self.games_tree.heading(col, text=col)
+        self.games_tree.column("Game", width=240)
+        for col in ("Launches", "Median", "90th Pct."): self.games_tree.column(col, width=80, anchor="e")
+        self.games_tree.column("Slowest Stage", width=180)
+        self.games_tree.pack(fill=BOTH, expand=True, pady=5)
+        self.games_tree.bind("<<TreeviewSelect>>", lambda e: self._show_game())
+
+        detail = tb.Frame(main_frame); detail.pack(fill=BOTH, expand=True, pady=5)
+        cols = ["Stage", "Median", "90th Pct.", "Max"]
+        self.stage_tree = tb.Treeview(detail, columns=cols, show="headings", height=len(STAGES))
+        for col in cols: self.stage_tree.heading(col, text=col)
+        self.stage_tree.column("Stage", width=170)
+        for col in cols[1:]: self.stage_tree.column(col, width=80, anchor="e")
+        self.stage_tree.pack(side=LEFT, fill=BOTH, expand=True)
+        self.histogram = tb.Label(detail, text="", font=("Courier", 9), justify=LEFT, anchor="nw")
+        self.histogram.pack(side=LEFT, fill=BOTH, expand=True, padx=(10, 0))
+
+        btn_frame = tb.Frame(main_frame); btn_frame.pack(fill=X, pady=(5, 0))
+        tb.Button(btn_frame, text="Close", command=self.destroy, bootstyle="secondary").pack(side=RIGHT)
+        tb.Button(btn_frame, text="Export JSON...", command=self._on_export, bootstyle="info-outline").pack(side=RIGHT, padx=10)
+        tb.Button(btn_frame, text="Refresh", command=self.refresh, bootstyle="info-outline").pack(side=RIGHT)
+
+        self.refresh()
+
+    def refresh(self):
+        self.games_tree.delete(*self.games_tree.get_children())
+        for name in sorted(self.stats.games, key=str.lower):
+            summary = self.stats.summary(name)
+            slowest = max(((s, v["median"]) for s, v in summary["stages"].items() if v["median"] is not None), key=lambda x: x[1], default=None)
+            self.games_tree.insert("", END, iid=name, values=(name, summary["launches"], _ms(summary["total"]["median"]), _ms(summary["total"]["p90"]),
+                                                              f"{STAGE_LABELS[slowest[0]]} ({_ms(slowest[1])})" if slowest else ""))
+        if children := self.games_tree.get_children(): self.games_tree.selection_set(children[0])
+        else: self._show_game()
+
+    def _show_game(self):
+        self.stage_tree.delete(*self.stage_tree.get_children())
+        if not (sel := self.games_tree.selection()): self.histogram.config(text="No launches recorded yet."); return
+        summary = self.stats.summary(sel[0])
+        for stage in STAGES:
+            values = summary["stages"][stage]
+            if values["median"] is not None: self.stage_tree.insert("", END, values=(STAGE_LABELS[stage], _ms(values["median"]), _ms(values["p90"]), _ms(values["max"])))
+        peak = max((count for _, count in summary["histogram"]), default=0) or 1
+        lines = ["Click to window, last launches:", ""] + [f"{label:>9} {'#' * round(20 * count / peak):<20} {count}" for label, count in summary["histogram"]]
+        self.histogram.config(text="\n".join(lines))
+
+    def _on_export(self):
+        path = filedialog.asksaveasfilename(parent=self, title="Export Launch Timings", defaultextension=".json", initialfile="launch_timings.json", filetypes=[("JSON", "*.json")])
+        if not path: return
+        try:
+            self.stats.export(path)
+            messagebox.showinfo("Export", f"Launch timings exported to {path}.", parent=self)
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to export: {e}", parent=self)
@@ -6,6 +6,9 @@ import os
 
 from ..utils import restart_program
 from ..logger import Logger
+from ..components.compression_policy import PRESETS, DEFAULT_PRESET
+from .health_report_window import HealthReportWindow
+from .launch_stats_window import LaunchStatsWindow
 
 class DOSBoxEntryDialog(tb.Toplevel):
     def __init__(self, parent, entry=None):
@@ -141,6 +144,51 @@ class SettingsWindow(tb.Toplevel):
         
         self.minimize_on_launch_var = tk.BooleanVar(value=self.settings.get("minimize_on_launch", False))
         tb.Checkbutton(lf_window, text="Minimize App on Game Launch", variable=self.minimize_on_launch_var, bootstyle="round-toggle").pack(anchor="w", padx=5, pady=5)
+        self.speculative_launch_var = tk.BooleanVar(value=self.settings.get("speculative_launch", False))
+        tb.Checkbutton(lf_window, text="Prepare Launch of the Selected Game in Advance", variable=self.speculative_launch_var, bootstyle="round-toggle").pack(anchor="w", padx=5, pady=5)
+        self.resource_telemetry_var = tk.BooleanVar(value=self.settings.get("resource_telemetry", True))
+        tb.Checkbutton(lf_window, text="Measure DOSBox CPU/Memory Use for Cycles Advice", variable=self.resource_telemetry_var, bootstyle="round-toggle").pack(anchor="w", padx=5, pady=5)
+
+        # Archives Tab
+        archive_frame = tb.Frame(notebook, padding=15); notebook.add(archive_frame, text="Archives")
+        lf_compress = tb.Labelframe(archive_frame, text="Export & Backup Compression", padding=10)
+        lf_compress.pack(fill=X, padx=10, pady=10)
+        tb.Label(lf_compress, text="Compression Preset:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.preset_labels = {opts["label"]: key for key, opts in PRESETS.items()}
+        current_preset = self.settings.get("compression_preset", DEFAULT_PRESET)
+        self.compression_preset_var = tk.StringVar(value=PRESETS.get(current_preset, PRESETS[DEFAULT_PRESET])["label"])
+        tb.Combobox(lf_compress, textvariable=self.compression_preset_var, values=list(self.preset_labels), state="readonly", width=20).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        tb.Label(lf_compress, text="Bulk Export Workers (0 = one per CPU):").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.export_workers_var = tk.IntVar(value=self.settings.get("export_workers", 0))
+        tb.Spinbox(lf_compress, from_=0, to=64, textvariable=self.export_workers_var, width=10).grid(row=2, column=1, padx=5, pady=5, sticky="w")
+        tb.Label(lf_compress, text="Already compressed files (music, video, images, archives) and random-looking data are always stored as-is.", bootstyle="secondary", wraplength=450).grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+
+        lf_saves = tb.Labelframe(archive_frame, text="Save Backups", padding=10)
+        lf_saves.pack(fill=X, padx=10, pady=10)
+        self.auto_backup_var = tk.BooleanVar(value=self.settings.get("auto_backup_saves", False))
+        tb.Checkbutton(lf_saves, text="Back Up Changed Save Files When a Game Session Ends", variable=self.auto_backup_var, bootstyle="round-toggle").grid(row=0, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        tb.Label(lf_saves, text="At Most Once Every (minutes):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.auto_backup_interval_var = tk.IntVar(value=self.settings.get("auto_backup_interval", 15))
+        tb.Spinbox(lf_saves, from_=0, to=1440, textvariable=self.auto_backup_interval_var, width=10).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        self.retention_vars = {}
+        for row, (key, label, default) in enumerate((("backup_keep_last", "Keep Newest Backups:", 10), ("backup_keep_daily", "Keep One per Day for (days):", 7), ("backup_keep_weekly", "Keep One per Week for (weeks):", 8)), start=2):
+            tb.Label(lf_saves, text=label).grid(row=row, column=0, padx=5, pady=5, sticky="w")
+            self.retention_vars[key] = tk.IntVar(value=self.settings.get(key, default))
+            tb.Spinbox(lf_saves, from_=0, to=999, textvariable=self.retention_vars[key], width=10).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        self.session_snapshots_var = tk.BooleanVar(value=self.settings.get("session_snapshots", False))
+        tb.Checkbutton(lf_saves, text="Snapshot Game Folder Before Each Session (Roll Back from the Context Menu)", variable=self.session_snapshots_var, bootstyle="round-toggle").grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        tb.Label(lf_saves, text="Snapshots Kept per Game:").grid(row=6, column=0, padx=5, pady=5, sticky="w")
+        self.snapshots_per_game_var = tk.IntVar(value=self.settings.get("snapshots_per_game", 5))
+        tb.Spinbox(lf_saves, from_=1, to=50, textvariable=self.snapshots_per_game_var, width=10).grid(row=6, column=1, padx=5, pady=5, sticky="w")
+        saves_btns = tb.Frame(lf_saves); saves_btns.grid(row=7, column=0, columnspan=2, sticky="w")
+        tb.Button(saves_btns, text="Import Old Backup Archives", command=lambda: self.parent_app._run_long_operation(self.parent_app.logic.import_legacy_backups, success_message="{result}"), bootstyle="info-outline").pack(side=LEFT, padx=5, pady=5)
+        tb.Button(saves_btns, text="Apply Retention Now", command=self._apply_backup_retention, bootstyle="warning-outline").pack(side=LEFT, padx=5, pady=5)
+
+        lf_health = tb.Labelframe(archive_frame, text="Archive Integrity", padding=10)
+        lf_health.pack(fill=X, padx=10, pady=10)
+        self.verify_archives_var = tk.BooleanVar(value=self.settings.get("verify_archives", True))
+        tb.Checkbutton(lf_health, text="Verify New or Changed Archives in the Background", variable=self.verify_archives_var, bootstyle="round-toggle").pack(anchor="w", padx=5, pady=5)
+        tb.Button(lf_health, text="Archive Health Report...", command=lambda: HealthReportWindow(self, self.parent_app), bootstyle="info-outline").pack(anchor="w", padx=5, pady=5)
 
         # Logging Tab
         log_frame = tb.Frame(notebook, padding=15); notebook.add(log_frame, text="Logging")
@@ -167,6 +215,7 @@ class SettingsWindow(tb.Toplevel):
 
         tb.Label(log_frame, text="Logs are saved in the 'log' folder with date-based filenames.", bootstyle="secondary").pack(anchor="w", pady=(0, 20))
         tb.Button(log_frame, text="Clear All Logs", command=self._clear_logs, bootstyle="danger-outline").pack(anchor="w")
+        tb.Button(log_frame, text="Launch Timing Report...", command=lambda: LaunchStatsWindow(self, self.parent_app.logic), bootstyle="info-outline").pack(anchor="w", pady=(10, 0))
         
         self._load_dosbox_list()
 
@@ -284,6 +333,11 @@ class SettingsWindow(tb.Toplevel):
         if not os.path.isdir(dosbox_dir): messagebox.showerror("Invalid Path", f"The specified DOSBox directory does not exist:\n{os.path.abspath(dosbox_dir)}", parent=self); return
         found = self._perform_scan(dosbox_dir); self._process_scan_results(found)
 
+    def _apply_backup_retention(self):
+        for key, var in self.retention_vars.items(): self.settings.set(key, max(0, var.get()))
+        if messagebox.askyesno("Apply Retention", "Delete the save backups the retention settings do not keep, for all games?", parent=self):
+            self.parent_app._run_long_operation(self.parent_app.logic.apply_backup_retention, success_message="{result}")
+
     def save_settings(self):
         self.settings.set("enable_logging", self.logging_var.get())
         
@@ -302,6 +356,16 @@ class SettingsWindow(tb.Toplevel):
         self.settings.set("slideshow_enabled", self.slideshow_enabled_var.get())
         self.settings.set("hover_preview", self.hover_preview_var.get())
         self.settings.set("minimize_on_launch", self.minimize_on_launch_var.get())
+        self.settings.set("speculative_launch", self.speculative_launch_var.get())
+        self.settings.set("resource_telemetry", self.resource_telemetry_var.get())
+        self.settings.set("export_workers", max(0, self.export_workers_var.get()))
+        self.settings.set("verify_archives", self.verify_archives_var.get())
+        self.settings.set("auto_backup_saves", self.auto_backup_var.get())
+        self.settings.set("auto_backup_interval", max(0, self.auto_backup_interval_var.get()))
+        for key, var in self.retention_vars.items(): self.settings.set(key, max(0, var.get()))
+        self.settings.set("session_snapshots", self.session_snapshots_var.get())
+        self.settings.set("snapshots_per_game", max(1, self.snapshots_per_game_var.get()))
+        self.settings.set("compression_preset", self.preset_labels.get(self.compression_preset_var.get(), DEFAULT_PRESET))
         
         hidden_columns = [col_id for col_id, var in self.column_vars.items() if not var.get()]
         self.settings.set('hidden_columns', hidden_columns)